@@ -3,19 +3,46 @@ Advanced AI/ML Recommendation Engine
 Multi-algorithm approach for personalized learning pathway generation
 """
 
+import os
+import copy
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Mapping, Iterator, TYPE_CHECKING
+from dataclasses import dataclass, replace
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import logging
 from enum import Enum
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.cluster import KMeans
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from resource_catalog import ResourceCatalog, LearningResource, top_k_indices, records_digest
+from behavior_matrix import UserItemMatrix
+from behavior_history import BehaviorHistory
+from model_trainer import BackgroundModelTrainer, ModelSnapshot
+from pathway_optimizer import ParetoPathwayOptimizer, ParetoPathway, mmr_pathways_batch, popcount
+from recommendation_cache import RecommendationCache, canonical_profile_key
+from engine_state import EngineStateStore
+from behavior_store import BehaviorStore, FeedbackEvent
+from skill_taxonomy import SkillTaxonomy, load_skill_taxonomy
+from stage_pipeline import Stage, StagePipeline
+from pathway_store import PathwayStore
+from memory_stats import process_memory
+from candidate_retrieval import CandidateRetriever, ScoredCandidates
+from recommendation_context import RecommendationContext, StageTimings
+from item_cooccurrence import ItemCooccurrenceModel
+from implicit_als import BackgroundFactorTrainer, FactorSnapshot
+from contextual_bandit import LinUCBBandit, context_vector
+from recommendation_materializer import RecommendationMaterializer, MaterializedRequest, InputVersion
+from enrollment_source import PlatformEnrollmentSource, normalize_title
 import warnings
+
+if TYPE_CHECKING:
+    # scikit-learn is imported only when forests are trained or loaded
+    from sklearn.ensemble import RandomForestRegressor
+
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -36,28 +63,13 @@ class PathwayObjective(Enum):
     MAXIMIZE_SATISFACTION = "maximize_satisfaction"
     BALANCE_ALL = "balance_all"
 
-@dataclass
-class LearningResource:
-    """Learning resource data structure"""
-    id: str
-    title: str
-    type: str  # course, certification, book, project, mentorship
-    provider: str
-    nsqf_level: int
-    difficulty: str
-    duration_hours: int
-    cost: float
-    skills_covered: List[str]
-    prerequisites: List[str]
-    success_rate: float
-    user_ratings: List[float]
-    employment_impact: float
-    salary_impact: float
-    tags: List[str]
-
 @dataclass
 class UserBehavior:
     """User learning behavior data"""
+    __slots__ = (
+        "user_id", "completed_resources", "resource_ratings", "time_spent",
+        "skill_assessments", "career_progress", "learning_patterns", "preferences"
+    )
     user_id: str
     completed_resources: List[str]
     resource_ratings: Dict[str, float]
@@ -79,32 +91,345 @@ class RecommendationResult:
     estimated_outcomes: Dict[str, Any]
     alternative_pathways: List[str]
 
+@dataclass(frozen=True)
+class ServingState:
+    """
+    One immutable version of the catalog and learner behaviour that
+    requests read. Writers build the next version from copies and publish
+    it with a single reference assignment; readers never lock and never
+    see a half-applied update. Behaviour records and matrices inside a
+    published version are never mutated; the next version shares every
+    part of them that a feedback batch did not change.
+    """
+    resource_catalog: ResourceCatalog
+    user_behavior_history: BehaviorHistory
+    behavior_matrix: UserItemMatrix
+    behavior_seq: int
+    version: int = 0
+    # Bumped only by catalog replacements and market weight updates respectively
+    catalog_version: int = 0
+    market_weights_version: int = 0
+
 class AdvancedRecommendationEngine:
     """
     Advanced recommendation engine with multiple ML algorithms
     """
     
-    def __init__(self):
+    # State restored from the on-disk snapshot on first use, by group. Request
+    # handling on small catalogs only needs the catalog group; the models group
+    # (and scikit-learn) is loaded when predictors or two-stage retrieval are first needed.
+    # Requests predict with the flat forests in the models group; the scikit-learn
+    # forests are only loaded by a worker that retrains them.
+    _STATE_GROUPS = {
+        "catalog": ("resource_catalog", "serving", "model_trainer", "item_model", "factor_trainer", "bandit"),
+        "models": ("models", "user_clusterer", "candidate_retriever"),
+        "forests": ("predictor_forests",)
+    }
+    _LAZY_STATE = {name: group for group, names in _STATE_GROUPS.items() for name in names}
+    # Rebuilt on every load rather than saved: behaviour lives in the shared behaviour store,
+    # and the bandit's arm statistics are saved in their own file
+    _DERIVED_STATE = frozenset({"serving", "model_trainer", "item_model", "factor_trainer", "bandit"})
+    # Cache dependency key of results scored with the implicit-feedback factors
+    _FACTOR_DEPENDENCY = "model:factors"
+    
+    def __init__(self, 
+                 retrain_every_events: int = 50, 
+                 retrain_interval_seconds: float = 300.0,
+                 state_store: Optional[EngineStateStore] = None,
+                 behavior_store: Optional[BehaviorStore] = None,
+                 behavior_sync_interval_seconds: float = 1.0,
+                 stage_timeout_seconds: float = 0.5,
+                 two_stage_min_catalog: int = 50000,
+                 num_alternatives: int = 2,
+                 enrollment_source: Optional[PlatformEnrollmentSource] = None,
+                 enrollment_poll_interval_seconds: float = 5.0,
+                 bandit_save_interval_seconds: float = 60.0):
         self.algorithms = {
             RecommendationAlgorithm.COLLABORATIVE_FILTERING: self._collaborative_filtering,
             RecommendationAlgorithm.CONTENT_BASED: self._content_based_filtering,
             RecommendationAlgorithm.HYBRID: self._hybrid_recommendation,
-            RecommendationAlgorithm.MULTI_OBJECTIVE: self._multi_objective_optimization
+            RecommendationAlgorithm.MULTI_OBJECTIVE: self._multi_objective_optimization,
+            RecommendationAlgorithm.REINFORCEMENT_LEARNING: self._reinforcement_learning
         }
         
         self.user_profiles = {}
-        self.resource_database = self._initialize_resource_database()
-        self.user_behavior_history = self._initialize_behavior_data()
-        self.skill_taxonomy = self._load_skill_taxonomy()
         self.market_weights = self._load_market_weights()
+        self.skill_taxonomy = self._load_skill_taxonomy()
+        self.pathway_optimizer = ParetoPathwayOptimizer(time_budget_ms=50.0)
+        self.recommendation_cache = RecommendationCache(max_entries=1024, ttl_seconds=600.0)
+        self.stage_pipeline = StagePipeline(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="hybrid-stage")
+        self.stage_timeout_seconds = stage_timeout_seconds
+        self.stage_timings = StageTimings()
+        self.two_stage_min_catalog = two_stage_min_catalog
+        self.num_alternatives = num_alternatives
+        self._predictions: Optional[Tuple[ModelSnapshot, ResourceCatalog, np.ndarray]] = None
+        self.pathway_store = PathwayStore(max_entries=4096,
+                                          spill_dir=os.environ.get("RECOMMENDATION_PATHWAY_SPILL_DIR"))
+        
+        self.retrain_every_events = retrain_every_events
+        self.retrain_interval_seconds = retrain_interval_seconds
+        self.state_store = state_store or EngineStateStore()
+        self._state_lock = threading.RLock()
+        self._state_loading: Dict[str, int] = {}
+        self._state_loaded = set()
+        
+        # Learner behaviour is shared by all workers through the behaviour store.
+        # The lock only serializes writers; readers use the published serving state.
+        self.behavior_store = behavior_store or BehaviorStore()
+        self.behavior_sync_interval_seconds = behavior_sync_interval_seconds
+        self._behavior_lock = threading.RLock()
+        self._behavior_synced_at = 0.0
+        self._pinned = threading.local()
+        # Feedback is applied by a background thread, started on first use, never on the request path
+        self._sync_thread: Optional[threading.Thread] = None
+        self._sync_start_lock = threading.Lock()
+        self._sync_wake = threading.Event()
+        self._sync_stop = threading.Event()
+        # Enrollments, progress and quiz attempts from the learning platform feed the item-item model
+        self.enrollment_source = enrollment_source or PlatformEnrollmentSource()
+        self.enrollment_poll_interval_seconds = enrollment_poll_interval_seconds
+        self._enrollments_polled_at = time.monotonic()
+        self.bandit_save_interval_seconds = bandit_save_interval_seconds
+        self._bandit_saved_at = time.monotonic()
+        # Per-learner count of applied feedback batches and platform interactions, versioning stored results
+        self._learner_versions: Dict[str, int] = {}
+        # Counts of published predictor and implicit-factor models, versioning stored results
+        self._models_version = 0
+        self._factors_version = 0
+        self.materializer = RecommendationMaterializer(self)
+    
+    def __getattr__(self, name: str):
+        # Only called for attributes not yet set; loads their state group on first access
+        group = AdvancedRecommendationEngine._LAZY_STATE.get(name)
+        loading = self.__dict__.get("_state_loading")
+        # A group's own loader reading a missing attribute must not recurse
+        if group is not None and loading is not None and loading.get(group) != threading.get_ident():
+            self._ensure_state(group)
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    def _ensure_state(self, *groups: str):
+        """Load saved state groups, building and saving any that are missing or stale"""
+        for group in groups or self._STATE_GROUPS:
+            if group in self._state_loaded:
+                continue
+            with self._state_lock:
+                if group in self._state_loaded:
+                    continue
+                self._state_loading[group] = threading.get_ident()
+                try:
+                    getattr(self, f"_load_{group}_state")()
+                    self._state_loaded.add(group)
+                finally:
+                    del self._state_loading[group]
+    
+    def _state_fingerprint(self, catalog_digest: Optional[str] = None) -> str:
+        """Fingerprint of state built from a catalog digest, by default the published catalog's"""
+        return self.state_store.fingerprint(catalog_digest or self.resource_catalog.digest, self.market_weights)
+    
+    def _load_catalog_state(self):
+        resources = self._initialize_resource_database()
+        # The saved catalog is checked against its source records; everything else against the catalog digest
+        self._catalog_source_digest = records_digest(resources)
+        fingerprint = self._state_fingerprint(self._catalog_source_digest)
+        state = self.state_store.load("catalog", fingerprint)
+        
+        if state is None:
+            resource_catalog = ResourceCatalog(resources, self.market_weights)
+            self.state_store.save("catalog", {"resource_catalog": resource_catalog}, fingerprint)
+            # Continue on the memory-mapped copy, so the building process shares pages with the others too
+            state = self.state_store.load("catalog", fingerprint)
+        if state is not None:
+            resource_catalog = state["resource_catalog"]
         
-        # ML Models
-        self.tfidf_vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.satisfaction_predictor = RandomForestRegressor(n_estimators=100)
-        self.employment_predictor = RandomForestRegressor(n_estimators=100)
-        self.user_clusterer = KMeans(n_clusters=10, random_state=42)
+        self._load_behavior(resource_catalog)
+        
+        # Feedback refreshes the predictors on a background thread
+        self.model_trainer = BackgroundModelTrainer(
+            resource_catalog,
+            current_models=lambda: self.models,
+            full_models=self._models_with_forests,
+            publish=self._publish_models,
+            retrain_every_events=self.retrain_every_events,
+            retrain_interval_seconds=self.retrain_interval_seconds
+        )
+        # Implicit-feedback factors are retrained from the published behaviour matrix on another thread
+        self.factor_trainer = BackgroundFactorTrainer(
+            current_matrix=lambda: self.serving.behavior_matrix,
+            on_publish=self._on_factors_published
+        )
+        self.bandit = self._load_bandit(resource_catalog)
+    
+    def _load_models_state(self):
+        fingerprint = self._state_fingerprint()
+        state = self.state_store.load("models", fingerprint)
+        
+        if state is None:
+            # scikit-learn is only imported when models have to be built from scratch
+            from sklearn.cluster import KMeans
+            
+            # ML Models
+            self.user_clusterer = KMeans(n_clusters=10, random_state=42)
+            self._train_models()
+            self.state_store.save("models", self._state_snapshot("models"), fingerprint)
+            self.state_store.save("forests", self._state_snapshot("forests"), fingerprint)
+            state = self.state_store.load("models", fingerprint)
+        if state is not None:
+            for name, value in state.items():
+                setattr(self, name, value)
+            # The saved retriever was built for a catalog with this fingerprint, i.e. the current one
+            self.candidate_retriever.catalog_version = self._state.catalog_version
+    
+    def _load_forests_state(self):
+        models = self.models
+        fingerprint = self._state_fingerprint()
+        state = self.state_store.load("forests", fingerprint)
+        
+        if state is None:
+            logger.warning("⚠️ Saved predictor forests are missing, retraining the models")
+            self._train_models()
+            models = self.models
+            self.predictor_forests = (models.satisfaction_predictor, models.employment_predictor)
+            self.state_store.save("models", self._state_snapshot("models"), fingerprint)
+            self.state_store.save("forests", self._state_snapshot("forests"), fingerprint)
+        else:
+            for name, value in state.items():
+                setattr(self, name, value)
+    
+    def _state_snapshot(self, group: str) -> Dict[str, Any]:
+        if group == "forests":
+            models = self._models_with_forests()
+            return {"predictor_forests": (models.satisfaction_predictor, models.employment_predictor)}
+        
+        names = [name for name in self._STATE_GROUPS[group] if name not in self._DERIVED_STATE]
+        snapshot = {name: getattr(self, name) for name in names}
+        if "models" in snapshot:
+            # The scikit-learn forests are saved as their own group
+            snapshot["models"] = snapshot["models"].without_forests()
+        return snapshot
+    
+    def preload_state(self):
+        """
+        Build (if needed) and map the state every worker serves from. Call it
+        in the parent process before workers are forked, e.g. from a gunicorn
+        preload: the snapshots are written once and every worker inherits
+        read-only mappings of the same files instead of building its own copy.
+        """
+        self._ensure_state("catalog", "models")
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Shared versus private resident memory of this worker, including the mapped engine state"""
+        return process_memory(self.state_store.directory)
+    
+    def get_bandit_stats(self) -> Dict[str, Any]:
+        """Online learning state of the reinforcement learning mode"""
+        return self.bandit.get_stats()
+    
+    def get_stage_timings(self) -> Dict[str, Any]:
+        """
+        Where single-learner request time goes, per recommendation stage, and
+        how often hybrid stages missed their deadline, failed or ran inline
+        """
+        return {**self.stage_timings.get_stats(), "hybrid_pipeline": self.stage_pipeline.get_stats()}
+    
+    def save_state(self):
+        """Persist the current catalog and models for the next startup"""
+        with self._state_lock:
+            self._ensure_state()
+            for group in self._STATE_GROUPS:
+                digest = self._catalog_source_digest if group == "catalog" else None
+                self.state_store.save(group, self._state_snapshot(group), self._state_fingerprint(digest))
+            self.bandit.save(self._bandit_path())
+    
+    def _bandit_path(self) -> str:
+        return os.path.join(self.state_store.directory, "bandit_state.npz")
+    
+    def _load_bandit(self, resource_catalog: ResourceCatalog) -> LinUCBBandit:
+        """The saved bandit, caught up on feedback logged since it was saved"""
+        bandit = LinUCBBandit.load(self._bandit_path(), resource_catalog.ids()) or LinUCBBandit(resource_catalog.ids())
+        events = self.behavior_store.events_since(bandit.seq)
+        if events is None:
+            logger.warning("⚠️ Feedback since the bandit was saved has been compacted; continuing without it")
+            bandit.seq = self.serving.behavior_seq
+        else:
+            bandit.update_events(events)
+        logger.info(f"✅ Bandit ready with {bandit.updates} feedback updates")
+        return bandit
+    
+    def _save_bandit_if_due(self):
+        if time.monotonic() - self._bandit_saved_at >= self.bandit_save_interval_seconds:
+            self._bandit_saved_at = time.monotonic()
+            self.bandit.save(self._bandit_path())
+    
+    def _publish_serving(self, state: ServingState):
+        """Atomically swap in a new serving state version; callers hold the behaviour lock"""
+        self.serving = state
+    
+    @contextmanager
+    def _pinned_state(self, state: Optional[ServingState] = None) -> Iterator[ServingState]:
+        """
+        Pin a serving state version (default: the current one) for this
+        thread, so everything one request reads comes from a single version.
+        Nested pins reuse the outer one.
+        """
+        pinned = getattr(self._pinned, "state", None)
+        if pinned is not None:
+            yield pinned
+            return
+        self._pinned.state = state or self.serving
+        try:
+            yield self._pinned.state
+        finally:
+            self._pinned.state = None
+    
+    def _bound_to_state(self, fn):
+        """fn wrapped to run under this thread's serving state, for stages on pool threads"""
+        state = self._state
         
-        self._train_models()
+        def bound(*args, **kwargs):
+            with self._pinned_state(state):
+                return fn(*args, **kwargs)
+        return bound
+    
+    @property
+    def _state(self) -> ServingState:
+        pinned = getattr(self._pinned, "state", None)
+        return pinned if pinned is not None else self.serving
+    
+    @property
+    def resource_catalog(self) -> ResourceCatalog:
+        return self._state.resource_catalog
+    
+    @property
+    def user_behavior_history(self) -> Mapping[str, UserBehavior]:
+        return self._state.user_behavior_history
+    
+    @property
+    def behavior_matrix(self) -> UserItemMatrix:
+        return self._state.behavior_matrix
+    
+    @property
+    def satisfaction_predictor(self) -> "RandomForestRegressor":
+        return self._models_with_forests().satisfaction_predictor
+    
+    @property
+    def employment_predictor(self) -> "RandomForestRegressor":
+        return self._models_with_forests().employment_predictor
+    
+    def _models_with_forests(self) -> ModelSnapshot:
+        """The current models with their scikit-learn forests, loading the saved forests on first need"""
+        models = self.models
+        if models.satisfaction_predictor is None:
+            satisfaction_predictor, employment_predictor = self.predictor_forests
+            models = replace(models, satisfaction_predictor=satisfaction_predictor,
+                             employment_predictor=employment_predictor)
+        return models
+    
+    def _publish_models(self, models: ModelSnapshot):
+        """Atomically swap in a newly trained set of predictors and drop results predicted with the old ones"""
+        self.models = models
+        self._models_version += 1
+        self.recommendation_cache.clear()
     
     def _initialize_resource_database(self) -> List[LearningResource]:
         """Initialize comprehensive learning resource database"""
@@ -121,7 +446,8 @@ class AdvancedRecommendationEngine:
                 skills_covered=["python", "data_analysis", "pandas", "numpy"],
                 prerequisites=["basic_programming"],
                 success_rate=0.85,
-                user_ratings=[4.2, 4.5, 4.1, 4.3, 4.6],
+                rating_count=5,
+                rating_sum=21.7,
                 employment_impact=0.78,
                 salary_impact=0.65,
                 tags=["programming", "data_science", "beginner_friendly"]
@@ -138,7 +464,8 @@ class AdvancedRecommendationEngine:
                 skills_covered=["cloud_computing", "aws", "infrastructure"],
                 prerequisites=["basic_networking", "linux_basics"],
                 success_rate=0.72,
-                user_ratings=[4.0, 4.2, 3.9, 4.1, 4.3],
+                rating_count=5,
+                rating_sum=20.5,
                 employment_impact=0.82,
                 salary_impact=0.75,
                 tags=["cloud", "certification", "high_demand"]
@@ -155,7 +482,8 @@ class AdvancedRecommendationEngine:
                 skills_covered=["web_development", "javascript", "database", "ui_ux"],
                 prerequisites=["html_css", "javascript_basics", "database_basics"],
                 success_rate=0.68,
-                user_ratings=[4.4, 4.6, 4.2, 4.5, 4.7],
+                rating_count=5,
+                rating_sum=22.4,
                 employment_impact=0.88,
                 salary_impact=0.80,
                 tags=["project", "portfolio", "industry_experience"]
@@ -172,7 +500,8 @@ class AdvancedRecommendationEngine:
                 skills_covered=["digital_marketing", "seo", "social_media"],
                 prerequisites=[],
                 success_rate=0.90,
-                user_ratings=[4.1, 4.0, 4.2, 3.9, 4.3],
+                rating_count=5,
+                rating_sum=20.5,
                 employment_impact=0.60,
                 salary_impact=0.45,
                 tags=["marketing", "self_paced", "affordable"]
@@ -189,7 +518,8 @@ class AdvancedRecommendationEngine:
                 skills_covered=["machine_learning", "career_guidance", "industry_insights"],
                 prerequisites=["python", "statistics", "basic_ml"],
                 success_rate=0.95,
-                user_ratings=[4.8, 4.9, 4.7, 4.8, 4.9],
+                rating_count=5,
+                rating_sum=24.1,
                 employment_impact=0.92,
                 salary_impact=0.85,
                 tags=["mentorship", "personalized", "premium"]
@@ -197,14 +527,14 @@ class AdvancedRecommendationEngine:
         ]
         return resources
     
-    def _initialize_behavior_data(self) -> Dict[str, UserBehavior]:
+    def _initialize_behavior_data(self, resource_catalog: ResourceCatalog) -> Dict[str, UserBehavior]:
         """Initialize user behavior data for collaborative filtering"""
         # Simulated user behavior data
         behavior_data = {}
         
         for i in range(100):  # 100 simulated users
             user_id = f"user_{i:03d}"
-            completed = np.random.choice([res.id for res in self.resource_database], 
+            completed = np.random.choice(resource_catalog.ids(), 
                                        size=np.random.randint(1, 6), replace=False).tolist()
             
             ratings = {res_id: np.random.uniform(3.0, 5.0) for res_id in completed}
@@ -223,16 +553,209 @@ class AdvancedRecommendationEngine:
         
         return behavior_data
     
-    def _load_skill_taxonomy(self) -> Dict[str, List[str]]:
-        """Load hierarchical skill taxonomy"""
-        return {
-            "programming": ["python", "java", "javascript", "c++", "go"],
-            "data_science": ["machine_learning", "statistics", "data_visualization", "deep_learning"],
-            "web_development": ["html", "css", "react", "angular", "node_js"],
-            "cloud_computing": ["aws", "azure", "gcp", "docker", "kubernetes"],
-            "digital_marketing": ["seo", "social_media", "content_marketing", "ppc"],
-            "project_management": ["agile", "scrum", "risk_management", "stakeholder_management"]
-        }
+    @staticmethod
+    def _copy_behavior(user_behavior: UserBehavior) -> UserBehavior:
+        """Copy of a behaviour record with its own containers, for building the next version"""
+        return replace(
+            user_behavior,
+            completed_resources=list(user_behavior.completed_resources),
+            resource_ratings=dict(user_behavior.resource_ratings),
+            time_spent=dict(user_behavior.time_spent),
+            skill_assessments=dict(user_behavior.skill_assessments),
+            career_progress=list(user_behavior.career_progress),
+            learning_patterns=dict(user_behavior.learning_patterns),
+            preferences=dict(user_behavior.preferences)
+        )
+    
+    def _new_user_behavior(self, user_id: str) -> UserBehavior:
+        return UserBehavior(
+            user_id=user_id,
+            completed_resources=[],
+            resource_ratings={},
+            time_spent={},
+            skill_assessments={},
+            career_progress=[],
+            learning_patterns={},
+            preferences={}
+        )
+    
+    def _load_behavior(self, resource_catalog: ResourceCatalog):
+        """Load every learner's behaviour from the shared store, seeding it on first run"""
+        with self._behavior_lock:
+            if self.behavior_store.last_seq() == 0:
+                self.behavior_store.seed([
+                    FeedbackEvent(user_id, resource_id, rating=behavior.resource_ratings.get(resource_id),
+                                  completed=True, time_spent=behavior.time_spent.get(resource_id))
+                    for user_id, behavior in self._initialize_behavior_data(resource_catalog).items()
+                    for resource_id in behavior.completed_resources
+                ])
+            
+            records, behavior_seq = self.behavior_store.load(self._new_user_behavior)
+            user_behavior_history = BehaviorHistory(records)
+            previous = self.__dict__.get("serving")
+            self._publish_serving(ServingState(
+                resource_catalog=resource_catalog,
+                user_behavior_history=user_behavior_history,
+                behavior_matrix=UserItemMatrix(resource_catalog, user_behavior_history.values()),
+                behavior_seq=behavior_seq,
+                version=previous.version + 1 if previous is not None else 0,
+                catalog_version=previous.catalog_version if previous is not None else 0,
+                market_weights_version=previous.market_weights_version if previous is not None else 0
+            ))
+            self._behavior_synced_at = time.monotonic()
+            logger.info(f"✅ Loaded behaviour for {len(user_behavior_history)} learners")
+            self._load_item_model(resource_catalog, user_behavior_history)
+    
+    def _load_item_model(self, resource_catalog: ResourceCatalog, user_behavior_history: Mapping[str, UserBehavior]):
+        """Build the item-item model from stored feedback and the platform's full interaction history"""
+        item_model = ItemCooccurrenceModel()
+        for user_id, behavior in user_behavior_history.items():
+            rated_only = [resource_id for resource_id in behavior.resource_ratings
+                          if resource_id not in behavior.completed_resources]
+            for resource_id in behavior.completed_resources + rated_only:
+                item_model.add(user_id, resource_id)
+        
+        self._map_platform_courses(resource_catalog)
+        self.enrollment_source.reset()
+        item_model.add_all(self.enrollment_source.poll())
+        self.item_model = item_model
+        stats = item_model.get_stats()
+        logger.info(f"✅ Item-item model built: {stats['items']} items, {stats['learners']} learners")
+    
+    def _map_platform_courses(self, resource_catalog: ResourceCatalog):
+        self.enrollment_source.map_titles({
+            normalize_title(title): resource_id
+            for resource_id, title in zip(resource_catalog.ids(), resource_catalog.titles)
+        })
+    
+    def _poll_enrollments(self):
+        """
+        Feed new learning platform interactions to the item-item model, at
+        most once per enrollment_poll_interval_seconds. Runs on the behaviour
+        sync thread; the platform database is read outside the behaviour lock.
+        """
+        if time.monotonic() - self._enrollments_polled_at < self.enrollment_poll_interval_seconds:
+            return
+        self._enrollments_polled_at = time.monotonic()
+        interactions = self.enrollment_source.poll()
+        if not interactions:
+            return
+        with self._behavior_lock:
+            learners = {interaction.user_id for interaction in interactions
+                        if self.item_model.add(interaction.user_id, interaction.item_id)}
+            if learners:
+                self._bump_learner_versions(learners)
+                self.recommendation_cache.invalidate_skills(self._learner_keys(learners))
+    
+    def _bump_learner_versions(self, user_ids):
+        """Mark these learners' own history as changed; callers hold the behaviour lock"""
+        for user_id in user_ids:
+            self._learner_versions[user_id] = self._learner_versions.get(user_id, 0) + 1
+    
+    @staticmethod
+    def _learner_keys(user_ids) -> List[str]:
+        """Cache dependency keys for results built from these learners' own history"""
+        return [f"learner:{user_id}" for user_id in user_ids]
+    
+    def _ensure_behavior_sync(self):
+        """Start the thread that applies behaviour store feedback, if it is not running yet"""
+        if self._sync_thread is not None:
+            return
+        with self._sync_start_lock:
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._run_behavior_sync, name="behavior-sync", daemon=True)
+                self._sync_thread.start()
+    
+    def stop_behavior_sync(self, timeout: float = 5.0):
+        """Stop the behaviour sync thread"""
+        self._sync_stop.set()
+        self._sync_wake.set()
+        if self._sync_thread is not None:
+            self._sync_thread.join(timeout)
+    
+    def _run_behavior_sync(self):
+        # Every interval, or sooner when woken, apply all new events as one batch
+        while not self._sync_stop.is_set():
+            self._sync_wake.wait(self.behavior_sync_interval_seconds)
+            self._sync_wake.clear()
+            if self._sync_stop.is_set():
+                break
+            try:
+                self._sync_behavior(force=True)
+            except Exception as e:
+                logger.error(f"❌ Behaviour sync failed: {e}")
+    
+    def _sync_behavior(self, force: bool = False):
+        """Apply feedback written to the behaviour store by any worker since the last sync"""
+        if not force and time.monotonic() - self._behavior_synced_at < self.behavior_sync_interval_seconds:
+            return
+        if "catalog" not in self._state_loaded:
+            # Loading reads the whole store; a sync must not start a load while holding the behaviour lock
+            return
+        with self._behavior_lock:
+            events = self.behavior_store.events_since(self.serving.behavior_seq)
+            if events is None:
+                # Another worker compacted events this one had not seen yet
+                self._load_behavior(self.serving.resource_catalog)
+                self.factor_trainer.request_retrain()
+                self.recommendation_cache.clear()
+                self.materializer.clear()
+                return
+            self._apply_feedback_events(events)
+            self._behavior_synced_at = time.monotonic()
+        self._poll_enrollments()
+        self._save_bandit_if_due()
+    
+    def _apply_feedback_events(self, events: List[FeedbackEvent]):
+        """Fold events into a new serving state version and publish it; callers hold the behaviour lock"""
+        if not events:
+            return
+        state = self.serving
+        catalog = state.resource_catalog
+        behavior_seq = state.behavior_seq
+        
+        # Users touched by this batch get fresh records; the published ones are never mutated
+        updated_behaviors: Dict[str, UserBehavior] = {}
+        previous_skills: Dict[str, set] = {}
+        changed_users = set()
+        for event in events:
+            if event.user_id not in previous_skills:
+                current = state.user_behavior_history.get(event.user_id)
+                previous_skills[event.user_id] = self._completed_skills(current, catalog) if current else set()
+                updated_behaviors[event.user_id] = (
+                    self._copy_behavior(current) if current else self._new_user_behavior(event.user_id)
+                )
+            
+            if BehaviorStore.apply(updated_behaviors[event.user_id], event):
+                changed_users.add(event.user_id)
+            self.item_model.add(event.user_id, event.resource_id)
+            
+            # Models are refreshed in the background, never on the request path
+            self.model_trainer.submit(event.resource_id, event.feedback())
+            behavior_seq = max(behavior_seq, event.seq)
+        self.factor_trainer.notify(len(events))
+        # The bandit learns online from every event: O(d^2) per event, no retraining
+        self.bandit.update_events(events)
+        
+        self._publish_serving(replace(
+            state,
+            user_behavior_history=state.user_behavior_history.updated(updated_behaviors),
+            behavior_matrix=state.behavior_matrix.updated(updated_behaviors.values()),
+            behavior_seq=behavior_seq,
+            version=state.version + 1
+        ))
+        
+        # Drop cached results whose similar-learner neighbourhood these users can affect
+        affected_skills = set()
+        for user_id in changed_users:
+            affected_skills |= previous_skills[user_id] | self._completed_skills(updated_behaviors[user_id], catalog)
+        affected_skills.update(self._learner_keys(previous_skills))
+        self.recommendation_cache.invalidate_skills(affected_skills)
+        self._bump_learner_versions(previous_skills)
+    
+    def _load_skill_taxonomy(self) -> SkillTaxonomy:
+        """Load hierarchical skill taxonomy index from its data file"""
+        return load_skill_taxonomy()
     
     def _load_market_weights(self) -> Dict[str, float]:
         """Load market demand weights for skills"""
@@ -248,261 +771,692 @@ class AdvancedRecommendationEngine:
     
     def _train_models(self):
         """Train ML models for recommendation"""
-        # Prepare training data
-        resource_features = []
-        satisfaction_scores = []
-        employment_outcomes = []
-        
-        for resource in self.resource_database:
-            features = [
-                resource.nsqf_level,
-                resource.duration_hours,
-                np.log(resource.cost + 1),
-                len(resource.skills_covered),
-                resource.success_rate,
-                np.mean(resource.user_ratings) if resource.user_ratings else 4.0,
-                resource.employment_impact,
-                resource.salary_impact
-            ]
-            resource_features.append(features)
-            satisfaction_scores.append(np.mean(resource.user_ratings) if resource.user_ratings else 4.0)
-            employment_outcomes.append(resource.employment_impact)
+        from sklearn.ensemble import RandomForestRegressor
+        
+        catalog = self.resource_catalog
+        satisfaction_scores = catalog.ratings_or(4.0)
+        resource_features = catalog.model_features(satisfaction_scores)
+        
+        satisfaction_predictor = RandomForestRegressor(n_estimators=100)
+        employment_predictor = RandomForestRegressor(n_estimators=100)
         
         # Train satisfaction predictor
         if len(resource_features) > 1:
-            self.satisfaction_predictor.fit(resource_features, satisfaction_scores)
-            self.employment_predictor.fit(resource_features, employment_outcomes)
+            satisfaction_predictor.fit(resource_features, satisfaction_scores)
+            employment_predictor.fit(resource_features, catalog.employment_impact)
         
+        self._publish_models(ModelSnapshot(
+            satisfaction_predictor=satisfaction_predictor,
+            employment_predictor=employment_predictor,
+            version=1,
+            trained_at=datetime.now(),
+            training_events=0
+        ))
+        self.candidate_retriever = self._build_candidate_retriever(catalog, self.behavior_matrix,
+                                                                   self._state.catalog_version)
         logger.info("✅ ML models trained successfully")
     
+    def _build_candidate_retriever(self, 
+                                   catalog: ResourceCatalog,
+                                   behavior_matrix: UserItemMatrix,
+                                   catalog_version: int) -> CandidateRetriever:
+        """Cluster learner skill profiles and precompute candidate lists for two-stage retrieval"""
+        user_skills, user_ratings = behavior_matrix.user_matrices()
+        return CandidateRetriever(catalog, user_skills, user_ratings, self.user_clusterer,
+                                  catalog_version=catalog_version)
+    
     def generate_personalized_recommendations(self, 
                                             user_profile: Dict[str, Any],
                                             objectives: List[PathwayObjective] = None,
                                             algorithm: RecommendationAlgorithm = None,
-                                            max_resources: int = 10) -> RecommendationResult:
+                                            max_resources: int = 10,
+                                            diversity: float = 0.5) -> RecommendationResult:
         """
-        Generate personalized learning pathway recommendations
+        Generate personalized learning pathway recommendations.
+        diversity (0-1) trades relevance for variety among the alternative pathways.
         """
+        return self._personalized_recommendations(user_profile, objectives, algorithm, max_resources, diversity)[0]
+    
+    def _personalized_recommendations(self, 
+                                      user_profile: Dict[str, Any],
+                                      objectives: List[PathwayObjective] = None,
+                                      algorithm: RecommendationAlgorithm = None,
+                                      max_resources: int = 10,
+                                      diversity: float = 0.5) -> Tuple[RecommendationResult, bool]:
+        """Recommendations and whether they may be kept: built from the current state with no stage degraded"""
         try:
             objectives = objectives or [PathwayObjective.BALANCE_ALL]
             algorithm = algorithm or RecommendationAlgorithm.HYBRID
+            self._ensure_behavior_sync()
             
-            # Select and apply recommendation algorithm
-            if algorithm in self.algorithms:
-                recommendations = self.algorithms[algorithm](user_profile, objectives, max_resources)
-            else:
-                recommendations = self._hybrid_recommendation(user_profile, objectives, max_resources)
-            
-            # Calculate confidence score
-            confidence = self._calculate_confidence_score(recommendations, user_profile)
-            
-            # Evaluate objectives
-            objectives_met = self._evaluate_objectives(recommendations, objectives, user_profile)
-            
-            # Calculate personalization factors
-            personalization_factors = self._calculate_personalization_factors(recommendations, user_profile)
-            
-            # Estimate outcomes
-            estimated_outcomes = self._estimate_outcomes(recommendations, user_profile)
-            
-            # Generate alternative pathways
-            alternative_pathways = self._generate_alternatives(user_profile, recommendations, 3)
-            
-            result = RecommendationResult(
-                pathway_id=f"pathway_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                resources=recommendations,
-                confidence_score=confidence,
-                algorithm_used=algorithm,
-                objectives_met=objectives_met,
-                personalization_factors=personalization_factors,
-                estimated_outcomes=estimated_outcomes,
-                alternative_pathways=alternative_pathways
-            )
-            
-            logger.info(f"✅ Generated recommendations using {algorithm.value}")
-            return result
+            with self._pinned_state() as state:
+                context = RecommendationContext(self, user_profile, objectives, algorithm, max_resources, diversity)
+                with context.timed("cache_lookup"):
+                    cache_key = canonical_profile_key(user_profile, objectives, algorithm, max_resources, diversity)
+                    cached = self.recommendation_cache.get(cache_key)
+                if cached is not None:
+                    self.pathway_store.put(cached, user_profile)
+                    self.stage_timings.add(context)
+                    return cached, True
+                
+                # Select and apply recommendation algorithm. Content relevance is scored
+                # once and shared by the algorithm and the alternatives.
+                if algorithm in self.algorithms and algorithm != RecommendationAlgorithm.HYBRID:
+                    relevance = self._relevance([context])[0]
+                    recommendations = self.algorithms[algorithm](context, max_resources, relevance)
+                else:
+                    outputs = self._run_hybrid_pipeline(context, max_resources)
+                    recommendations, relevance = outputs["combined"], outputs["relevance"]
+                
+                result = self._build_result(context, recommendations, relevance)
+                # A result built from a version that feedback has since replaced is not kept, nor
+                # one missing a stage that timed out or failed; a bandit ranking, which every
+                # feedback event can change, is not cached
+                keep = self.serving is state and not context.degraded_stages
+                if keep and algorithm != RecommendationAlgorithm.REINFORCEMENT_LEARNING:
+                    self.recommendation_cache.put(cache_key, result, self._behavior_dependency(context))
+                self.pathway_store.put(result, user_profile)
+                self.stage_timings.add(context)
+                
+                logger.info(f"✅ Generated recommendations using {algorithm.value}")
+                return result, keep
             
         except Exception as e:
             logger.error(f"❌ Error generating recommendations: {e}")
-            return self._get_fallback_recommendations(user_profile)
+            result = self._get_fallback_recommendations(user_profile)
+            self.pathway_store.put(result, user_profile)
+            return result, False
     
-    def _collaborative_filtering(self, 
-                                user_profile: Dict[str, Any], 
-                                objectives: List[PathwayObjective],
-                                max_resources: int) -> List[LearningResource]:
+    def get_learner_recommendations(self, 
+                                    user_profile: Dict[str, Any],
+                                    objectives: List[PathwayObjective] = None,
+                                    algorithm: RecommendationAlgorithm = None,
+                                    max_resources: int = 10,
+                                    diversity: float = 0.5) -> Tuple[RecommendationResult, bool]:
         """
-        Collaborative filtering based on similar users
+        Recommendations for a returning learner (profile with user_id). The
+        learner's materialized result is served while the inputs it was
+        built from are unchanged; otherwise it is computed now, stored and
+        kept fresh in the background. Returns the result and whether it
+        came from the materialized store. Anonymous profiles and the
+        bandit, whose rankings change with every feedback event, are
+        always computed.
         """
-        user_skills = user_profile.get("prior_skills", [])
-        user_aspirations = user_profile.get("career_aspirations", "")
+        objectives = objectives or [PathwayObjective.BALANCE_ALL]
+        algorithm = algorithm or RecommendationAlgorithm.HYBRID
+        user_id = str(user_profile.get("user_id") or "")
+        if not user_id or algorithm == RecommendationAlgorithm.REINFORCEMENT_LEARNING:
+            return self.generate_personalized_recommendations(user_profile, objectives, algorithm,
+                                                              max_resources, diversity), False
         
-        # Find similar users
-        similar_users = self._find_similar_users(user_profile)
+        self._ensure_behavior_sync()
+        request = MaterializedRequest(tuple(objectives), algorithm, max_resources, diversity)
+        inputs = self._materialization_inputs(user_profile, request)
+        result = self.materializer.get(user_id, inputs)
+        if result is not None:
+            self.pathway_store.put(result, user_profile)
+            return result, True
         
-        # Get resources that similar users completed and rated highly
-        recommended_resource_ids = []
-        resource_scores = {}
+        result, keep = self._personalized_recommendations(user_profile, objectives, algorithm, max_resources, diversity)
+        if keep:
+            self.materializer.store(user_id, user_profile, request, inputs, result)
+        return result, False
+    
+    def _materialization_inputs(self, user_profile: Dict[str, Any], request: MaterializedRequest) -> InputVersion:
+        """Current version of every input a learner's stored result depends on"""
+        state = self.serving
+        return InputVersion(
+            profile_key=canonical_profile_key(user_profile, list(request.objectives), request.algorithm,
+                                              request.max_resources, request.diversity),
+            feedback_version=self._learner_versions.get(str(user_profile.get("user_id") or ""), 0),
+            catalog_version=state.catalog_version,
+            market_weights_version=state.market_weights_version,
+            models_version=self._models_version,
+            factors_version=self._factors_version
+        )
+    
+    def _behavior_dependency(self, context: RecommendationContext) -> Optional[List[str]]:
+        """Skills whose learners' feedback can change this result, or None if feedback cannot"""
+        if context.algorithm in (RecommendationAlgorithm.CONTENT_BASED, RecommendationAlgorithm.MULTI_OBJECTIVE):
+            return None
+        dependency = context.prior_skills + self._learner_keys([context.user_id] if context.user_id else [])
+        if context.user_id or context.recent_items:
+            dependency.append(self._FACTOR_DEPENDENCY)
+        return dependency
+    
+    def _on_factors_published(self, factors: FactorSnapshot):
+        """Drop cached results scored with the previous factors and mark stored ones stale"""
+        self._factors_version += 1
+        self.recommendation_cache.invalidate_skills([self._FACTOR_DEPENDENCY])
+    
+    def generate_batch_recommendations(self, 
+                                       user_profiles: List[Dict[str, Any]],
+                                       objectives: List[PathwayObjective] = None,
+                                       algorithm: RecommendationAlgorithm = None,
+                                       max_resources: int = 10,
+                                       processes: int = 0,
+                                       block_size: int = 256,
+                                       diversity: float = 0.5,
+                                       record_pathways: bool = True) -> List[RecommendationResult]:
+        """
+        Generate recommendations for a cohort of learners.
+        Catalog terms and similarity structures are shared across the batch and
+        content/collaborative scoring runs as matrix operations over blocks of
+        profiles. With processes > 1, blocks are spread over a process pool.
+        record_pathways=False skips recording the results in the pathway store,
+        for results computed ahead of being served.
+        """
+        objectives = objectives or [PathwayObjective.BALANCE_ALL]
+        algorithm = algorithm or RecommendationAlgorithm.HYBRID
+        self._ensure_behavior_sync()
+        blocks = [user_profiles[i:i + block_size] for i in range(0, len(user_profiles), block_size)]
         
-        for similar_user_id in similar_users[:10]:  # Top 10 similar users
-            if similar_user_id in self.user_behavior_history:
-                user_behavior = self.user_behavior_history[similar_user_id]
-                
-                for resource_id, rating in user_behavior.resource_ratings.items():
-                    if rating >= 4.0 and resource_id not in recommended_resource_ids:
-                        if resource_id in resource_scores:
-                            resource_scores[resource_id] += rating
-                        else:
-                            resource_scores[resource_id] = rating
+        if processes > 1 and len(blocks) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            global _batch_engine
+            # Load state before forking so workers inherit it rather than each loading it
+            self._ensure_state("catalog", "models")
+            _batch_engine = self
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("fork")) as pool:
+                block_results = pool.map(_recommend_batch_block,
+                                         [(block, objectives, algorithm, max_resources, diversity) for block in blocks])
+                results = [result for results in block_results for result in results]
+        else:
+            results = []
+            # Every block of the cohort reads the same serving state version
+            with self._pinned_state():
+                for block in blocks:
+                    results.extend(self._recommend_block(block, objectives, algorithm, max_resources, diversity))
         
-        # Sort by score and filter resources
-        sorted_resources = sorted(resource_scores.items(), key=lambda x: x[1], reverse=True)
+        if record_pathways:
+            for profile, result in zip(user_profiles, results):
+                self.pathway_store.put(result, profile)
+        return results
+    
+    def _recommend_block(self, 
+                         user_profiles: List[Dict[str, Any]],
+                         objectives: List[PathwayObjective],
+                         algorithm: RecommendationAlgorithm,
+                         max_resources: int,
+                         diversity: float = 0.5) -> List[RecommendationResult]:
+        """Recommendations for one block of profiles with batched scoring"""
+        contexts = [RecommendationContext(self, profile, objectives, algorithm, max_resources, diversity)
+                    for profile in user_profiles]
+        try:
+            relevance = self._relevance(contexts)
+            if algorithm == RecommendationAlgorithm.MULTI_OBJECTIVE:
+                pathways = [self._multi_objective_optimization(context, max_resources, context_relevance)
+                            for context, context_relevance in zip(contexts, relevance)]
+            elif algorithm == RecommendationAlgorithm.REINFORCEMENT_LEARNING:
+                pathways = [self._reinforcement_learning(context, max_resources, context_relevance)
+                            for context, context_relevance in zip(contexts, relevance)]
+            elif algorithm == RecommendationAlgorithm.CONTENT_BASED:
+                pathways = self._content_based_batch(contexts, max_resources, relevance)
+            elif algorithm == RecommendationAlgorithm.COLLABORATIVE_FILTERING:
+                pathways = self._collaborative_batch(contexts, max_resources)
+            else:
+                collaborative = self._collaborative_batch(contexts, max_resources // 2)
+                content = self._content_based_batch(contexts, max_resources // 2, relevance)
+                pathways = [self._combine_hybrid(context, collaborative_recs, content_recs, max_resources)
+                            for context, collaborative_recs, content_recs in zip(contexts, collaborative, content)]
+        except Exception as e:
+            logger.error(f"❌ Error generating batch recommendations: {e}")
+            return [self._get_fallback_recommendations(profile) for profile in user_profiles]
         
-        recommendations = []
-        for resource_id, score in sorted_resources[:max_resources]:
-            resource = self._get_resource_by_id(resource_id)
-            if resource and self._is_resource_suitable(resource, user_profile):
-                recommendations.append(resource)
+        try:
+            return self._build_results(contexts, pathways, relevance)
+        except Exception as e:
+            logger.error(f"❌ Error assembling batch recommendations: {e}")
         
-        return recommendations
+        # Assemble profile by profile, so a failing profile only costs its own result
+        results = []
+        for context, recommendations, context_relevance in zip(contexts, pathways, relevance):
+            try:
+                results.append(self._build_result(context, recommendations, context_relevance))
+            except Exception as e:
+                logger.error(f"❌ Error generating recommendations: {e}")
+                results.append(self._get_fallback_recommendations(context.user_profile))
+        return results
     
-    def _content_based_filtering(self, 
-                                user_profile: Dict[str, Any], 
-                                objectives: List[PathwayObjective],
-                                max_resources: int) -> List[LearningResource]:
+    def _build_result(self, 
+                      context: RecommendationContext,
+                      recommendations: List[LearningResource],
+                      relevance: Optional[ScoredCandidates]) -> RecommendationResult:
+        """Assemble scores, outcomes and alternatives around a recommended pathway"""
+        return self._build_results([context], [recommendations], [relevance])[0]
+    
+    def _build_results(self, 
+                       contexts: List[RecommendationContext],
+                       pathways: List[List[LearningResource]],
+                       relevance: List[Optional[ScoredCandidates]]) -> List[RecommendationResult]:
         """
-        Content-based filtering based on skills and aspirations
+        Assemble scores, outcomes and alternatives around the recommended
+        pathways of a block. Every stage runs once over a profiles x length
+        matrix of catalog rows, padded at the end of each row where valid is
+        False; only the result dicts are built per profile.
         """
-        user_skills = set(user_profile.get("prior_skills", []))
-        career_aspirations = user_profile.get("career_aspirations", "").lower()
-        learning_pace = user_profile.get("learning_pace", "medium")
+        catalog = self.resource_catalog
+        lengths = np.array([len(pathway) for pathway in pathways], dtype=np.intp)
+        valid = np.arange(lengths.max(initial=0))[None, :] < lengths[:, None]
+        rows = np.zeros(valid.shape, dtype=np.intp)
+        rows[valid] = catalog.rows_for([resource for pathway in pathways for resource in pathway])
         
-        # Calculate skill gaps
-        target_skills = self._get_target_skills(career_aspirations)
-        skill_gaps = set(target_skills) - user_skills
+        with RecommendationContext.record_shared(contexts, "ordering"):
+            orders = catalog.prerequisite_orders(rows, valid)
+            rows = np.take_along_axis(rows, orders, axis=1)
+            pathways = [[pathway[i] for i in order[:len(pathway)]] for pathway, order in zip(pathways, orders.tolist())]
         
-        # Score resources based on relevance
-        resource_scores = []
+        # Calculate confidence scores
+        with RecommendationContext.record_shared(contexts, "confidence"):
+            coverage = np.bitwise_or.reduce(np.where(valid[:, :, None], catalog.skill_bitsets(rows), 0), axis=1)
+            confidence = self._calculate_confidence_scores(rows, valid, coverage)
         
-        for resource in self.resource_database:
-            score = 0
-            
-            # Skill coverage score
-            covered_gaps = set(resource.skills_covered) & skill_gaps
-            score += len(covered_gaps) * 10
+        # Evaluate objectives
+        with RecommendationContext.record_shared(contexts, "objectives"):
+            objectives_met = self._evaluate_objectives(rows, valid, contexts)
+        
+        # Calculate personalization factors
+        with RecommendationContext.record_shared(contexts, "personalization"):
+            personalization_factors = self._calculate_personalization_factors(rows, valid, coverage, contexts)
+        
+        # Estimate outcomes
+        with RecommendationContext.record_shared(contexts, "outcomes"):
+            estimated_outcomes = self._estimate_outcomes(rows, valid, contexts, pathways)
+        
+        # Generate alternative pathways, in one pass over the stacked candidate pools
+        with RecommendationContext.record_shared(contexts, "alternatives"):
+            alternatives = self._generate_alternatives_batch(contexts, pathways, relevance, self.num_alternatives,
+                                                             np.where(valid, rows, -1))
+        
+        return [
+            RecommendationResult(
+                pathway_id=self._new_pathway_id("pathway"),
+                resources=recommendations,
+                confidence_score=context_confidence,
+                algorithm_used=context.algorithm,
+                objectives_met=context_objectives,
+                personalization_factors=context_personalization,
+                estimated_outcomes=context_outcomes,
+                alternative_pathways=context_alternatives
+            )
+            for context, recommendations, context_confidence, context_objectives, context_personalization,
+            context_outcomes, context_alternatives in zip(contexts, pathways, confidence.tolist(), objectives_met,
+                                                          personalization_factors, estimated_outcomes, alternatives)
+        ]
+    
+    def _collaborative_filtering(self, 
+                                context: RecommendationContext,
+                                max_resources: int,
+                                relevance: Optional[ScoredCandidates] = None) -> List[LearningResource]:
+        """
+        Collaborative filtering based on similar users
+        """
+        return self._collaborative_batch([context], max_resources)[0]
+    
+    def _collaborative_batch(self, 
+                             contexts: List[RecommendationContext],
+                             max_resources: int) -> List[List[LearningResource]]:
+        """
+        Collaborative filtering for several profiles. Learners with a history
+        are scored with the implicit-feedback factors: their own trained
+        vector, or one folded in from their recent items. Until the factors
+        are trained, they get the merged neighbour lists of their recent
+        items from the item-item model. The others, and learners whose
+        results are all unsuitable, get the high ratings of learners with
+        similar skills, from shared sparse products.
+        """
+        with RecommendationContext.record_shared(contexts, "collaborative"):
+            has_history = [bool(context.user_id or context.recent_items) for context in contexts]
+            factors = self.factor_trainer.current() if any(has_history) else None
+            pathways: List[Optional[List[LearningResource]]] = [
+                (self._factor_based(context, max_resources, factors)
+                 or (self._item_based(context, max_resources) if context.recent_items else None))
+                if history else None
+                for context, history in zip(contexts, has_history)
+            ]
+            remaining = [i for i, pathway in enumerate(pathways) if not pathway]
+            if not remaining:
+                return pathways
             
-            # NSQF level appropriateness
-            target_nsqf = self._estimate_target_nsqf_level(user_profile)
-            nsqf_diff = abs(resource.nsqf_level - target_nsqf)
-            score += max(0, 10 - nsqf_diff * 2)
+            # Find similar users
+            behavior_matrix = self.behavior_matrix
+            neighbours = behavior_matrix.similar_users_batch([contexts[i].prior_skills for i in remaining], top_k=10)
             
-            # Learning pace compatibility
-            pace_scores = {"slow": 8, "medium": 10, "fast": 6}
-            if resource.duration_hours <= 50:
-                pace_scores = {"slow": 6, "medium": 8, "fast": 10}
-            elif resource.duration_hours >= 150:
-                pace_scores = {"slow": 10, "medium": 8, "fast": 6}
+            # Sum the high ratings similar users gave to each resource
+            resource_scores = behavior_matrix.aggregate_ratings_batch(neighbours, min_rating=4.0)
             
-            score += pace_scores.get(learning_pace, 8)
+            top_rows = []
+            for position in range(len(remaining)):
+                start, end = resource_scores.indptr[position], resource_scores.indptr[position + 1]
+                rated, scores = resource_scores.indices[start:end], resource_scores.data[start:end]
+                order = np.argsort(rated)
+                top_rows.append(rated[order][top_k_indices(scores[order], max_resources)])
+            suitable = self._suitable_rows(top_rows, [contexts[i] for i in remaining])
+            for i, resources in zip(remaining, self.resource_catalog.take_many(suitable)):
+                pathways[i] = resources
+        
+        return pathways
+    
+    def _factor_based(self, 
+                      context: RecommendationContext,
+                      max_resources: int,
+                      factors: Optional[FactorSnapshot]) -> List[LearningResource]:
+        """Suitable resources with the highest predicted preference, excluding ones the learner already took"""
+        catalog = self.resource_catalog
+        if factors is None or factors.resource_ids is not catalog.resource_ids:
+            return []
+        history = self.user_behavior_history.get(context.user_id) if context.user_id else None
+        seen = set(context.recent_items) | set(history.completed_resources if history else ())
+        seen_rows = np.array([row for row in map(catalog.row_index.get, seen) if row is not None], dtype=np.intp)
+        
+        vector = factors.user_vector(context.user_id) if context.user_id else None
+        if vector is None:
+            # A learner the factors were not trained on: fold in the recent items
+            recent_rows = [row for row in map(catalog.row_index.get, context.recent_items) if row is not None]
+            if not recent_rows:
+                return []
+            vector = factors.fold_in(recent_rows)
+        rows = factors.recommend(vector, max_resources * 4, seen_rows)
+        return catalog.take(rows[self._suitable_mask(rows, context)][:max_resources])
+    
+    def _item_based(self, context: RecommendationContext, max_resources: int) -> List[LearningResource]:
+        """Suitable catalog resources most similar to the learner's recent items"""
+        catalog = self.resource_catalog
+        # Over-fetch: neighbours outside the catalog or unsuitable for the learner are dropped
+        similar = self.item_model.recommend(context.recent_items, max_resources * 4)
+        rows = np.array([row for row in (catalog.row_index.get(item_id) for item_id, _ in similar) if row is not None],
+                        dtype=np.intp)
+        if not len(rows):
+            return []
+        return catalog.take(rows[self._suitable_mask(rows, context)][:max_resources])
+    
+    def _content_based_filtering(self, 
+                                context: RecommendationContext,
+                                max_resources: int,
+                                relevance: Optional[ScoredCandidates] = None) -> List[LearningResource]:
+        """
+        Content-based filtering based on skills and aspirations
+        """
+        relevance = None if relevance is None else [relevance]
+        return self._content_based_batch([context], max_resources, relevance)[0]
+    
+    def _content_based_batch(self, 
+                             contexts: List[RecommendationContext],
+                             max_resources: int,
+                             relevance: Optional[List[ScoredCandidates]] = None) -> List[List[LearningResource]]:
+        """Content-based filtering for several profiles in one scoring pass"""
+        catalog = self.resource_catalog
+        if relevance is None:
+            relevance = self._relevance(contexts)
+        with RecommendationContext.record_shared(contexts, "content"):
+            return catalog.take_many([scored.top(max_resources) for scored in relevance])
+    
+    def _reinforcement_learning(self, 
+                                context: RecommendationContext,
+                                max_resources: int,
+                                relevance: Optional[ScoredCandidates] = None) -> List[LearningResource]:
+        """
+        Online contextual bandit: the most relevant suitable resources,
+        re-ranked by the upper confidence bound of their reward for this
+        learner's context. Ties (e.g. resources without feedback yet) keep
+        relevance order.
+        """
+        catalog = self.resource_catalog
+        if relevance is None:
+            relevance = self._relevance([context])[0]
+        with context.timed("bandit"):
+            pool = relevance.top(max_resources * 4)
+            suitable = pool[self._suitable_mask(pool, context)]
+            if len(suitable):
+                pool = suitable
+            x = context.bandit_context
+            scores = self.bandit.scores(x, [catalog.resource_ids[row] for row in pool])
+            if context.user_id:
+                # Feedback from this learner is credited to the context they were served with
+                self.bandit.remember(context.user_id, x)
+            return catalog.take(pool[top_k_indices(scores, max_resources)])
+    
+    def _bandit_context(self, context: RecommendationContext) -> np.ndarray:
+        """Learner context features the bandit's per-resource reward models take"""
+        return context_vector(
+            context.target_nsqf_level, context.learning_pace, context.budget, context.max_hours,
+            len(context.prior_skill_set), len(context.missing_skills) / max(len(context.target_skills), 1),
+            context.aspiration
+        )
+    
+    def _relevance(self, contexts: List[RecommendationContext]) -> List[ScoredCandidates]:
+        """
+        Relevance scores for each profile. Catalogs smaller than
+        two_stage_min_catalog are scored exactly in full. Larger ones use
+        two-stage retrieval: the candidate retriever proposes several hundred
+        rows per learner, and only those are ranked, by content score plus
+        the predicted satisfaction and employment impact, so the cost of a
+        request stops growing with the catalog.
+        """
+        with RecommendationContext.record_shared(contexts, "relevance"):
+            # Small catalogs never touch the retriever, so they never load the models group for it
+            if len(self.resource_catalog) < self.two_stage_min_catalog:
+                return [ScoredCandidates.full(scores) for scores in self._content_scores(contexts)]
+            retriever = self.candidate_retriever
+            # A catalog swap publishes before its retriever is rebuilt; score in full until then
+            if retriever.catalog_version != self._state.catalog_version:
+                return [ScoredCandidates.full(scores) for scores in self._content_scores(contexts)]
             
-            # Success rate and ratings
-            score += resource.success_rate * 5
-            score += np.mean(resource.user_ratings) if resource.user_ratings else 2
+            candidates = retriever.candidates(
+                [context.prior_skills for context in contexts], [context.skill_gap for context in contexts],
+                [context.target_nsqf_level for context in contexts]
+            )
             
-            # Market demand weight
-            max_market_weight = max([self.market_weights.get(skill, 0.5) for skill in resource.skills_covered])
-            score += max_market_weight * 10
+            # Predictors run once over the candidates of the whole block
+            pooled = np.unique(np.concatenate(candidates))
+            predicted = self._predicted_quality(pooled)
             
-            resource_scores.append((resource, score))
+            relevance = []
+            for context, rows in zip(contexts, candidates):
+                scores = self._content_scores([context], rows)[0]
+                scores += predicted[np.searchsorted(pooled, rows)]
+                relevance.append(ScoredCandidates(rows, scores))
+            return relevance
+    
+    def _predicted_quality(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Predicted satisfaction plus predicted employment impact (x10) of the
+        given rows. Predictions depend only on resource features, so they are
+        memoized per model snapshot and catalog; the predictors run once,
+        batched, over the rows not predicted yet.
+        """
+        catalog, models = self.resource_catalog, self.models
+        memo = self._predictions
+        if memo is None or memo[0] is not models or memo[1] is not catalog:
+            memo = self._predictions = (models, catalog, np.full(len(catalog), np.nan))
+        predicted = memo[2]
+        
+        missing = rows[np.isnan(predicted[rows])]
+        if len(missing):
+            satisfaction, employment = models.predict(
+                catalog.model_features(catalog.ratings_or(4.0, missing), missing)
+            )
+            predicted[missing] = satisfaction + employment * 10
+        return predicted[rows]
+    
+    def _content_scores(self, 
+                        contexts: List[RecommendationContext],
+                        rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Content-based relevance of every resource for each profile
+        (profiles x resources), or of the given rows only (profiles x rows)
+        """
+        # Gaps match resource skills at any level of the taxonomy, weighted by depth
+        skill_gaps = [context.skill_gap for context in contexts]
+        target_levels = [context.target_nsqf_level for context in contexts]
+        learning_paces = [context.learning_pace for context in contexts]
+        aspirations = [context.aspiration for context in contexts]
+        
+        # Score the resources for every profile with matrix operations over the catalog
+        catalog = self.resource_catalog
+        skill_matrix = catalog.skill_matrix if rows is None else catalog.skill_matrix[rows]
+        nsqf_level = catalog.nsqf_level if rows is None else catalog.nsqf_level[rows]
         
-        # Sort by score and return top resources
-        resource_scores.sort(key=lambda x: x[1], reverse=True)
-        return [resource for resource, score in resource_scores[:max_resources]]
+        # NSQF appropriateness, learning pace and the profile-independent terms depend on a profile
+        # only through its target level and pace, so they are summed once per distinct pair
+        pairs = list(zip(target_levels, learning_paces))
+        distinct = {pair: i for i, pair in enumerate(dict.fromkeys(pairs))}
+        levels = np.array([level for level, _ in distinct])[:, None]
+        pair_scores = np.maximum(0, 10 - np.abs(nsqf_level[None, :] - levels) * 2)        # NSQF appropriateness
+        pair_scores = pair_scores + catalog.pace_score_matrix([pace for _, pace in distinct], rows)  # Learning pace
+        pair_scores += catalog.static_content_scores(rows)                             # Success, ratings, market demand
+        
+        # Accumulated in place: each full-width temporary costs a pass over memory per profile
+        scores = (catalog.skill_sets_matrix(skill_gaps) @ skill_matrix.T).toarray()    # Skill coverage
+        scores *= 10
+        scores += pair_scores[[distinct[pair] for pair in pairs]]
+        semantic = catalog.semantic_index.scores(aspirations, rows)                    # Aspiration text match
+        semantic *= 10
+        scores += semantic
+        return scores
     
     def _hybrid_recommendation(self, 
-                              user_profile: Dict[str, Any], 
-                              objectives: List[PathwayObjective],
-                              max_resources: int) -> List[LearningResource]:
+                              context: RecommendationContext,
+                              max_resources: int,
+                              relevance: Optional[ScoredCandidates] = None) -> List[LearningResource]:
         """
         Hybrid approach combining multiple algorithms
         """
-        # Get recommendations from different algorithms
-        collaborative_recs = self._collaborative_filtering(user_profile, objectives, max_resources // 2)
-        content_recs = self._content_based_filtering(user_profile, objectives, max_resources // 2)
-        
-        # Combine and deduplicate
-        all_recommendations = collaborative_recs + content_recs
-        seen_ids = set()
-        unique_recommendations = []
+        return self._run_hybrid_pipeline(context, max_resources, relevance)["combined"]
+    
+    def _run_hybrid_pipeline(self, 
+                             context: RecommendationContext,
+                             max_resources: int,
+                             relevance: Optional[ScoredCandidates] = None) -> Dict[str, Any]:
+        """
+        Run the hybrid stages as a DAG: collaborative filtering runs alongside
+        content scoring, and combination waits for both. A stage that fails or
+        misses its deadline contributes its fallback (no resources, or no
+        relevance) and the pathway is combined from the remaining stages.
+        """
+        timeout = self.stage_timeout_seconds
         
-        for resource in all_recommendations:
-            if resource.id not in seen_ids:
-                unique_recommendations.append(resource)
-                seen_ids.add(resource.id)
+        def content(relevance):
+            if relevance is None:
+                return []
+            return self._content_based_filtering(context, max_resources // 2, relevance)
         
-        # Apply multi-objective optimization if specified
-        if PathwayObjective.BALANCE_ALL in objectives or len(objectives) > 1:
-            unique_recommendations = self._optimize_for_objectives(unique_recommendations, objectives, user_profile)
+        def combined(collaborative, content):
+            return self._combine_hybrid(context, collaborative, content, max_resources)
         
-        return unique_recommendations[:max_resources]
+        run = self.stage_pipeline.run([
+            Stage("collaborative",
+                  self._bound_to_state(lambda: self._collaborative_filtering(context, max_resources // 2)),
+                  timeout_seconds=timeout, fallback=[]),
+            Stage("relevance",
+                  self._bound_to_state(lambda: relevance if relevance is not None else self._relevance([context])[0]),
+                  timeout_seconds=timeout),
+            Stage("content", content, depends_on=("relevance",), fallback=[], inline=True),
+            Stage("combined", combined, depends_on=("collaborative", "content"), fallback=[], inline=True)
+        ])
+        context.degraded_stages.extend(run.timed_out + run.failed)
+        return run.outputs
+    
+    def _combine_hybrid(self, 
+                        context: RecommendationContext,
+                        collaborative_recs: List[LearningResource],
+                        content_recs: List[LearningResource],
+                        max_resources: int) -> List[LearningResource]:
+        """Merge collaborative and content-based recommendations"""
+        with context.timed("combine"):
+            # Combine and deduplicate
+            all_recommendations = collaborative_recs + content_recs
+            seen_ids = set()
+            unique_recommendations = []
+            
+            for resource in all_recommendations:
+                if resource.id not in seen_ids:
+                    unique_recommendations.append(resource)
+                    seen_ids.add(resource.id)
+            
+            # Apply multi-objective optimization if specified
+            objectives = context.objectives
+            if PathwayObjective.BALANCE_ALL in objectives or len(objectives) > 1:
+                unique_recommendations = self._optimize_for_objectives(unique_recommendations, context)
+            
+            return unique_recommendations[:max_resources]
     
     def _multi_objective_optimization(self, 
-                                     user_profile: Dict[str, Any], 
-                                     objectives: List[PathwayObjective],
-                                     max_resources: int) -> List[LearningResource]:
+                                     context: RecommendationContext,
+                                     max_resources: int,
+                                     relevance: Optional[ScoredCandidates] = None) -> List[LearningResource]:
         """
         Multi-objective optimization considering time, cost, and employment probability
         """
-        # Start with content-based recommendations
-        candidate_resources = self._content_based_filtering(user_profile, objectives, max_resources * 2)
-        
-        # Define objective functions
-        def time_objective(resources):
-            return sum(r.duration_hours for r in resources)
-        
-        def cost_objective(resources):
-            return sum(r.cost for r in resources)
-        
-        def employment_objective(resources):
-            return -sum(r.employment_impact for r in resources)  # Negative for minimization
-        
-        def salary_objective(resources):
-            return -sum(r.salary_impact for r in resources)  # Negative for minimization
+        front = self._pareto_pathways(context, max_resources, relevance=relevance)
+        if not front:
+            return self._content_based_filtering(context, max_resources, relevance)
         
-        # Pareto optimization simulation
-        best_combinations = []
+        # Pick the point on the front that best matches the requested objectives
+        objective_columns = {
+            PathwayObjective.MINIMIZE_TIME: [0],
+            PathwayObjective.MINIMIZE_COST: [1],
+            PathwayObjective.MAXIMIZE_EMPLOYMENT: [2],
+            PathwayObjective.MAXIMIZE_SALARY: [3],
+            PathwayObjective.BALANCE_ALL: [0, 1, 2, 3]
+        }
+        weights = np.zeros(4)
+        for objective in context.objectives:
+            weights[objective_columns.get(objective, [])] += 1
+        if not weights.any():
+            weights[:] = 1
         
-        # Try different combinations
-        for i in range(min(len(candidate_resources), max_resources)):
-            for j in range(i + 1, min(len(candidate_resources), max_resources + 1)):
-                combination = candidate_resources[i:j]
-                
-                objectives_scores = {
-                    PathwayObjective.MINIMIZE_TIME: time_objective(combination),
-                    PathwayObjective.MINIMIZE_COST: cost_objective(combination),
-                    PathwayObjective.MAXIMIZE_EMPLOYMENT: employment_objective(combination),
-                    PathwayObjective.MAXIMIZE_SALARY: salary_objective(combination)
-                }
-                
-                # Calculate weighted score based on user objectives
-                weighted_score = 0
-                for objective in objectives:
-                    if objective in objectives_scores:
-                        if objective in [PathwayObjective.MINIMIZE_TIME, PathwayObjective.MINIMIZE_COST]:
-                            # Lower is better
-                            normalized_score = 1 / (1 + objectives_scores[objective] / 1000)
-                        else:
-                            # Higher is better (already negated)
-                            normalized_score = -objectives_scores[objective]
-                        weighted_score += normalized_score
-                
-                best_combinations.append((combination, weighted_score))
+        totals = np.array([pathway.objectives() for pathway in front])
+        span = np.maximum(totals.max(axis=0) - totals.min(axis=0), 1e-9)
+        desirability = (totals - totals.min(axis=0)) / span
+        desirability[:, :2] = 1 - desirability[:, :2]  # Lower time and cost are better
         
-        # Select best combination
-        if best_combinations:
-            best_combinations.sort(key=lambda x: x[1], reverse=True)
-            return best_combinations[0][0]
+        best = front[int(np.argmax(desirability @ weights))]
+        return self.resource_catalog.take(best.rows)
+    
+    def get_pareto_pathways(self, 
+                            user_profile: Dict[str, Any], 
+                            max_resources: int = 10, 
+                            candidate_pool_size: Optional[int] = None,
+                            relevance: Optional[ScoredCandidates] = None) -> List[ParetoPathway]:
+        """
+        Pareto front of pathways over time, cost, employment and salary impact,
+        within the learner's budget and time caps. Rows index the resource catalog.
+        """
+        with self._pinned_state():
+            return self._pareto_pathways(RecommendationContext(self, user_profile), max_resources,
+                                         candidate_pool_size, relevance)
+    
+    def _pareto_pathways(self, 
+                         context: RecommendationContext,
+                         max_resources: int = 10, 
+                         candidate_pool_size: Optional[int] = None,
+                         relevance: Optional[ScoredCandidates] = None) -> List[ParetoPathway]:
+        catalog = self.resource_catalog
+        pool_size = candidate_pool_size or max_resources * 10
+        if relevance is None:
+            relevance = self._relevance([context])[0]
+        candidates = relevance.top(pool_size)
         
-        return candidate_resources[:max_resources]
+        with context.timed("pareto"):
+            front = self.pathway_optimizer.solve(
+                catalog.duration_hours[candidates],
+                catalog.cost[candidates],
+                catalog.employment_impact[candidates],
+                catalog.salary_impact[candidates],
+                max_items=max_resources,
+                max_cost=context.budget,
+                max_hours=context.max_hours
+            )
+        for pathway in front:
+            pathway.rows = candidates[pathway.rows]
+        return front
+    
+    def _profile_cap(self, user_profile: Dict[str, Any], key: str) -> float:
+        """Numeric cap from the profile, unbounded when missing or invalid"""
+        try:
+            return float(user_profile[key])
+        except (KeyError, TypeError, ValueError):
+            return np.inf
     
     def update_user_feedback(self, 
                            user_id: str, 
@@ -512,107 +1466,501 @@ class AdvancedRecommendationEngine:
         Update recommendation system with user feedback
         """
         try:
-            if user_id not in self.user_behavior_history:
-                self.user_behavior_history[user_id] = UserBehavior(
-                    user_id=user_id,
-                    completed_resources=[],
-                    resource_ratings={},
-                    time_spent={},
-                    skill_assessments={},
-                    career_progress=[],
-                    learning_patterns={},
-                    preferences={}
-                )
-            
-            user_behavior = self.user_behavior_history[user_id]
-            
-            # Update ratings
-            if "rating" in feedback:
-                user_behavior.resource_ratings[resource_id] = feedback["rating"]
-            
-            # Update completion status
-            if feedback.get("completed", False) and resource_id not in user_behavior.completed_resources:
-                user_behavior.completed_resources.append(resource_id)
-            
-            # Update time spent
-            if "time_spent" in feedback:
-                user_behavior.time_spent[resource_id] = feedback["time_spent"]
-            
-            # Update learning patterns
-            user_behavior.learning_patterns.update(feedback.get("learning_patterns", {}))
-            
-            # Retrain models periodically
-            if len(self.user_behavior_history) % 10 == 0:
-                self._train_models()
-            
+            self.update_user_feedback_batch([FeedbackEvent.from_feedback(user_id, resource_id, feedback)])
             logger.info(f"✅ Updated feedback for user {user_id}, resource {resource_id}")
             
         except Exception as e:
             logger.error(f"❌ Error updating user feedback: {e}")
     
+    def update_user_feedback_batch(self, events: List[FeedbackEvent]) -> int:
+        """
+        Record many feedback events in one store transaction and return.
+        The behaviour sync thread is woken to apply them, along with any
+        other worker's new events, so the write costs one append however
+        many learners there are. Returns the store sequence number of the
+        last event; see wait_for_behavior to read these writes back.
+        """
+        last_seq = self.behavior_store.append(events)
+        self._ensure_behavior_sync()
+        self._sync_wake.set()
+        return last_seq
+    
+    def wait_for_behavior(self, seq: int, timeout: float = 5.0) -> bool:
+        """Wait until feedback up to store sequence number seq is served; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.serving.behavior_seq < seq:
+            if time.monotonic() >= deadline:
+                return False
+            self._ensure_behavior_sync()
+            self._sync_wake.set()
+            time.sleep(0.005)
+        return True
+    
+    def update_market_weights(self, market_weights: Dict[str, float]):
+        """Replace skill market demand weights and invalidate dependent results"""
+        with self._behavior_lock:
+            self.market_weights = dict(market_weights)
+            # Reweight a copy: requests in flight keep reading the published catalog
+            state = self.serving
+            resource_catalog = copy.copy(state.resource_catalog)
+            resource_catalog.update_market_weights(self.market_weights)
+            self._publish_serving(replace(state, resource_catalog=resource_catalog, version=state.version + 1,
+                                          market_weights_version=state.market_weights_version + 1))
+        self.recommendation_cache.clear()
+        logger.info(f"✅ Updated market weights for {len(self.market_weights)} skills")
+    
+    def update_resource_catalog(self, resources: List[LearningResource]):
+        """Replace the learning resource catalog and rebuild structures derived from it"""
+        resource_catalog = ResourceCatalog(resources, self.market_weights)
+        source_digest = records_digest(resources)
+        with self._behavior_lock:
+            # The catalog and the matrix indexed by its rows are published together
+            state = self.serving
+            behavior_matrix = UserItemMatrix(resource_catalog, state.user_behavior_history.values())
+            catalog_version = state.catalog_version + 1
+            self._publish_serving(replace(state, resource_catalog=resource_catalog,
+                                          behavior_matrix=behavior_matrix, version=state.version + 1,
+                                          catalog_version=catalog_version))
+            self._catalog_source_digest = source_digest
+        self.model_trainer.reset_catalog(resource_catalog)
+        self.factor_trainer.request_retrain()
+        self.bandit.reset_catalog(resource_catalog.ids())
+        self._map_platform_courses(resource_catalog)
+        if "models" in self._state_loaded:
+            # Candidate lists hold catalog rows; models not loaded yet are rebuilt for the new catalog on load
+            self.candidate_retriever = self._build_candidate_retriever(resource_catalog, behavior_matrix, catalog_version)
+        self.recommendation_cache.clear()
+        logger.info(f"✅ Loaded resource catalog with {len(resource_catalog)} resources")
+    
     def get_recommendation_explanation(self, 
                                      recommendation_result: RecommendationResult,
                                      user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate explanation for recommendations
         """
-        explanation = {
-            "algorithm_rationale": self._get_algorithm_rationale(recommendation_result.algorithm_used),
-            "personalization_factors": recommendation_result.personalization_factors,
-            "skill_alignment": self._explain_skill_alignment(recommendation_result.resources, user_profile),
-            "career_relevance": self._explain_career_relevance(recommendation_result.resources, user_profile),
-            "market_insights": self._explain_market_insights(recommendation_result.resources),
-            "learning_path_logic": self._explain_learning_path_logic(recommendation_result.resources),
-            "alternative_options": self._explain_alternatives(recommendation_result.alternative_pathways)
-        }
+        with self._pinned_state():
+            context = RecommendationContext(self, user_profile, algorithm=recommendation_result.algorithm_used)
+            explanation = {
+                "algorithm_rationale": self._get_algorithm_rationale(recommendation_result.algorithm_used),
+                "personalization_factors": recommendation_result.personalization_factors,
+                "skill_alignment": self._explain_skill_alignment(recommendation_result.resources, context),
+                "career_relevance": self._explain_career_relevance(recommendation_result.resources, context),
+                "market_insights": self._explain_market_insights(recommendation_result.resources),
+                "learning_path_logic": self._explain_learning_path_logic(recommendation_result.resources),
+                "alternative_options": self._explain_alternatives(recommendation_result.alternative_pathways)
+            }
         
         return explanation
     
+    def get_pathway(self, pathway_id: str) -> Optional[RecommendationResult]:
+        """A previously returned recommendation result by pathway id, or None"""
+        entry = self.pathway_store.get(pathway_id)
+        return entry.result if entry is not None else None
+    
+    def explain_pathway(self, pathway_id: str) -> Optional[Dict[str, Any]]:
+        """Explanation of a previously returned pathway by id, memoized; None if unknown"""
+        return self.pathway_store.explanation(pathway_id, self.get_recommendation_explanation)
+    
     # Helper methods
-    def _find_similar_users(self, user_profile: Dict[str, Any]) -> List[str]:
-        """Find users with similar profiles"""
-        user_skills = set(user_profile.get("prior_skills", []))
-        user_aspirations = user_profile.get("career_aspirations", "").lower()
-        
-        similar_users = []
-        
-        for user_id, behavior in self.user_behavior_history.items():
-            # Calculate similarity based on completed resources and implicit skills
-            completed_skills = set()
-            for resource_id in behavior.completed_resources:
-                resource = self._get_resource_by_id(resource_id)
-                if resource:
-                    completed_skills.update(resource.skills_covered)
-            
-            # Jaccard similarity for skills
-            skill_similarity = len(user_skills & completed_skills) / max(len(user_skills | completed_skills), 1)
-            
-            if skill_similarity > 0.3:  # Threshold for similarity
-                similar_users.append(user_id)
+    @staticmethod
+    def _new_pathway_id(prefix: str) -> str:
+        """Unique pathway id; the timestamp keeps ids readable, the random suffix keeps them distinct"""
+        return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:16]}"
+    
+    def _find_similar_users(self, user_profile: Dict[str, Any], top_k: int = 10) -> List[str]:
+        """Find users with similar profiles, most similar first"""
+        behavior_matrix = self.behavior_matrix
+        similar_rows = behavior_matrix.similar_users(user_profile.get("prior_skills", []), top_k=top_k)
+        return [behavior_matrix.user_ids[row] for row in similar_rows]
+    
+    def _is_resource_suitable(self, resource: LearningResource, user_profile: Dict[str, Any]) -> bool:
+        """Check a resource against the learner's level, budget and existing skills"""
+        context = RecommendationContext(self, user_profile)
+        return bool(self._suitable_mask(self.resource_catalog.rows_for([resource]), context)[0])
+    
+    def _suitable_mask(self, rows: np.ndarray, context: RecommendationContext) -> np.ndarray:
+        """Vectorized suitability check for catalog rows"""
+        return self._suitable_masks(np.asarray(rows)[None, :], [context])[0]
+    
+    def _suitable_rows(self, row_groups: List[np.ndarray], contexts: List[RecommendationContext]) -> List[np.ndarray]:
+        """The suitable rows of each profile's group of catalog rows, checked in one pass over the block"""
+        if not row_groups:
+            return []
+        lengths = np.array([len(rows) for rows in row_groups], dtype=np.intp)
+        valid = np.arange(lengths.max()) < lengths[:, None]
+        rows = np.zeros(valid.shape, dtype=np.intp)
+        rows[valid] = np.concatenate(row_groups)
+        suitable = self._suitable_masks(rows, contexts)
+        return [group_rows[mask[:len(group_rows)]] for group_rows, mask in zip(row_groups, suitable)]
+    
+    def _suitable_masks(self, 
+                        rows: np.ndarray,
+                        contexts: List[RecommendationContext],
+                        bitsets: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Suitability of a profiles x candidates matrix of catalog rows, one
+        row of candidates per profile. bitsets are the candidates' packed
+        skill coverage, if already computed.
+        """
+        catalog = self.resource_catalog
+        graph = catalog.prerequisite_graph
+        target_levels = np.array([context.target_nsqf_level for context in contexts])[:, None]
+        budgets = np.array([context.budget for context in contexts])[:, None]
+        
+        suitable = np.abs(catalog.nsqf_level[rows] - target_levels) <= 2
+        suitable &= catalog.cost[rows] <= budgets
+        
+        # Nothing to learn if every covered skill is already known
+        if bitsets is None:
+            bitsets = catalog.skill_bitsets(rows)
+        prior = np.stack([context.prior_skill_bits for context in contexts])
+        suitable &= popcount(bitsets & prior[:, None, :]) < catalog.skill_counts[rows]
+        
+        # Every transitive prerequisite must be covered by the learner's skills
+        known = np.stack([context.known_skill_bits for context in contexts])
+        suitable &= ~(graph.requirements[graph.requirement_index[rows]] & ~known[:, None, :]).any(axis=2)
+        return suitable
+    
+    def _completed_skills(self, user_behavior: UserBehavior, catalog: Optional[ResourceCatalog] = None) -> set:
+        """Skills covered by the resources a user has completed"""
+        catalog = catalog or self.resource_catalog
+        skills = set()
+        for resource_id in user_behavior.completed_resources:
+            row = catalog.row_index.get(resource_id)
+            if row is not None:
+                skills.update(catalog.skills[row])
+        return skills
+    
+    def _get_target_skills(self, career_aspirations: str) -> List[str]:
+        """Map free-text career aspirations to target skills"""
+        career_skills_map = {
+            "data": ["python", "data_analysis", "statistics", "pandas", "numpy"],
+            "machine learning": ["python", "machine_learning", "statistics", "basic_ml"],
+            "cloud": ["cloud_computing", "aws", "infrastructure", "linux_basics"],
+            "web": ["web_development", "javascript", "html_css", "database", "ui_ux"],
+            "software": ["python", "javascript", "database", "basic_programming"],
+            "marketing": ["digital_marketing", "seo", "social_media"]
+        }
+        
+        aspirations = career_aspirations.lower().replace("_", " ")
+        target_skills = []
+        for keyword, skills in career_skills_map.items():
+            if keyword in aspirations:
+                target_skills.extend(skill for skill in skills if skill not in target_skills)
+        
+        # Skills named directly, at any level of the taxonomy, along with their narrower skills
+        for skill in self.skill_taxonomy.match_text(aspirations):
+            for related in [skill] + self.skill_taxonomy.children_of(skill):
+                if related not in target_skills:
+                    target_skills.append(related)
         
-        return similar_users
+        return target_skills or ["communication", "problem_solving", "basic_programming"]
+    
+    def _estimate_target_nsqf_level(self, user_profile: Dict[str, Any]) -> int:
+        """Estimate the NSQF level a learner should be working towards"""
+        explicit_level = user_profile.get("target_nsqf_level") or user_profile.get("nsqf_level")
+        if explicit_level:
+            try:
+                return max(1, min(10, int(explicit_level)))
+            except (TypeError, ValueError):
+                pass
+        
+        education_levels = {
+            "10th": 3, "12th": 4, "diploma": 5, "graduate": 6,
+            "bachelor": 6, "postgraduate": 7, "master": 7, "phd": 8
+        }
+        background = str(user_profile.get("academic_background", "")).lower()
+        level = 4
+        for education, education_level in education_levels.items():
+            if education in background:
+                level = max(level, education_level)
+        
+        # Learners with a broad skill base aim one level higher
+        if len(user_profile.get("prior_skills", [])) >= 5:
+            level += 1
+        
+        return min(level, 10)
     
     def _get_resource_by_id(self, resource_id: str) -> Optional[LearningResource]:
         """Get resource by ID"""
-        for resource in self.resource_database:
-            if resource.id == resource_id:
-                return resource
-        return None
-    
-    def _calculate_confidence_score(self, 
-                                   recommendations: List[LearningResource], 
-                                   user_profile: Dict[str, Any]) -> float:
-        """Calculate confidence score for recommendations"""
-        if not recommendations:
-            return 0.0
+        return self.resource_catalog.get(resource_id)
+    
+    @staticmethod
+    def _pathway_means(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """Mean over each pathway of a padded profiles x length matrix (0 for an empty pathway)"""
+        return np.where(valid, values, 0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+    
+    def _calculate_confidence_scores(self, 
+                                     rows: np.ndarray,
+                                     valid: np.ndarray,
+                                     coverage: np.ndarray) -> np.ndarray:
+        """Confidence score of each pathway of a block, given the skill coverage bitset of each"""
+        catalog = self.resource_catalog
         
         # Factors affecting confidence
-        skill_coverage_score = len(set().union(*[r.skills_covered for r in recommendations])) / 10
-        success_rate_score = np.mean([r.success_rate for r in recommendations])
-        rating_score = np.mean([np.mean(r.user_ratings) if r.user_ratings else 3.5 for r in recommendations]) / 5
+        skill_coverage_score = popcount(coverage) / 10
+        success_rate_score = self._pathway_means(catalog.success_rate[rows], valid)
+        rating_score = self._pathway_means(catalog.ratings_or(3.5, rows), valid) / 5
         
         confidence = (skill_coverage_score * 0.3 + success_rate_score * 0.4 + rating_score * 0.3)
-        return min(1.0, confidence)
+        return np.where(valid.any(axis=1), np.minimum(1.0, confidence), 0.0)
+    
+    def _objective_scores(self, rows: np.ndarray, objectives: List[PathwayObjective]) -> np.ndarray:
+        """Per-resource desirability (0-1) for the given objectives, summed"""
+        catalog = self.resource_catalog
+        per_objective = {
+            PathwayObjective.MINIMIZE_TIME: 1 / (1 + catalog.duration_hours[rows] / 100),
+            PathwayObjective.MINIMIZE_COST: 1 / (1 + catalog.cost[rows] / 10000),
+            PathwayObjective.MAXIMIZE_EMPLOYMENT: catalog.employment_impact[rows],
+            PathwayObjective.MAXIMIZE_SALARY: catalog.salary_impact[rows],
+            PathwayObjective.MAXIMIZE_SATISFACTION: catalog.ratings_or(3.5, rows) / 5
+        }
+        
+        scores = np.zeros(len(rows))
+        for objective in objectives:
+            if objective == PathwayObjective.BALANCE_ALL:
+                scores += sum(per_objective.values()) / len(per_objective)
+            elif objective in per_objective:
+                scores += per_objective[objective]
+        return scores
+    
+    def _optimize_for_objectives(self, 
+                                 resources: List[LearningResource], 
+                                 context: RecommendationContext) -> List[LearningResource]:
+        """Reorder resources by how well they serve the requested objectives"""
+        if not resources:
+            return resources
+        
+        scores = self._objective_scores(self.resource_catalog.rows_for(resources), context.objectives)
+        return [resources[i] for i in top_k_indices(scores, len(resources))]
+    
+    def _evaluate_objectives(self, 
+                            rows: np.ndarray,
+                            valid: np.ndarray,
+                            contexts: List[RecommendationContext]) -> List[Dict[PathwayObjective, float]]:
+        """Score how well each pathway of a block meets each objective (0-1)"""
+        catalog = self.resource_catalog
+        pathway_scores = {
+            PathwayObjective.MINIMIZE_TIME: 1 / (1 + np.where(valid, catalog.duration_hours[rows], 0).sum(axis=1) / 1000),
+            PathwayObjective.MINIMIZE_COST: 1 / (1 + np.where(valid, catalog.cost[rows], 0).sum(axis=1) / 100000),
+            PathwayObjective.MAXIMIZE_EMPLOYMENT: self._pathway_means(catalog.employment_impact[rows], valid),
+            PathwayObjective.MAXIMIZE_SALARY: self._pathway_means(catalog.salary_impact[rows], valid),
+            PathwayObjective.MAXIMIZE_SATISFACTION: self._pathway_means(catalog.ratings_or(3.5, rows), valid) / 5
+        }
+        balance = np.mean(list(pathway_scores.values()), axis=0).tolist()
+        pathway_scores = {objective: scores.tolist() for objective, scores in pathway_scores.items()}
+        
+        objectives_met = []
+        for i, (context, nonempty) in enumerate(zip(contexts, valid.any(axis=1).tolist())):
+            if not nonempty:
+                objectives_met.append({objective: 0.0 for objective in context.objectives})
+                continue
+            objectives_met.append({
+                objective: balance[i] if objective == PathwayObjective.BALANCE_ALL
+                else float(pathway_scores[objective][i]) if objective in pathway_scores else 0.0
+                for objective in context.objectives
+            })
+        return objectives_met
+    
+    def _calculate_personalization_factors(self, 
+                                          rows: np.ndarray,
+                                          valid: np.ndarray,
+                                          coverage: np.ndarray,
+                                          contexts: List[RecommendationContext]) -> List[Dict[str, float]]:
+        """Quantify how closely each pathway of a block is tailored to its learner"""
+        catalog = self.resource_catalog
+        skill_gaps = [context.missing_skills for context in contexts]
+        target_levels = np.array([context.target_nsqf_level for context in contexts])[:, None]
+        
+        gap_coverage = popcount(coverage & catalog.skill_set_bitsets(skill_gaps)) / np.maximum(
+            [len(gaps) for gaps in skill_gaps], 1)
+        nsqf_alignment = 1 - self._pathway_means(np.abs(catalog.nsqf_level[rows] - target_levels), valid) / 10
+        pace_alignment = self._pathway_means(
+            catalog.pace_score_matrix([context.learning_pace for context in contexts], rows), valid) / 10
+        market_alignment = self._pathway_means(catalog.max_market_weight[rows], valid)
+        
+        return [
+            {
+                "skill_gap_coverage": float(gaps),
+                "nsqf_alignment": float(nsqf),
+                "pace_alignment": float(pace),
+                "market_alignment": float(market)
+            } if nonempty else {}
+            for nonempty, gaps, nsqf, pace, market in zip(valid.any(axis=1).tolist(), gap_coverage.tolist(),
+                                                          nsqf_alignment.tolist(), pace_alignment.tolist(),
+                                                          market_alignment.tolist())
+        ]
+    
+    def _estimate_outcomes(self, 
+                          rows: np.ndarray,
+                          valid: np.ndarray,
+                          contexts: List[RecommendationContext],
+                          pathways: List[List[LearningResource]]) -> List[Dict[str, Any]]:
+        """Estimate time, cost and career outcomes of completing each pathway of a block"""
+        catalog = self.resource_catalog
+        total_hours = np.where(valid, catalog.duration_hours[rows], 0).sum(axis=1)
+        total_cost = np.where(valid, catalog.cost[rows], 0).sum(axis=1)
+        weeks = np.ceil(total_hours / np.array([context.weekly_hours for context in contexts]))
+        
+        # Each resource independently contributes to landing a job
+        employment_probability = 1 - np.where(valid, 1 - catalog.employment_impact[rows] * catalog.success_rate[rows],
+                                               1).prod(axis=1)
+        salary_increase = self._pathway_means(catalog.salary_impact[rows], valid) * 100
+        
+        return [
+            {
+                "total_duration_hours": hours,
+                "total_cost": cost,
+                "estimated_completion_weeks": int(pathway_weeks),
+                "employment_probability": round(min(0.95, probability), 2),
+                "expected_salary_increase_percent": round(salary, 1),
+                "target_nsqf_level": context.target_nsqf_level,
+                "skills_gained": sorted(set().union(*(resource.skills_covered for resource in pathway)))
+            } if pathway else {}
+            for context, pathway, hours, cost, pathway_weeks, probability, salary in zip(
+                contexts, pathways, total_hours.tolist(), total_cost.tolist(), weeks.tolist(),
+                employment_probability.tolist(), salary_increase.tolist())
+        ]
+    
+    def _generate_alternatives_batch(self, 
+                                    contexts: List[RecommendationContext],
+                                    recommendations: List[List[LearningResource]],
+                                    relevance: List[Optional[ScoredCandidates]],
+                                    num_alternatives: int = 2,
+                                    current: Optional[np.ndarray] = None) -> List[List[str]]:
+        """
+        Describe mutually diverse alternative pathways for each profile of a
+        block, re-ranked by maximal marginal relevance from the already
+        scored candidate pools. The pools are stacked into one profiles x
+        pool matrix, so filtering and the MMR rounds run once per block
+        rather than once per profile. current holds the catalog rows of the
+        recommended pathways, padded with -1, if already looked up.
+        """
+        alternatives = [[] for _ in contexts]
+        live = [i for i, scored in enumerate(relevance) if scored is not None]
+        if not live:
+            return alternatives
+        
+        catalog = self.resource_catalog
+        if current is None:
+            current = np.full((len(contexts), max(len(pathway) for pathway in recommendations)), -1, dtype=np.intp)
+            for i, pathway in enumerate(recommendations):
+                current[i, :len(pathway)] = catalog.rows_for(pathway)
+        current = current[live]
+        current_lengths = (current >= 0).sum(axis=1)
+        lengths = np.clip(current_lengths, 1, 3)
+        pool_sizes = current_lengths + num_alternatives * lengths * 4
+        
+        # Best candidates of each profile, padded to a common pool width
+        width = int(pool_sizes.max())
+        pools = np.zeros((len(live), width), dtype=np.intp)
+        scores = np.zeros((len(live), width))
+        available = np.zeros((len(live), width), dtype=bool)
+        for block_row, (i, size) in enumerate(zip(live, pool_sizes.tolist())):
+            top_rows, top_scores = relevance[i].top_scored(size)
+            pools[block_row, :len(top_rows)], scores[block_row, :len(top_rows)] = top_rows, top_scores
+            available[block_row, :len(top_rows)] = True
+        
+        # Suitable candidates not already in the recommended pathway
+        live_contexts = [contexts[i] for i in live]
+        pool_bitsets = catalog.skill_bitsets(pools)
+        current_bitsets = np.where((current >= 0)[:, :, None], catalog.skill_bitsets(current), 0)
+        available &= (pools[:, :, None] != current[:, None, :]).all(axis=2)
+        available &= self._suitable_masks(pools, live_contexts, pool_bitsets)
+        
+        diversity = np.array([float(np.clip(context.diversity, 0.0, 1.0)) for context in live_contexts])
+        current_coverage = np.bitwise_or.reduce(current_bitsets, axis=1)[:, None, :]
+        chosen = mmr_pathways_batch(scores, pool_bitsets, available, num_alternatives, lengths, diversity,
+                                    current_coverage)
+        
+        for block_row, i in enumerate(live):
+            current_skills = set().union(*(resource.skills_covered for resource in recommendations[i]))
+            for pathway in chosen[block_row]:
+                rows = pools[block_row, pathway[pathway >= 0]].tolist()
+                if not rows:
+                    continue
+                new_skills = sorted(set().union(*(catalog.skills[row] for row in rows)) - current_skills)
+                label = f"Focus on {', '.join(new_skills[:3])}" if new_skills else "Similar skills, different resources"
+                alternatives[i].append(f"{label}: " + " -> ".join(catalog.titles[row] for row in rows))
+        return alternatives
+    
+    def _get_fallback_recommendations(self, user_profile: Dict[str, Any]) -> RecommendationResult:
+        """Safe default pathway when the selected algorithm fails"""
+        catalog = self.resource_catalog
+        target_nsqf = self._estimate_target_nsqf_level(user_profile)
+        rows = catalog.rows_for_levels(1, target_nsqf)
+        if rows.size == 0:
+            rows = np.arange(len(catalog))
+        resources = catalog.take(rows[top_k_indices(catalog.success_rate[rows], 3)])
+        
+        return RecommendationResult(
+            pathway_id=self._new_pathway_id("fallback"),
+            resources=resources,
+            confidence_score=0.5,
+            algorithm_used=RecommendationAlgorithm.CONTENT_BASED,
+            objectives_met={},
+            personalization_factors={},
+            estimated_outcomes={},
+            alternative_pathways=[]
+        )
+    
+    def _get_algorithm_rationale(self, algorithm: RecommendationAlgorithm) -> str:
+        """Explain why the algorithm suits the learner"""
+        rationales = {
+            RecommendationAlgorithm.COLLABORATIVE_FILTERING: "Based on resources rated highly by learners with similar skills",
+            RecommendationAlgorithm.CONTENT_BASED: "Based on how well each resource closes your skill gaps at the right NSQF level",
+            RecommendationAlgorithm.HYBRID: "Combines similar learners' choices with skill-gap matching for balanced results",
+            RecommendationAlgorithm.MULTI_OBJECTIVE: "Balances time, cost, employment and salary trade-offs",
+            RecommendationAlgorithm.REINFORCEMENT_LEARNING: "Learns online from feedback which relevant resources work best for learners like you"
+        }
+        return rationales.get(algorithm, "Selected for optimal results")
+    
+    def _explain_skill_alignment(self, 
+                                resources: List[LearningResource], 
+                                context: RecommendationContext) -> Dict[str, Any]:
+        """Explain how the pathway builds on and extends the learner's skills"""
+        user_skills = context.prior_skill_set
+        covered_skills = set().union(*(resource.skills_covered for resource in resources)) if resources else set()
+        return {
+            "new_skills": sorted(covered_skills - user_skills),
+            "reinforced_skills": sorted(covered_skills & user_skills)
+        }
+    
+    def _explain_career_relevance(self, 
+                                 resources: List[LearningResource], 
+                                 context: RecommendationContext) -> Dict[str, Any]:
+        """Explain how the pathway maps to the learner's career aspirations"""
+        target_skills = set(context.target_skills)
+        covered_skills = set().union(*(resource.skills_covered for resource in resources)) if resources else set()
+        return {
+            "target_skills": sorted(target_skills),
+            "target_skills_covered": sorted(target_skills & covered_skills),
+            "coverage": len(target_skills & covered_skills) / max(len(target_skills), 1)
+        }
+    
+    def _explain_market_insights(self, resources: List[LearningResource]) -> Dict[str, float]:
+        """Market demand for the skills in the pathway"""
+        covered_skills = set().union(*(resource.skills_covered for resource in resources)) if resources else set()
+        return {skill: self.market_weights[skill] for skill in sorted(covered_skills) if skill in self.market_weights}
+    
+    def _explain_learning_path_logic(self, resources: List[LearningResource]) -> List[str]:
+        """Describe the progression through the pathway"""
+        return [f"Step {step}: {resource.title} (NSQF level {resource.nsqf_level}, {resource.duration_hours}h)"
+                for step, resource in enumerate(resources, start=1)]
+    
+    def _explain_alternatives(self, alternative_pathways: List[str]) -> List[str]:
+        """Describe alternative pathways"""
+        return alternative_pathways or ["No alternative pathways available for this profile"]
+
+# Engine used by forked batch workers
+_batch_engine: Optional[AdvancedRecommendationEngine] = None
+
+
+def _recommend_batch_block(args) -> List[RecommendationResult]:
+    """Process pool entry point for one block of a batch request"""
+    user_profiles, objectives, algorithm, max_resources, diversity = args
+    return _batch_engine._recommend_block(user_profiles, objectives, algorithm, max_resources, diversity)
+
 
 # Global instance
 advanced_recommendation_engine = AdvancedRecommendationEngine()
\ No newline at end of file
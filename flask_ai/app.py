@@ -8,6 +8,7 @@ import google.generativeai as genai
 import json
 import re
 import logging
+from dataclasses import asdict
 from job_stats import get_career_insights as get_job_stats
 from nsqf_service import nsqf_service
 from ncvet_compliance import ncvet_compliance
@@ -15,6 +16,7 @@ from advanced_profiler import advanced_profiler
 from market_intelligence import market_intelligence
 from multilingual_interface import multilingual_interface, SupportedLanguage, AccessibilityFeature
 from advanced_recommendation_engine import advanced_recommendation_engine, RecommendationAlgorithm, PathwayObjective
+from behavior_store import FeedbackEvent
 
 # Load environment variables from .env file
 load_dotenv()
@@ -37,6 +39,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# With a preloading server (e.g. gunicorn --preload), build and map the engine
+# state once in the parent so forked workers share it instead of each loading a copy
+if os.getenv("RECOMMENDATION_PRELOAD_STATE", "").lower() in ("1", "true", "yes"):
+    advanced_recommendation_engine.preload_state()
+
+# Largest feedback batch accepted in one request; larger ones must be split by the client
+MAX_FEEDBACK_BATCH_EVENTS = int(os.getenv("RECOMMENDATION_MAX_FEEDBACK_BATCH", "10000"))
+
 # Initialize the Gemini Model
 model = genai.GenerativeModel("gemini-2.5-flash")
 
@@ -100,6 +110,35 @@ def split_into_pages(sections, words_per_page=250):
     return pages
 
 
+def serialize_resource(resource):
+    """
+    Converts a LearningResource into a JSON-serializable dictionary.
+    The catalog no longer keeps each individual rating, so the former
+    "user_ratings" list is replaced by "average_rating" (null when the
+    resource is unrated) and "rating_count".
+    """
+    serialized = asdict(resource)
+    rating_sum = serialized.pop("rating_sum")
+    serialized["average_rating"] = round(rating_sum / resource.rating_count, 2) if resource.rating_count else None
+    return serialized
+
+
+def serialize_recommendation(recommendations):
+    """
+    Converts a RecommendationResult into a JSON-serializable dictionary.
+    """
+    return {
+        "pathway_id": recommendations.pathway_id,
+        "resources": [serialize_resource(resource) for resource in recommendations.resources],
+        "confidence_score": recommendations.confidence_score,
+        "algorithm_used": recommendations.algorithm_used.value,
+        "objectives_met": {obj.value: score for obj, score in recommendations.objectives_met.items()},
+        "personalization_factors": recommendations.personalization_factors,
+        "estimated_outcomes": recommendations.estimated_outcomes,
+        "alternative_pathways": recommendations.alternative_pathways
+    }
+
+
 # --- API Endpoints ---
 
 @app.route("/api/career-insights", methods=["GET"])
@@ -642,30 +681,21 @@ def generate_personalized_recommendations():
         objectives = data.get('objectives', ['balance_all'])
         algorithm = data.get('algorithm', 'hybrid')
         max_resources = data.get('max_resources', 10)
+        diversity = float(data.get('diversity', 0.5))
         
         # Convert strings to enums
         objective_enums = [PathwayObjective(obj) for obj in objectives]
         algorithm_enum = RecommendationAlgorithm(algorithm)
         
-        recommendations = advanced_recommendation_engine.generate_personalized_recommendations(
-            user_profile, objective_enums, algorithm_enum, max_resources
+        # Returning learners (user_id in the profile) are served their materialized result when fresh
+        recommendations, materialized = advanced_recommendation_engine.get_learner_recommendations(
+            user_profile, objective_enums, algorithm_enum, max_resources, diversity
         )
         
-        # Convert result to JSON-serializable format
-        result_dict = {
-            "pathway_id": recommendations.pathway_id,
-            "resources": [resource.__dict__ for resource in recommendations.resources],
-            "confidence_score": recommendations.confidence_score,
-            "algorithm_used": recommendations.algorithm_used.value,
-            "objectives_met": {obj.value: score for obj, score in recommendations.objectives_met.items()},
-            "personalization_factors": recommendations.personalization_factors,
-            "estimated_outcomes": recommendations.estimated_outcomes,
-            "alternative_pathways": recommendations.alternative_pathways
-        }
-        
         return jsonify({
             "success": True,
-            "recommendations": result_dict
+            "recommendations": serialize_recommendation(recommendations),
+            "materialized": materialized
         })
         
     except Exception as e:
@@ -673,6 +703,46 @@ def generate_personalized_recommendations():
         return jsonify({"error": "Failed to generate recommendations"}), 500
 
 
+@app.route("/api/recommendations/batch", methods=["POST"])
+def generate_batch_recommendations():
+    """
+    Generate recommendations for a cohort of learners in one call
+    Expected JSON: {
+        "user_profiles": [{...}, {...}],
+        "objectives": ["balance_all"],
+        "algorithm": "hybrid",
+        "max_resources": 10,
+        "processes": 0,
+        "diversity": 0.5
+    }
+    """
+    try:
+        data = request.get_json()
+        user_profiles = data.get('user_profiles', [])
+        objectives = data.get('objectives', ['balance_all'])
+        algorithm = data.get('algorithm', 'hybrid')
+        max_resources = data.get('max_resources', 10)
+        processes = data.get('processes', 0)
+        diversity = float(data.get('diversity', 0.5))
+        
+        objective_enums = [PathwayObjective(obj) for obj in objectives]
+        algorithm_enum = RecommendationAlgorithm(algorithm)
+        
+        results = advanced_recommendation_engine.generate_batch_recommendations(
+            user_profiles, objective_enums, algorithm_enum, max_resources, processes, diversity=diversity
+        )
+        
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "recommendations": [serialize_recommendation(result) for result in results]
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error generating batch recommendations: {e}")
+        return jsonify({"error": "Failed to generate batch recommendations"}), 500
+
+
 @app.route("/api/recommendations/feedback", methods=["POST"])
 def update_recommendation_feedback():
     """
@@ -696,28 +766,174 @@ def update_recommendation_feedback():
         return jsonify({"error": "Failed to update feedback"}), 500
 
 
-@app.route("/api/recommendations/explanation", methods=["POST"])
-def get_recommendation_explanation():
+@app.route("/api/recommendations/feedback/batch", methods=["POST"])
+def update_recommendation_feedback_batch():
     """
-    Get explanation for recommendations
+    Record many rating/completion feedback events in one call
+    Expected JSON: {"events": [{"user_id": ..., "resource_id": ..., "feedback": {...}}, ...]}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('events', []), list):
+        return jsonify({"error": "Expected a JSON object with an events list"}), 400
+    if len(data.get('events', [])) > MAX_FEEDBACK_BATCH_EVENTS:
+        return jsonify({"error": f"At most {MAX_FEEDBACK_BATCH_EVENTS} events per batch"}), 413
+    
+    try:
+        events, rejected = [], []
+        
+        for index, item in enumerate(data.get('events', [])):
+            try:
+                events.append(FeedbackEvent.from_feedback(
+                    item.get('user_id', ''), item.get('resource_id', ''), item.get('feedback', {})
+                ))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                rejected.append({"index": index, "error": str(e)})
+        
+        last_seq = advanced_recommendation_engine.update_user_feedback_batch(events)
+        
+        return jsonify({
+            "success": True,
+            "accepted": len(events),
+            "rejected": rejected,
+            "last_seq": last_seq
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error updating feedback batch: {e}")
+        return jsonify({"error": "Failed to update feedback batch"}), 500
+
+
+@app.route("/api/recommendations/pareto-front", methods=["POST"])
+def get_pareto_pathways():
+    """
+    Get the Pareto front of pathways trading off time, cost, employment and salary
     """
     try:
         data = request.get_json()
-        recommendation_result = data.get('recommendation_result', {})
         user_profile = data.get('user_profile', {})
+        max_resources = data.get('max_resources', 10)
         
-        # Convert back to proper format (simplified for demo)
-        explanation = {
-            "algorithm_rationale": f"Used {recommendation_result.get('algorithm_used', 'hybrid')} algorithm for optimal results",
-            "personalization_factors": recommendation_result.get('personalization_factors', {}),
-            "skill_alignment": "Resources align with your current skills and career goals",
-            "career_relevance": "Selected resources are highly relevant to your career aspirations",
-            "market_insights": "Recommendations consider current market demand and trends",
-            "learning_path_logic": "Path is structured for progressive skill development"
-        }
+        front = advanced_recommendation_engine.get_pareto_pathways(user_profile, max_resources)
+        catalog = advanced_recommendation_engine.resource_catalog
         
         return jsonify({
             "success": True,
+            "pathways": [
+                {
+                    "resources": [serialize_resource(resource) for resource in catalog.take(pathway.rows)],
+                    "total_hours": pathway.total_hours,
+                    "total_cost": pathway.total_cost,
+                    "employment_impact": pathway.employment_impact,
+                    "salary_impact": pathway.salary_impact
+                }
+                for pathway in front
+            ]
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error computing Pareto pathways: {e}")
+        return jsonify({"error": "Failed to compute Pareto pathways"}), 500
+
+
+@app.route("/api/recommendations/model-status", methods=["GET"])
+def get_recommendation_model_status():
+    """
+    Get freshness and training queue metrics for the recommendation models
+    """
+    try:
+        metrics = advanced_recommendation_engine.model_trainer.get_metrics()
+        factor_metrics = advanced_recommendation_engine.factor_trainer.get_metrics()
+        bandit_stats = advanced_recommendation_engine.get_bandit_stats()
+        
+        return jsonify({
+            "success": True,
+            "metrics": metrics,
+            "factor_model": factor_metrics,
+            "bandit": bandit_stats
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error fetching model status: {e}")
+        return jsonify({"error": "Failed to fetch model status"}), 500
+
+
+@app.route("/api/recommendations/cache-stats", methods=["GET"])
+def get_recommendation_cache_stats():
+    """
+    Get hit, miss and eviction counters for the recommendation cache
+    """
+    try:
+        stats = advanced_recommendation_engine.recommendation_cache.get_stats()
+        pathway_store_stats = advanced_recommendation_engine.pathway_store.get_stats()
+        materializer_stats = advanced_recommendation_engine.materializer.get_stats()
+        
+        return jsonify({
+            "success": True,
+            "stats": stats,
+            "pathway_store": pathway_store_stats,
+            "materializer": materializer_stats
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error fetching cache stats: {e}")
+        return jsonify({"error": "Failed to fetch cache stats"}), 500
+
+
+@app.route("/api/recommendations/memory-stats", methods=["GET"])
+def get_recommendation_memory_stats():
+    """
+    Get shared versus private resident memory of the worker serving the request
+    """
+    try:
+        memory = advanced_recommendation_engine.get_memory_stats()
+        
+        return jsonify({
+            "success": True,
+            "memory": memory
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error fetching memory stats: {e}")
+        return jsonify({"error": "Failed to fetch memory stats"}), 500
+
+
+@app.route("/api/recommendations/stage-timings", methods=["GET"])
+def get_recommendation_stage_timings():
+    """
+    Get per-stage latency of recommendation requests served by this worker,
+    with hybrid stage timeout, failure and inline-run counts
+    """
+    try:
+        timings = advanced_recommendation_engine.get_stage_timings()
+
+        return jsonify({
+            "success": True,
+            "timings": timings
+        })
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching stage timings: {e}")
+        return jsonify({"error": "Failed to fetch stage timings"}), 500
+
+
+@app.route("/api/recommendations/explanation", methods=["POST"])
+def get_recommendation_explanation():
+    """
+    Get explanation for a previously returned recommendation, by pathway id
+    """
+    try:
+        data = request.get_json() or {}
+        pathway_id = data.get('pathway_id')
+        if not pathway_id:
+            return jsonify({"error": "pathway_id is required"}), 400
+        
+        explanation = advanced_recommendation_engine.explain_pathway(str(pathway_id))
+        if explanation is None:
+            return jsonify({"error": f"Unknown or expired pathway_id: {pathway_id}"}), 404
+        
+        return jsonify({
+            "success": True,
+            "pathway_id": pathway_id,
             "explanation": explanation
         })
         
@@ -726,6 +942,26 @@ def get_recommendation_explanation():
         return jsonify({"error": "Failed to generate explanation"}), 500
 
 
+@app.route("/api/recommendations/pathways/<pathway_id>", methods=["GET"])
+def get_recommendation_pathway(pathway_id):
+    """
+    Re-fetch a previously returned recommendation by pathway id
+    """
+    try:
+        recommendations = advanced_recommendation_engine.get_pathway(pathway_id)
+        if recommendations is None:
+            return jsonify({"error": f"Unknown or expired pathway_id: {pathway_id}"}), 404
+        
+        return jsonify({
+            "success": True,
+            "recommendations": serialize_recommendation(recommendations)
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error fetching pathway {pathway_id}: {e}")
+        return jsonify({"error": "Failed to fetch pathway"}), 500
+
+
 # --- Run the Application ---
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""
+Learner Behaviour History
+Read-only learner id to behaviour record map whose versions share structure
+"""
+
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BehaviorHistory(Mapping):
+    """
+    Every learner's behaviour record, keyed by user id, in first-seen order.
+
+    Records are held in fixed-size chunks. ``updated`` returns a new
+    version that copies only the outer chunk list and the chunks holding
+    changed learners, so publishing a batch of feedback costs
+    O(learners / chunk_size + changed chunks * chunk_size) rather than a
+    copy of the whole map; this version is left untouched for the readers
+    still holding it.
+
+    Versions share the append-only key list and key index; each version
+    only sees its first ``len(self)`` keys. Only the latest version may be
+    updated without a full copy; updating an older one copies.
+    """
+
+    def __init__(self, records: Optional[Mapping] = None, chunk_size: int = 1024):
+        self.chunk_size = chunk_size
+        self._keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._chunks: List[List[Any]] = []
+        self._size = 0
+        for key, record in (records or {}).items():
+            self._set(key, record, set())
+        self._size = len(self._keys)
+
+    def __getitem__(self, key: str) -> Any:
+        row = self._index.get(key)
+        if row is None or row >= self._size:
+            raise KeyError(key)
+        return self._chunks[row // self.chunk_size][row % self.chunk_size]
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._keys
+        for row in range(self._size):
+            yield keys[row]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def updated(self, records: Mapping) -> "BehaviorHistory":
+        """New version with the given learners' records added or replaced"""
+        if len(self._keys) != self._size:
+            return BehaviorHistory({**dict(self.items()), **records}, self.chunk_size)
+        updated = BehaviorHistory(chunk_size=self.chunk_size)
+        updated._keys = self._keys
+        updated._index = self._index
+        updated._chunks = list(self._chunks)
+        copied = set()
+        for key, record in records.items():
+            updated._set(key, record, copied)
+        updated._size = len(updated._keys)
+        return updated
+
+    def _set(self, key: str, record: Any, copied: set):
+        """Store a record, copying its chunk first unless this version already owns it"""
+        row = self._index.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row % self.chunk_size == 0:
+                self._chunks.append([])
+                copied.add(row // self.chunk_size)
+        chunk, offset = divmod(row, self.chunk_size)
+        if chunk not in copied:
+            self._chunks[chunk] = list(self._chunks[chunk])
+            copied.add(chunk)
+        if offset == len(self._chunks[chunk]):
+            self._chunks[chunk].append(record)
+        else:
+            self._chunks[chunk][offset] = record
+        if key not in self._index:
+            # Published last: older versions ignore rows at or past their own size
+            self._keys.append(key)
+            self._index[key] = row
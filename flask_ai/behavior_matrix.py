@@ -0,0 +1,272 @@
+"""
+Sparse User-Item Behaviour Matrices
+CSR user x resource and user x skill matrices for collaborative filtering
+"""
+
+import copy
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Any, Iterable, NamedTuple
+import logging
+
+from resource_catalog import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+class BehaviorRows(NamedTuple):
+    """The four behaviour matrices over one set of user rows"""
+    ratings: sparse.csr_matrix
+    completions: sparse.csr_matrix
+    time_spent: sparse.csr_matrix
+    skills: sparse.csr_matrix
+
+
+class UserItemMatrix:
+    """
+    Maintained sparse matrices over the learner population.
+
+    - ratings:    users x resources, explicit rating values
+    - completions: users x resources, 1 where a resource was completed
+    - time_spent: users x resources, time recorded on each resource
+    - skills:     users x skills, 1 where a completed resource covers the skill
+
+    The matrices are a CSR base plus an overlay holding the rows of users
+    whose behaviour changed since the base was built. ``updated`` returns
+    a new matrix and leaves this one untouched, so a published matrix can
+    be read by many threads while the next version is built; it only
+    rebuilds the overlay (O(changed rows)), and folds the overlay into a
+    new base once it grows past ``max_overlay_rows``. Reads combine the
+    base, minus the overlaid rows, with the overlay.
+
+    Versions share the append-only ``user_ids`` list and ``user_index``
+    map; each version only reads the first ``len(self)`` users of them.
+    """
+
+    def __init__(self, catalog, behaviors: Iterable[Any] = (), max_overlay_rows: int = 2048):
+        self.catalog = catalog
+        self.max_overlay_rows = max_overlay_rows
+        self.user_index: Dict[str, int] = {}
+        self.user_ids: List[str] = []
+        self.n_users = 0
+
+        rows = {}
+        for behavior in behaviors:
+            rows[self._row_for(behavior.user_id)] = behavior
+        self.n_users = len(self.user_ids)
+        self._set_base(self._behavior_rows(list(rows.values()), list(rows)))
+
+    def __len__(self) -> int:
+        return self.n_users
+
+    def _row_for(self, user_id: str) -> int:
+        row = self.user_index.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            self.user_index[user_id] = row
+            self.user_ids.append(user_id)
+        return row
+
+    def updated(self, behaviors: Iterable[Any]) -> "UserItemMatrix":
+        """Copy of the matrix with the given users' rows replaced"""
+        updated = copy.copy(self)
+        if len(self.user_ids) != self.n_users:
+            # A sibling version already appended users: this one gets its own index
+            updated.user_ids = self.user_ids[:self.n_users]
+            updated.user_index = {user_id: row for row, user_id in enumerate(updated.user_ids)}
+
+        by_row = {}
+        for behavior in behaviors:
+            by_row[updated._row_for(behavior.user_id)] = behavior
+        updated.n_users = len(updated.user_ids)
+        if not by_row:
+            return updated
+
+        new_rows = np.fromiter(by_row, dtype=np.intp, count=len(by_row))
+        kept = np.flatnonzero(~np.isin(self._overlay_rows, new_rows))
+        changed = self._behavior_rows(list(by_row.values()))
+        updated._overlay_rows = np.concatenate([self._overlay_rows[kept], new_rows])
+        updated._overlay = BehaviorRows(*(
+            sparse.vstack([matrix[kept], rows], format="csr") for matrix, rows in zip(self._overlay, changed)
+        ))
+        updated._overlay_skill_counts = np.asarray(updated._overlay.skills.sum(axis=1)).ravel()
+        updated._merged = None
+        updated._overlay_high = {}
+        if len(updated._overlay_rows) > self.max_overlay_rows:
+            updated._set_base(updated._merged_rows())
+        return updated
+
+    def _behavior_rows(self, behaviors: List[Any], rows: List[int] = None) -> BehaviorRows:
+        """Matrices for the given behaviours, at the given rows (default: one row each, in order)"""
+        n_rows = self.n_users if rows is not None else len(behaviors)
+        rows = rows if rows is not None else range(len(behaviors))
+        n_resources = len(self.catalog)
+
+        rating_rows, rating_cols, rating_values = [], [], []
+        completion_rows, completion_cols = [], []
+        time_rows, time_cols, time_values = [], [], []
+        row_index = self.catalog.row_index
+        for row, behavior in zip(rows, behaviors):
+            for resource_id, rating in behavior.resource_ratings.items():
+                col = row_index.get(resource_id)
+                if col is not None:
+                    rating_rows.append(row)
+                    rating_cols.append(col)
+                    rating_values.append(float(rating))
+            for resource_id in set(behavior.completed_resources):
+                col = row_index.get(resource_id)
+                if col is not None:
+                    completion_rows.append(row)
+                    completion_cols.append(col)
+            for resource_id, minutes in behavior.time_spent.items():
+                col = row_index.get(resource_id)
+                if col is not None and minutes:
+                    time_rows.append(row)
+                    time_cols.append(col)
+                    time_values.append(float(minutes))
+
+        completions = sparse.csr_matrix(
+            (np.ones(len(completion_rows)), (completion_rows, completion_cols)), shape=(n_rows, n_resources)
+        )
+        skills = (completions @ self.catalog.skill_matrix).tocsr()
+        skills.data[:] = 1.0
+        skills.eliminate_zeros()
+        return BehaviorRows(
+            ratings=sparse.csr_matrix((rating_values, (rating_rows, rating_cols)), shape=(n_rows, n_resources)),
+            completions=completions,
+            time_spent=sparse.csr_matrix((time_values, (time_rows, time_cols)), shape=(n_rows, n_resources)),
+            skills=skills
+        )
+
+    def _set_base(self, base: BehaviorRows):
+        """Make base the matrices of every user and empty the overlay"""
+        self._base = base
+        self._base_skill_counts = np.asarray(base.skills.sum(axis=1)).ravel()
+        self._base_high: Dict[float, sparse.csr_matrix] = {}
+        self._overlay_rows = np.empty(0, dtype=np.intp)
+        self._overlay = BehaviorRows(*(sparse.csr_matrix((0, matrix.shape[1])) for matrix in base))
+        self._overlay_skill_counts = np.zeros(0)
+        self._overlay_high: Dict[float, sparse.csr_matrix] = {}
+        self._merged = base
+
+    def _merged_rows(self) -> BehaviorRows:
+        """The base with the overlaid rows replaced, over every user: O(nnz)"""
+        n_users = self.n_users
+        keep = np.ones(n_users)
+        keep[self._overlay_rows] = 0.0
+        keep[self._base.ratings.shape[0]:] = 0.0
+        keep_rows = sparse.diags(keep, format="csr")
+        overlay_rows = len(self._overlay_rows)
+        scatter = sparse.csr_matrix(
+            (np.ones(overlay_rows), (self._overlay_rows, np.arange(overlay_rows))), shape=(n_users, overlay_rows)
+        )
+        merged = []
+        for base, overlay in zip(self._base, self._overlay):
+            matrix = (keep_rows @ _with_rows(base, n_users) + scatter @ overlay).tocsr()
+            matrix.eliminate_zeros()
+            merged.append(matrix)
+        return BehaviorRows(*merged)
+
+    def _full(self) -> BehaviorRows:
+        # Computed once per version, only by readers that need whole matrices (model training)
+        if self._merged is None:
+            self._merged = self._merged_rows()
+        return BehaviorRows(*(_with_rows(matrix, self.n_users) for matrix in self._merged))
+
+    def user_matrices(self):
+        """Current users x skills and users x resources rating matrices"""
+        full = self._full()
+        return full.skills, full.ratings
+
+    def implicit_signals(self):
+        """Current users x resources completion and time-spent matrices"""
+        full = self._full()
+        return full.completions, full.time_spent
+
+    def similar_users(self, skills: Iterable[str], top_k: int = 10, threshold: float = 0.3) -> np.ndarray:
+        """
+        Rows of the users most similar to the given skill set.
+        Jaccard similarity against the whole population is one sparse mat-vec.
+        """
+        return self.similar_users_batch([skills], top_k, threshold)[0]
+
+    def similar_users_batch(self, skill_sets: List[Iterable[str]], top_k: int = 10,
+                            threshold: float = 0.3) -> List[np.ndarray]:
+        """Most similar user rows for each skill set, from one sparse mat-mat product"""
+        skill_sets = [set(skills) for skills in skill_sets]
+        if not self.n_users:
+            return [np.empty(0, dtype=np.intp) for _ in skill_sets]
+
+        queries = self.catalog.skill_sets_matrix(skill_sets)
+        # Only users sharing at least one skill can pass the threshold
+        base = (queries @ self._base.skills.T).tocoo()
+        current = ~np.isin(base.col, self._overlay_rows)
+        overlay = (queries @ self._overlay.skills.T).tocoo()
+        query_rows = np.concatenate([base.row[current], overlay.row])
+        users = np.concatenate([base.col[current], self._overlay_rows[overlay.col]]).astype(np.intp)
+        intersection = np.concatenate([base.data[current], overlay.data])
+        user_counts = np.concatenate([self._base_skill_counts[base.col[current]],
+                                      self._overlay_skill_counts[overlay.col]])
+
+        query_sizes = np.array([len(skills) for skills in skill_sets], dtype=np.float64)
+        union = user_counts + query_sizes[query_rows] - intersection
+        similarity = intersection / np.maximum(union, 1)
+
+        # Sort by query, then user row so similarity ties break deterministically
+        order = np.lexsort((users, query_rows))
+        query_rows, users, similarity = query_rows[order], users[order], similarity[order]
+        bounds = np.searchsorted(query_rows, np.arange(len(skill_sets) + 1))
+        neighbours = []
+        for i in range(len(skill_sets)):
+            start, end = bounds[i], bounds[i + 1]
+            query_users, scores = users[start:end], similarity[start:end]
+            passing = scores > threshold
+            neighbours.append(query_users[passing][top_k_indices(scores[passing], top_k)])
+        return neighbours
+
+    def aggregate_ratings(self, user_rows: np.ndarray, min_rating: float = 4.0) -> np.ndarray:
+        """Sum of ratings >= min_rating per resource over the given users"""
+        return self.aggregate_ratings_batch([user_rows], min_rating).toarray().ravel()
+
+    def aggregate_ratings_batch(self, neighbour_rows: List[np.ndarray], min_rating: float = 4.0) -> sparse.csr_matrix:
+        """Per-query sums of high ratings over each query's neighbours (queries x resources)"""
+        counts = [len(rows) for rows in neighbour_rows]
+        query_rows = np.repeat(np.arange(len(neighbour_rows)), counts)
+        user_rows = np.concatenate(neighbour_rows).astype(np.intp) if neighbour_rows else np.empty(0, dtype=np.intp)
+
+        # Overlaid users are summed from the overlay, every other user from the base
+        order = np.argsort(self._overlay_rows)
+        position = np.searchsorted(self._overlay_rows[order], user_rows)
+        position = np.minimum(position, max(len(order) - 1, 0))
+        overlaid = (self._overlay_rows[order][position] == user_rows) if len(order) else np.zeros(len(user_rows), bool)
+
+        base_selector = sparse.csr_matrix(
+            (np.ones(int((~overlaid).sum())), (query_rows[~overlaid], user_rows[~overlaid])),
+            shape=(len(neighbour_rows), self._base.ratings.shape[0])
+        )
+        aggregate = base_selector @ _high_ratings(self._base.ratings, min_rating, self._base_high)
+        if overlaid.any():
+            overlay_selector = sparse.csr_matrix(
+                (np.ones(int(overlaid.sum())), (query_rows[overlaid], order[position[overlaid]])),
+                shape=(len(neighbour_rows), len(self._overlay_rows))
+            )
+            aggregate = aggregate + overlay_selector @ _high_ratings(self._overlay.ratings, min_rating,
+                                                                     self._overlay_high)
+        return aggregate.tocsr()
+
+
+def _high_ratings(ratings: sparse.csr_matrix, min_rating: float, cache: Dict[float, sparse.csr_matrix]):
+    """Ratings below min_rating dropped, memoized per matrix version"""
+    high = cache.get(min_rating)
+    if high is None:
+        high = cache[min_rating] = ratings.multiply(ratings >= min_rating).tocsr()
+    return high
+
+
+def _with_rows(matrix: sparse.csr_matrix, n_rows: int) -> sparse.csr_matrix:
+    """The CSR matrix padded with empty rows up to n_rows, sharing its data arrays"""
+    extra = n_rows - matrix.shape[0]
+    if extra <= 0:
+        return matrix
+    indptr = np.concatenate([matrix.indptr, np.full(extra, matrix.indptr[-1], dtype=matrix.indptr.dtype)])
+    return sparse.csr_matrix((matrix.data, matrix.indices, indptr), shape=(n_rows, matrix.shape[1]))
@@ -0,0 +1,333 @@
+"""
+Durable Learner Behaviour Store
+SQLite append-only feedback log, compacted into per-user snapshot tables
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BEHAVIOR_DB = os.environ.get(
+    "RECOMMENDATION_BEHAVIOR_DB",
+    os.path.join(os.path.dirname(__file__), "engine_state", "behavior.sqlite3")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    rating REAL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    time_spent INTEGER,
+    learning_patterns TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_resources (
+    user_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    rating REAL,
+    completed_seq INTEGER,
+    time_spent INTEGER,
+    PRIMARY KEY (user_id, resource_id)
+);
+CREATE TABLE IF NOT EXISTS user_patterns (
+    user_id TEXT PRIMARY KEY,
+    learning_patterns TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class FeedbackEvent:
+    """One rating/completion/time-spent update for a learner and resource"""
+    user_id: str
+    resource_id: str
+    rating: Optional[float] = None
+    completed: bool = False
+    time_spent: Optional[int] = None
+    learning_patterns: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+
+    @classmethod
+    def from_feedback(cls, user_id: str, resource_id: str, feedback: Dict[str, Any]) -> "FeedbackEvent":
+        """Validate a feedback payload; raises ValueError on malformed fields"""
+        if not user_id or not resource_id:
+            raise ValueError("user_id and resource_id are required")
+        return cls(
+            user_id=str(user_id),
+            resource_id=str(resource_id),
+            rating=float(feedback["rating"]) if feedback.get("rating") is not None else None,
+            completed=bool(feedback.get("completed", False)),
+            time_spent=int(feedback["time_spent"]) if feedback.get("time_spent") is not None else None,
+            learning_patterns=dict(feedback.get("learning_patterns") or {})
+        )
+
+    def feedback(self) -> Dict[str, Any]:
+        """The event as the feedback dict accepted by the engine and model trainer"""
+        feedback: Dict[str, Any] = {"completed": self.completed}
+        if self.rating is not None:
+            feedback["rating"] = self.rating
+        if self.time_spent is not None:
+            feedback["time_spent"] = self.time_spent
+        if self.learning_patterns:
+            feedback["learning_patterns"] = self.learning_patterns
+        return feedback
+
+
+class BehaviorStore:
+    """
+    Learner behaviour shared by every worker process.
+
+    Feedback is appended to an event log in a WAL-mode SQLite database.
+    Once the log grows past ``compact_every_events`` it is folded into
+    per-user snapshot tables and truncated, so loading the full history
+    reads the compact snapshot plus a short tail of events. Workers catch
+    up on each other's writes with ``events_since``.
+    """
+
+    def __init__(self, path: str = DEFAULT_BEHAVIOR_DB, compact_every_events: int = 10000):
+        self.path = path
+        self.compact_every_events = compact_every_events
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread, and never reused by a forked worker
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def append(self, events: List[FeedbackEvent]) -> int:
+        """Append events in one transaction; returns the sequence number of the last one"""
+        if not events:
+            return self.last_seq()
+
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            self._insert_events(connection, events)
+            last_seq, log_size = connection.execute(
+                "SELECT MAX(seq), COUNT(*) FROM feedback_events"
+            ).fetchone()
+
+        if log_size >= self.compact_every_events:
+            self.compact()
+        return last_seq
+
+    def seed(self, events: List[FeedbackEvent]) -> bool:
+        """Append events only if the store is empty; returns whether they were written"""
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if self._is_empty(connection):
+                self._insert_events(connection, events)
+                return True
+        return False
+
+    def _insert_events(self, connection: sqlite3.Connection, events: List[FeedbackEvent]):
+        now = time.time()
+        connection.executemany(
+            "INSERT INTO feedback_events "
+            "(user_id, resource_id, rating, completed, time_spent, learning_patterns, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (event.user_id, event.resource_id, event.rating, int(event.completed), event.time_spent,
+                 json.dumps(event.learning_patterns) if event.learning_patterns else None, now)
+                for event in events
+            ]
+        )
+
+    @staticmethod
+    def _is_empty(connection: sqlite3.Connection) -> bool:
+        return (connection.execute("SELECT 1 FROM feedback_events LIMIT 1").fetchone() is None
+                and connection.execute("SELECT 1 FROM user_resources LIMIT 1").fetchone() is None
+                and connection.execute("SELECT 1 FROM user_patterns LIMIT 1").fetchone() is None)
+
+    def last_seq(self) -> int:
+        connection = self._connection()
+        row = connection.execute("SELECT MAX(seq) FROM feedback_events").fetchone()
+        return max(row[0] or 0, self._compacted_seq(connection))
+
+    @staticmethod
+    def _compacted_seq(connection: sqlite3.Connection) -> int:
+        row = connection.execute("SELECT value FROM store_meta WHERE key = 'compacted_seq'").fetchone()
+        return row[0] if row else 0
+
+    def events_since(self, seq: int) -> Optional[List[FeedbackEvent]]:
+        """
+        Events logged after seq, in order. Returns None when some of them have
+        already been compacted away, in which case the caller must reload.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            if seq < self._compacted_seq(connection):
+                return None
+            rows = connection.execute(
+                "SELECT seq, user_id, resource_id, rating, completed, time_spent, learning_patterns "
+                "FROM feedback_events WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+        return [self._event(row) for row in rows]
+
+    @staticmethod
+    def _event(row: Tuple) -> FeedbackEvent:
+        seq, user_id, resource_id, rating, completed, time_spent, learning_patterns = row
+        return FeedbackEvent(
+            user_id=user_id,
+            resource_id=resource_id,
+            rating=rating,
+            completed=bool(completed),
+            time_spent=time_spent,
+            learning_patterns=json.loads(learning_patterns) if learning_patterns else {},
+            seq=seq
+        )
+
+    def load(self, new_record: Callable[[str], Any]) -> Tuple[Dict[str, Any], int]:
+        """
+        Every learner's behaviour keyed by user id, and the sequence number it
+        is current to. new_record(user_id) creates an empty record with
+        completed_resources, resource_ratings, time_spent and learning_patterns.
+        """
+        connection = self._connection()
+        records: Dict[str, Any] = {}
+
+        def record_for(user_id: str):
+            if user_id not in records:
+                records[user_id] = new_record(user_id)
+            return records[user_id]
+
+        with connection:
+            connection.execute("BEGIN")
+            completions = []
+            for user_id, resource_id, rating, completed_seq, time_spent in connection.execute(
+                "SELECT user_id, resource_id, rating, completed_seq, time_spent FROM user_resources"
+            ):
+                record = record_for(user_id)
+                if rating is not None:
+                    record.resource_ratings[resource_id] = rating
+                if time_spent is not None:
+                    record.time_spent[resource_id] = time_spent
+                if completed_seq is not None:
+                    completions.append((completed_seq, user_id, resource_id))
+            for user_id, learning_patterns in connection.execute(
+                "SELECT user_id, learning_patterns FROM user_patterns"
+            ):
+                record = record_for(user_id)
+                record.learning_patterns.update(json.loads(learning_patterns))
+            # Completion lists keep the order resources were completed in
+            for _, user_id, resource_id in sorted(completions):
+                records[user_id].completed_resources.append(resource_id)
+
+            seq = self._compacted_seq(connection)
+            tail = connection.execute(
+                "SELECT seq, user_id, resource_id, rating, completed, time_spent, learning_patterns "
+                "FROM feedback_events WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+        for row in tail:
+            event = self._event(row)
+            self.apply(record_for(event.user_id), event)
+            seq = event.seq
+        return records, seq
+
+    @staticmethod
+    def apply(record: Any, event: FeedbackEvent) -> bool:
+        """Fold an event into a behaviour record; returns whether ratings or completions changed"""
+        changed = False
+        if event.rating is not None:
+            record.resource_ratings[event.resource_id] = event.rating
+            changed = True
+        if event.completed and event.resource_id not in record.completed_resources:
+            record.completed_resources.append(event.resource_id)
+            changed = True
+        if event.time_spent is not None:
+            record.time_spent[event.resource_id] = event.time_spent
+        record.learning_patterns.update(event.learning_patterns)
+        return changed
+
+    def compact(self) -> int:
+        """Fold the event log into the snapshot tables and truncate it; returns events folded"""
+        connection = self._connection()
+        started = time.perf_counter()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT seq, user_id, resource_id, rating, completed, time_spent, learning_patterns "
+                "FROM feedback_events ORDER BY seq"
+            ).fetchall()
+            if not rows:
+                return 0
+            events = [self._event(row) for row in rows]
+
+            connection.executemany(
+                "INSERT INTO user_resources (user_id, resource_id, rating, completed_seq, time_spent) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, resource_id) DO UPDATE SET "
+                "rating = COALESCE(excluded.rating, rating), "
+                "completed_seq = COALESCE(completed_seq, excluded.completed_seq), "
+                "time_spent = COALESCE(excluded.time_spent, time_spent)",
+                [
+                    (event.user_id, event.resource_id, event.rating,
+                     event.seq if event.completed else None, event.time_spent)
+                    for event in events
+                ]
+            )
+
+            patterns: Dict[str, Dict[str, Any]] = {}
+            for event in events:
+                if event.learning_patterns:
+                    patterns.setdefault(event.user_id, {}).update(event.learning_patterns)
+            for user_id, learning_patterns in patterns.items():
+                row = connection.execute(
+                    "SELECT learning_patterns FROM user_patterns WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                merged = {**(json.loads(row[0]) if row else {}), **learning_patterns}
+                connection.execute(
+                    "INSERT OR REPLACE INTO user_patterns (user_id, learning_patterns) VALUES (?, ?)",
+                    (user_id, json.dumps(merged))
+                )
+
+            last_seq = events[-1].seq
+            connection.execute("DELETE FROM feedback_events WHERE seq <= ?", (last_seq,))
+            connection.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('compacted_seq', ?)", (last_seq,)
+            )
+
+        logger.info(f"✅ Compacted {len(events)} behaviour events in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return len(events)
+
+    def get_stats(self) -> Dict[str, Any]:
+        connection = self._connection()
+        log_size, last_seq = connection.execute("SELECT COUNT(*), MAX(seq) FROM feedback_events").fetchone()
+        users, pairs = connection.execute(
+            "SELECT COUNT(DISTINCT user_id), COUNT(*) FROM user_resources"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "log_events": log_size,
+            "last_seq": max(last_seq or 0, self._compacted_seq(connection)),
+            "compacted_seq": self._compacted_seq(connection),
+            "snapshot_users": users,
+            "snapshot_user_resources": pairs,
+            "compact_every_events": self.compact_every_events
+        }
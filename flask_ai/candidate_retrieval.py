@@ -0,0 +1,234 @@
+"""
+Candidate Retrieval
+Cheap first-stage candidate generation from learner clusters and skill postings
+"""
+
+import numpy as np
+from scipy import sparse
+from dataclasses import dataclass, field
+from typing import List, Iterable, Optional, Tuple
+import logging
+
+from resource_catalog import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScoredCandidates:
+    """
+    Relevance scores for a set of catalog rows (ascending), either a
+    retrieved candidate set or the whole catalog.
+    """
+    rows: np.ndarray
+    scores: np.ndarray
+    # Positions of the best scores, best first; a request asks for several short
+    # prefixes (pathway, pools, alternatives), so one ranking serves them all
+    _ranked: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    RANKED_PREFIX = 64
+
+    @classmethod
+    def full(cls, scores: np.ndarray) -> "ScoredCandidates":
+        return cls(np.arange(len(scores)), scores)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def top_positions(self, k: int) -> np.ndarray:
+        """Positions of the k highest scores, best first, ties broken by row"""
+        if self._ranked is None or len(self._ranked) < min(k, len(self.scores)):
+            self._ranked = top_k_indices(self.scores, max(k, self.RANKED_PREFIX))
+        return self._ranked[:k]
+
+    def top(self, k: int) -> np.ndarray:
+        """Catalog rows of the k highest scores, best first, ties broken by row"""
+        return self.rows[self.top_positions(k)]
+
+    def top_scored(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Catalog rows and scores of the k highest scores, best first"""
+        positions = self.top_positions(k)
+        return self.rows[positions], self.scores[positions]
+
+    def scores_for(self, rows: np.ndarray) -> np.ndarray:
+        """Scores of the given catalog rows; rows outside the set score -inf"""
+        if not len(self.rows):
+            return np.full(len(rows), -np.inf)
+        positions = np.minimum(np.searchsorted(self.rows, rows), len(self.rows) - 1)
+        return np.where(self.rows[positions] == rows, self.scores[positions], -np.inf)
+
+
+class CandidateRetriever:
+    """
+    First retrieval stage: several hundred candidate rows per learner
+    without scoring the whole catalog.
+
+    Learner skill profiles are clustered (KMeans over L2-normalized
+    users x skills rows). Each cluster gets a precomputed list of the
+    resources that best cover its centroid's skills and that its members
+    rated highly. A query is assigned to its nearest centroid and joined
+    with the best resources from the skill postings of its skills, plus a
+    short list of generally strong resources, so learners with no history
+    or no skills still get candidates.
+
+    Skill postings are split by NSQF level and ranked by the learner-
+    independent part of the second-stage score, so a query reads the best
+    resources of each skill at the levels near its target rather than the
+    best resources of the skill overall. The rows read are pruned to
+    per_query by a bound on their second-stage score, which counts a
+    resource once for every wanted skill it covers, so resources covering
+    several gap skills survive even when none of their postings ranks them
+    first. The cost of a query follows the number of clusters, skills and
+    the posting depth, not the catalog size.
+    """
+
+    def __init__(self,
+                 catalog,
+                 user_skills: sparse.csr_matrix,
+                 user_ratings: sparse.csr_matrix,
+                 clusterer=None,
+                 n_clusters: int = 10,
+                 per_cluster: int = 200,
+                 per_skill: int = 2000,
+                 per_query: int = 600,
+                 popular: int = 50,
+                 level_band: int = 4,
+                 catalog_version: int = 0):
+        n = len(catalog)
+        self.n_resources = n
+        # Serving catalog version the rows refer to, kept current by the owner
+        self.catalog_version = catalog_version
+        self.skill_index = catalog.skill_index
+        self.per_skill = per_skill
+        self.per_query = per_query
+        self.level_band = level_band
+        self.nsqf_level = catalog.nsqf_level
+
+        # Resource quality independent of any learner: the static content terms,
+        # plus the training targets of the predictors in place of their predictions
+        quality = (catalog.static_content_scores() + catalog.ratings_or(4.0)
+                   + catalog.employment_impact * 10)
+        self.quality = quality
+        self.popular_rows = np.sort(top_k_indices(quality, popular))
+
+        # Per-(skill, NSQF level) postings truncated to the best resources of each
+        self.n_levels = int(catalog.nsqf_level.max(initial=0)) + 1
+        columns = catalog.skill_matrix.tocsc()
+        rows = columns.indices
+        keys = np.repeat(np.arange(columns.shape[1]), np.diff(columns.indptr)) * self.n_levels + catalog.nsqf_level[rows]
+        order = np.lexsort((rows, -quality[rows], keys))
+        counts = np.bincount(keys, minlength=columns.shape[1] * self.n_levels)
+        keep = np.arange(len(order)) - np.concatenate([[0], np.cumsum(counts)])[keys[order]] < per_skill
+        self.skill_rows = rows[order][keep].astype(np.int32)
+        self.skill_offsets = np.concatenate([[0], np.cumsum(np.minimum(counts, per_skill))])
+
+        # Learner clusters and their candidate lists
+        self.centroids = np.zeros((0, catalog.skill_matrix.shape[1]))
+        self.cluster_rows = np.zeros((0, 0), dtype=np.int32)
+        n_users = user_skills.shape[0]
+        active = np.flatnonzero(user_skills.getnnz(axis=1))
+        if clusterer is not None and len(active) >= 2:
+            profiles = _normalize_rows(user_skills[active])
+            clusterer.set_params(n_clusters=min(n_clusters, len(active)))
+            labels = clusterer.fit_predict(profiles)
+            self.centroids = np.asarray(clusterer.cluster_centers_)
+
+            members = sparse.csr_matrix(
+                (np.ones(len(active)), (labels, active)), shape=(len(self.centroids), n_users)
+            )
+            popularity = (members @ user_ratings.multiply(user_ratings >= 4.0)).toarray()
+            popularity /= np.maximum(popularity.max(axis=1, keepdims=True), 1e-9)
+            affinity = (catalog.skill_matrix @ self.centroids.T).T
+            affinity /= np.maximum(affinity.max(axis=1, keepdims=True), 1e-9)
+            cluster_scores = affinity * 10 + popularity * 5 + quality[None, :] / 5
+            self.cluster_rows = np.stack([
+                np.sort(top_k_indices(scores, min(per_cluster, n))) for scores in cluster_scores
+            ]).astype(np.int32)
+
+        logger.info(f"✅ Candidate retriever built: {len(self.centroids)} learner clusters, "
+                    f"{len(self.skill_rows)} skill postings")
+
+    def nearest_clusters(self, skill_sets: List[Iterable[str]]) -> np.ndarray:
+        """Nearest learner cluster for each skill set, -1 for empty sets or no clusters"""
+        clusters = np.full(len(skill_sets), -1)
+        if not len(self.centroids):
+            return clusters
+        # Queries are a handful of short skill sets: dense rows avoid sparse setup costs
+        queries = _indicator_rows(skill_sets, self.skill_index, self.centroids.shape[1])
+        norms = np.linalg.norm(queries, axis=1)
+        queries /= np.maximum(norms, 1e-12)[:, None]
+        # Squared distance to a centroid, dropping the constant |query|^2 term
+        distances = (self.centroids ** 2).sum(axis=1)[None, :] - 2 * (queries @ self.centroids.T)
+        nonempty = norms > 0
+        clusters[nonempty] = np.argmin(distances[nonempty], axis=1)
+        return clusters
+
+    def skill_hits(self, skills: Iterable[str], target_level: Optional[int] = None) -> np.ndarray:
+        """
+        Best resources from the postings of each skill, at NSQF levels within
+        level_band of target_level (default: at every level). skills may map
+        each skill to a weight. Beyond per_query hits, the rows are pruned by
+        a bound on their second-stage score: weighted coverage of the skills
+        seen in the postings, quality and NSQF fit.
+        """
+        if target_level is None:
+            levels = np.arange(self.n_levels)
+        else:
+            levels = np.arange(max(target_level - self.level_band, 0),
+                               min(target_level + self.level_band + 1, self.n_levels))
+        weights = skills if isinstance(skills, dict) else dict.fromkeys(skills, 1.0)
+        hits, hit_weights = [], []
+        for skill, weight in weights.items():
+            col = self.skill_index.get(skill)
+            if col is None:
+                continue
+            for key in (col * self.n_levels + levels).tolist():
+                postings = self.skill_rows[self.skill_offsets[key]:self.skill_offsets[key + 1]]
+                hits.append(postings)
+                hit_weights.append(np.full(len(postings), weight))
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+        hits = np.concatenate(hits)
+        coverage = np.bincount(hits, weights=np.concatenate(hit_weights), minlength=self.n_resources)
+        rows = np.flatnonzero(coverage)
+        if len(rows) <= self.per_query:
+            return rows
+        bound = coverage[rows] * 10 + self.quality[rows]
+        if target_level is not None:
+            bound += np.maximum(0, 10 - np.abs(self.nsqf_level[rows] - target_level) * 2)
+        return rows[top_k_indices(bound, self.per_query)]
+
+    def candidates(self,
+                   skill_sets: List[Iterable[str]],
+                   query_skills: Optional[List[Iterable[str]]] = None,
+                   target_levels: Optional[List[int]] = None) -> List[np.ndarray]:
+        """
+        Candidate catalog rows (ascending) for each learner. skill_sets place
+        the learner in a cluster; query_skills (default: the same sets) are
+        looked up in the skill postings, near each learner's target NSQF level
+        when target_levels is given.
+        """
+        skill_sets = [set(skills) for skills in skill_sets]
+        query_skills = skill_sets if query_skills is None else query_skills
+        target_levels = [None] * len(skill_sets) if target_levels is None else target_levels
+        clusters = self.nearest_clusters(skill_sets)
+        results = []
+        for cluster, skills, level in zip(clusters, query_skills, target_levels):
+            parts = [self.popular_rows, self.skill_hits(skills, level)]
+            if cluster >= 0:
+                parts.append(self.cluster_rows[cluster])
+            results.append(np.unique(np.concatenate(parts)).astype(np.intp))
+        return results
+
+
+def _indicator_rows(skill_sets: List[Iterable[str]], skill_index, n_skills: int) -> np.ndarray:
+    rows = np.zeros((len(skill_sets), n_skills))
+    for i, skills in enumerate(skill_sets):
+        rows[i, [skill_index[skill] for skill in skills if skill in skill_index]] = 1.0
+    return rows
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1 / np.maximum(norms, 1e-12)) @ matrix
+
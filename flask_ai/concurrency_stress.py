@@ -0,0 +1,180 @@
+"""
+Concurrency Stress Harness
+Reader threads requesting recommendations while writer threads post feedback
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+import logging
+
+from advanced_recommendation_engine import AdvancedRecommendationEngine, RecommendationAlgorithm
+from behavior_store import BehaviorStore, FeedbackEvent
+
+logger = logging.getLogger(__name__)
+
+STRESS_SKILLS = ["python", "data_analysis", "statistics", "machine_learning", "sql", "html",
+                 "javascript", "aws", "cloud_computing", "docker", "seo", "database"]
+STRESS_ASPIRATIONS = ["data scientist", "web developer", "cloud engineer", "digital marketer"]
+
+
+class _ErrorCounter(logging.Handler):
+    """Counts error records; the engine logs and falls back rather than raising"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+        self.messages: List[str] = []
+
+    def emit(self, record):
+        self.count += 1
+        if len(self.messages) < 10:
+            self.messages.append(record.getMessage())
+
+
+def _random_profile(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "career_aspirations": rng.choice(STRESS_ASPIRATIONS),
+        "prior_skills": rng.sample(STRESS_SKILLS, rng.randint(0, 3)),
+        "budget": rng.choice([5000, 20000, 50000]),
+        # Varying the profile keeps most requests out of the result cache
+        "max_hours": rng.randint(50, 500)
+    }
+
+
+def run_stress(engine: AdvancedRecommendationEngine,
+               readers: int = 8,
+               writers: int = 2,
+               seconds: float = 5.0,
+               events_per_write: int = 5,
+               n_users: int = 200,
+               seed: int = 0) -> Dict[str, Any]:
+    """
+    Run reader and writer threads against one engine for a fixed time.
+
+    Readers request recommendations (all algorithms, plus explanations and
+    Pareto pathways) and check that each pinned serving state is
+    internally consistent; writers post batches of feedback events.
+    Returns throughput and every exception, fallback, error log record and
+    inconsistent state seen.
+    """
+    engine._ensure_state()
+    resource_ids = engine.resource_catalog.ids()
+    algorithms = list(RecommendationAlgorithm)
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "writes": 0, "events": 0, "fallbacks": 0, "inconsistent": 0,
+             "exceptions": [], "versions_seen": set()}
+
+    def record(key: str, amount: int = 1):
+        with lock:
+            stats[key] += amount
+
+    def reader(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while not stop.is_set():
+            try:
+                with engine._pinned_state() as state:
+                    matrix = state.behavior_matrix
+                    if (matrix.catalog is not state.resource_catalog
+                            or len(matrix) != len(state.user_behavior_history)):
+                        record("inconsistent")
+                    with lock:
+                        stats["versions_seen"].add(state.version)
+
+                profile = _random_profile(rng)
+                result = engine.generate_personalized_recommendations(
+                    profile, algorithm=rng.choice(algorithms), max_resources=5
+                )
+                if result.pathway_id.startswith("fallback"):
+                    record("fallbacks")
+                if rng.random() < 0.2:
+                    engine.get_recommendation_explanation(result, profile)
+                    engine.get_pareto_pathways(profile, max_resources=5)
+                record("reads")
+            except Exception as e:
+                with lock:
+                    stats["exceptions"].append(f"reader: {type(e).__name__}: {e}")
+
+    def writer(index: int):
+        rng = random.Random(seed * 1000 + 500 + index)
+        while not stop.is_set():
+            try:
+                events = [
+                    FeedbackEvent(
+                        user_id=f"stress_user_{rng.randrange(n_users)}",
+                        resource_id=rng.choice(resource_ids),
+                        rating=round(rng.uniform(1, 5), 1),
+                        completed=rng.random() < 0.7,
+                        time_spent=rng.randint(1, 40)
+                    )
+                    for _ in range(events_per_write)
+                ]
+                engine.update_user_feedback_batch(events)
+                record("writes")
+                record("events", len(events))
+            except Exception as e:
+                with lock:
+                    stats["exceptions"].append(f"writer: {type(e).__name__}: {e}")
+
+    errors = _ErrorCounter()
+    engine_logger = logging.getLogger("advanced_recommendation_engine")
+    engine_logger.addHandler(errors)
+    threads = ([threading.Thread(target=reader, args=(i,), daemon=True) for i in range(readers)]
+               + [threading.Thread(target=writer, args=(i,), daemon=True) for i in range(writers)])
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        engine_logger.removeHandler(errors)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "readers": readers,
+        "writers": writers,
+        "seconds": round(elapsed, 2),
+        "reads": stats["reads"],
+        "reads_per_second": round(stats["reads"] / elapsed, 1),
+        "writes": stats["writes"],
+        "events": stats["events"],
+        "events_per_second": round(stats["events"] / elapsed, 1),
+        "state_versions_seen": len(stats["versions_seen"]),
+        "fallbacks": stats["fallbacks"],
+        "inconsistent_states": stats["inconsistent"],
+        "error_logs": errors.count,
+        "error_messages": errors.messages,
+        "exceptions": stats["exceptions"][:10],
+        "exception_count": len(stats["exceptions"])
+    }
+
+
+if __name__ == "__main__":
+    # Readers alone, then readers with writers, against a throwaway behaviour store
+    import json
+    import sys
+
+    logging.basicConfig(level=logging.WARNING)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    with tempfile.TemporaryDirectory() as directory:
+        engine = AdvancedRecommendationEngine(
+            behavior_store=BehaviorStore(os.path.join(directory, "behavior.sqlite3")),
+            behavior_sync_interval_seconds=0.05
+        )
+        baseline = run_stress(engine, readers=8, writers=0, seconds=seconds)
+        loaded = run_stress(engine, readers=8, writers=4, seconds=seconds)
+        engine.model_trainer.stop()
+    print(json.dumps({"readers_only": baseline, "readers_and_writers": loaded}, indent=2))
+    ratio = loaded["reads_per_second"] / max(baseline["reads_per_second"], 1e-9)
+    print(f"read throughput with writers: {ratio:.0%} of readers alone")
+    clean = all(run["exception_count"] == 0 and run["fallbacks"] == 0 and run["inconsistent_states"] == 0
+                and run["error_logs"] == 0 for run in (baseline, loaded))
+    print("✅ No errors under concurrent load" if clean else "❌ Errors under concurrent load")
+    sys.exit(0 if clean else 1)
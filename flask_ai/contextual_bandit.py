@@ -0,0 +1,292 @@
+"""
+Contextual Bandit
+Online LinUCB over learning resources, updated on every feedback event
+"""
+
+import os
+import threading
+import time
+import zlib
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+PACES = ("slow", "medium", "fast")
+ASPIRATION_BUCKETS = 7
+# bias, NSQF level, pace (3), budget, hours, prior skills, skill gap, hashed aspiration words
+CONTEXT_DIMENSION = 9 + ASPIRATION_BUCKETS
+
+
+def context_vector(target_nsqf_level: int,
+                   learning_pace: str,
+                   budget: float,
+                   max_hours: float,
+                   n_prior_skills: int,
+                   missing_fraction: float,
+                   aspiration: str) -> np.ndarray:
+    """Learner context features for the bandit, each scaled to [0, 1]"""
+    x = np.zeros(CONTEXT_DIMENSION)
+    x[0] = 1.0
+    x[1] = min(max(target_nsqf_level, 0), 10) / 10
+    if learning_pace in PACES:
+        x[2 + PACES.index(learning_pace)] = 1.0
+    x[5] = min(np.log1p(budget) / np.log1p(100000), 1.0) if np.isfinite(budget) else 1.0
+    x[6] = min(np.log1p(max_hours) / np.log1p(1000), 1.0) if np.isfinite(max_hours) else 1.0
+    x[7] = min(n_prior_skills, 10) / 10
+    x[8] = min(max(missing_fraction, 0.0), 1.0)
+    # crc32 rather than hash(): buckets must agree across processes and restarts
+    words = aspiration.split()
+    for word in words:
+        x[9 + zlib.crc32(word.encode("utf-8")) % ASPIRATION_BUCKETS] += 1.0 / len(words)
+    return x
+
+
+def feedback_reward(rating: Optional[float], completed: bool) -> Optional[float]:
+    """Reward in [0, 1]: the rating rescaled from 1-5, averaged with completion when both are known"""
+    parts = [1.0] if completed else []
+    if rating is not None:
+        parts.append(min(max((float(rating) - 1.0) / 4.0, 0.0), 1.0))
+    return sum(parts) / len(parts) if parts else None
+
+
+@dataclass
+class ArmStatistics:
+    """Per-arm LinUCB statistics in contiguous arrays, one row per resource"""
+    resource_ids: List[str]
+    index: Dict[str, int]
+    a_inv: np.ndarray       # arms x d x d, inverse of the ridge design matrix
+    b: np.ndarray           # arms x d, reward-weighted context sums
+    theta: np.ndarray       # arms x d, a_inv @ b
+    pulls: np.ndarray       # arms, feedback events
+    reward_sum: np.ndarray  # arms
+
+    @classmethod
+    def empty(cls, resource_ids: Sequence[str], dimension: int, ridge: float) -> "ArmStatistics":
+        n = len(resource_ids)
+        return cls(
+            resource_ids=list(resource_ids),
+            index={resource_id: arm for arm, resource_id in enumerate(resource_ids)},
+            a_inv=np.tile(np.eye(dimension) / ridge, (n, 1, 1)),
+            b=np.zeros((n, dimension)),
+            theta=np.zeros((n, dimension)),
+            pulls=np.zeros(n, dtype=np.int64),
+            reward_sum=np.zeros(n)
+        )
+
+    def remapped(self, resource_ids: Sequence[str], ridge: float) -> "ArmStatistics":
+        """Statistics for another resource list, carried over by resource id"""
+        arms = ArmStatistics.empty(resource_ids, self.b.shape[1], ridge)
+        pairs = [(arm, self.index[resource_id]) for resource_id, arm in arms.index.items()
+                 if resource_id in self.index]
+        if pairs:
+            new, old = np.array(pairs, dtype=np.intp).T
+            for name in ("a_inv", "b", "theta", "pulls", "reward_sum"):
+                getattr(arms, name)[new] = getattr(self, name)[old]
+        return arms
+
+
+class LinUCBBandit:
+    """
+    Disjoint LinUCB (Li et al., 2010): one ridge regression of reward on
+    learner context per resource. A resource scores theta . x plus
+    alpha * sqrt(x' A^-1 x), so rarely tried resources get an exploration
+    bonus that shrinks as feedback arrives.
+
+    Each feedback event updates one arm in O(d^2): A^-1 by Sherman-Morrison
+    and theta from it. There is no batch retraining. The arm statistics are
+    swapped whole when the catalog changes. Otherwise updates write one arm's
+    rows in place, and readers take no lock. A score computed while its arm
+    is being updated may mix old and new statistics of that one arm.
+
+    Feedback is credited to the context the learner was last served with
+    (``remember``). Learners served by another worker, or too long ago, fall
+    back to a bias-only context, which still learns the arm's mean reward.
+    """
+
+    def __init__(self,
+                 resource_ids: Sequence[str],
+                 dimension: int = CONTEXT_DIMENSION,
+                 alpha: float = 0.5,
+                 ridge: float = 1.0,
+                 max_remembered: int = 100000):
+        self.dimension = dimension
+        self.alpha = alpha
+        self.ridge = ridge
+        self.max_remembered = max_remembered
+        self.arms = ArmStatistics.empty(resource_ids, dimension, ridge)
+        # Last behaviour store sequence number folded in
+        self.seq = 0
+        self.updates = 0
+        self.default_context = np.eye(dimension)[0]
+        self._served: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scores(self, x: np.ndarray, resource_ids: Sequence[str]) -> np.ndarray:
+        """Upper confidence bound of each resource's reward for context x"""
+        arms = self.arms
+        rows = np.array([arms.index.get(resource_id, -1) for resource_id in resource_ids], dtype=np.intp)
+        known = rows >= 0
+        scores = np.full(len(rows), self.alpha * np.sqrt(x @ x / self.ridge))
+        if known.any():
+            arm_rows = rows[known]
+            variance = np.einsum("i,aij,j->a", x, arms.a_inv[arm_rows], x)
+            scores[known] = arms.theta[arm_rows] @ x + self.alpha * np.sqrt(np.maximum(variance, 0.0))
+        return scores
+
+    def remember(self, user_id: str, x: np.ndarray):
+        """Record the context a learner was served with, for crediting their feedback"""
+        with self._lock:
+            self._served[user_id] = x
+            self._served.move_to_end(user_id)
+            while len(self._served) > self.max_remembered:
+                self._served.popitem(last=False)
+
+    def update(self, resource_id: str, x: np.ndarray, reward: float) -> bool:
+        """Fold one observed reward into the resource's arm; returns whether the resource is an arm"""
+        with self._lock:
+            return self._update(resource_id, x, reward)
+
+    def _update(self, resource_id: str, x: np.ndarray, reward: float) -> bool:
+        arms = self.arms
+        arm = arms.index.get(resource_id)
+        if arm is None:
+            return False
+        a_inv = arms.a_inv[arm]
+        a_inv_x = a_inv @ x
+        a_inv -= np.outer(a_inv_x, a_inv_x) / (1.0 + x @ a_inv_x)
+        arms.b[arm] += reward * x
+        arms.theta[arm] = a_inv @ arms.b[arm]
+        arms.pulls[arm] += 1
+        arms.reward_sum[arm] += reward
+        self.updates += 1
+        return True
+
+    def update_events(self, events: Iterable[Any]) -> int:
+        """Fold feedback events not seen yet (by store sequence number) into the arms; returns arms updated"""
+        updated = 0
+        with self._lock:
+            for event in events:
+                if event.seq and event.seq <= self.seq:
+                    continue
+                self.seq = max(self.seq, event.seq)
+                reward = feedback_reward(event.rating, event.completed)
+                if reward is None:
+                    continue
+                x = self._served.get(event.user_id, self.default_context)
+                updated += self._update(event.resource_id, x, reward)
+        return updated
+
+    def reset_catalog(self, resource_ids: Sequence[str]):
+        """Switch arms to a new resource list, keeping the statistics of resources still present"""
+        with self._lock:
+            self.arms = self.arms.remapped(resource_ids, self.ridge)
+
+    def save(self, path: str):
+        """Write the arm statistics atomically as uncompressed NumPy arrays"""
+        with self._lock:
+            arms = self.arms
+            state = {
+                "resource_ids": np.array(arms.resource_ids, dtype=str),
+                "a_inv": arms.a_inv.copy(),
+                "b": arms.b.copy(),
+                "pulls": arms.pulls.copy(),
+                "reward_sum": arms.reward_sum.copy(),
+                "seq": np.int64(self.seq),
+                "updates": np.int64(self.updates),
+                "parameters": np.array([self.dimension, self.alpha, self.ridge])
+            }
+        temporary_path = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            np.savez(temporary_path, **state)
+            os.replace(temporary_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save bandit state to {path}: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    @classmethod
+    def load(cls, path: str, resource_ids: Sequence[str], **kwargs) -> Optional["LinUCBBandit"]:
+        """Saved bandit mapped onto the given resources, or None if missing, unreadable or of another shape"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as saved:
+                state = {name: saved[name] for name in saved.files}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read bandit state from {path}: {e}")
+            return None
+
+        dimension, alpha, ridge = state["parameters"]
+        if int(dimension) != CONTEXT_DIMENSION:
+            logger.info(f"Bandit state {path} has another context dimension, starting fresh")
+            return None
+        bandit = cls([], dimension=int(dimension), alpha=float(alpha), ridge=float(ridge), **kwargs)
+        b = state["b"]
+        saved_ids = [str(resource_id) for resource_id in state["resource_ids"]]
+        saved_arms = ArmStatistics(
+            resource_ids=saved_ids,
+            index={resource_id: arm for arm, resource_id in enumerate(saved_ids)},
+            a_inv=state["a_inv"],
+            b=b,
+            theta=np.einsum("aij,aj->ai", state["a_inv"], b),
+            pulls=state["pulls"],
+            reward_sum=state["reward_sum"]
+        )
+        bandit.arms = saved_arms.remapped(resource_ids, bandit.ridge)
+        bandit.seq = int(state["seq"])
+        bandit.updates = int(state["updates"])
+        return bandit
+
+    def get_stats(self) -> Dict[str, Any]:
+        arms = self.arms
+        pulled = arms.pulls > 0
+        return {
+            "arms": len(arms.resource_ids),
+            "arms_with_feedback": int(pulled.sum()),
+            "updates": self.updates,
+            "last_seq": self.seq,
+            "mean_reward": round(float(arms.reward_sum.sum() / max(arms.pulls.sum(), 1)), 4),
+            "remembered_contexts": len(self._served),
+            "dimension": self.dimension,
+            "alpha": self.alpha,
+            "state_bytes": int(arms.a_inv.nbytes + arms.b.nbytes + arms.theta.nbytes
+                               + arms.pulls.nbytes + arms.reward_sum.nbytes)
+        }
+
+
+def benchmark(n_arms: int = 20000, n_events: int = 50000, candidates: int = 40, seed: int = 42) -> Dict[str, float]:
+    """Feedback events folded in per second and per-request scoring latency"""
+    from behavior_store import FeedbackEvent
+
+    rng = np.random.default_rng(seed)
+    resource_ids = [f"resource_{arm}" for arm in range(n_arms)]
+    bandit = LinUCBBandit(resource_ids)
+    for user in range(1000):
+        bandit.remember(f"user_{user}", rng.random(CONTEXT_DIMENSION))
+    events = [
+        FeedbackEvent(f"user_{rng.integers(1000)}", resource_ids[int(rng.pareto(1.2) * 50) % n_arms],
+                      rating=float(rng.integers(1, 6)), completed=bool(rng.random() < 0.6), seq=seq + 1)
+        for seq in range(n_events)
+    ]
+    started = time.perf_counter()
+    bandit.update_events(events)
+    events_per_second = n_events / (time.perf_counter() - started)
+
+    queries = [(rng.random(CONTEXT_DIMENSION), [resource_ids[i] for i in rng.choice(n_arms, candidates, replace=False)])
+               for _ in range(2000)]
+    started = time.perf_counter()
+    for x, pool in queries:
+        bandit.scores(x, pool)
+    score_us = (time.perf_counter() - started) * 1e6 / len(queries)
+    return {"arms": n_arms, "events_per_second": round(events_per_second), "score_us": round(score_us, 1),
+            "candidates": candidates, "state_mb": round(bandit.get_stats()["state_bytes"] / 2 ** 20, 1)}
+
+
+if __name__ == "__main__":
+    # Online update throughput and scoring cost at catalog scale
+    print(benchmark())
@@ -0,0 +1,122 @@
+"""
+Recommendation Engine State Store
+Versioned on-disk snapshot of trained engine state for fast startup
+"""
+
+import os
+import hashlib
+import json
+import time
+from importlib.metadata import version
+from typing import Dict, Any, Optional
+import logging
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of the saved state or the model feature columns change
+STATE_FORMAT_VERSION = 12
+
+DEFAULT_STATE_DIR = os.environ.get(
+    "RECOMMENDATION_STATE_DIR",
+    os.path.join(os.path.dirname(__file__), "engine_state")
+)
+
+
+def _unwrap_memmaps(value: Any, seen: Optional[set] = None) -> Any:
+    """
+    Replace np.memmap arrays with plain ndarray views of the same mapped
+    memory. np.memmap runs Python code on every indexing operation, which
+    dominates small-array hot paths.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(value, np.memmap):
+        return value.view(np.ndarray)
+    if isinstance(value, (str, bytes, int, float, np.ndarray)) or id(value) in seen:
+        return value
+    seen.add(id(value))
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = _unwrap_memmaps(item, seen)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            value[index] = _unwrap_memmaps(item, seen)
+    elif hasattr(value, "__dict__"):
+        for name, item in vars(value).items():
+            unwrapped = _unwrap_memmaps(item, seen)
+            if unwrapped is not item:
+                setattr(value, name, unwrapped)
+    return value
+
+
+class EngineStateStore:
+    """
+    Saves and loads named groups of engine state, one joblib file per group,
+    so a group can be restored without unpickling (and importing) the others.
+
+    Each snapshot records a fingerprint of the inputs it was built from
+    (format version, scikit-learn version, a digest of the resource catalog
+    and the market weights); a snapshot whose fingerprint does not match is ignored so the
+    engine retrains instead of serving stale models. Arrays are written
+    uncompressed so they can be memory-mapped on load.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STATE_DIR):
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.joblib")
+
+    @staticmethod
+    def fingerprint(catalog_digest: str, market_weights: Dict[str, float]) -> str:
+        """Hash of everything a saved snapshot depends on"""
+        payload = json.dumps({
+            "format_version": STATE_FORMAT_VERSION,
+            "sklearn_version": version("scikit-learn"),
+            "catalog_digest": catalog_digest,
+            "market_weights": market_weights
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, name: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Saved state group for the given fingerprint, or None if missing or stale"""
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+
+        started = time.perf_counter()
+        try:
+            snapshot = joblib.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read engine state from {path}: {e}")
+            return None
+
+        if snapshot.get("format_version") != STATE_FORMAT_VERSION or snapshot.get("fingerprint") != fingerprint:
+            logger.info(f"Engine state snapshot {path} is stale, rebuilding")
+            return None
+
+        state = _unwrap_memmaps(snapshot["state"])
+        logger.info(f"✅ Loaded engine state from {path} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return state
+
+    def save(self, name: str, state: Dict[str, Any], fingerprint: str):
+        """Write a state group atomically so a crash never leaves a torn snapshot"""
+        path = self.path(name)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            joblib.dump({
+                "format_version": STATE_FORMAT_VERSION,
+                "fingerprint": fingerprint,
+                "saved_at": time.time(),
+                "state": state
+            }, temporary_path)
+            os.replace(temporary_path, path)
+            logger.info(f"✅ Saved engine state to {path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save engine state to {path}: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
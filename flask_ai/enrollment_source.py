@@ -0,0 +1,141 @@
+"""
+Learning Platform Enrollment Source
+Reads learner-course interactions from the learning platform (b2) database
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List
+import logging
+
+from item_cooccurrence import ItemInteraction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLATFORM_DB = os.environ.get(
+    "LEARNING_PLATFORM_DB",
+    os.path.join(os.path.dirname(__file__), "..", "b2", "learning_platform.db")
+)
+
+# Each query yields (position, user_id, course_id, timestamp, finished) for the rows added after a
+# position watermark; positions are each table's integer primary key (or rowid), so the filter is a
+# range scan of the table's own b-tree rather than a full scan
+INTERACTION_QUERIES = {
+    "enrollment": (
+        "SELECT rowid, user_id, course_id, COALESCE(completed_at, last_accessed, enrolled_at, '') AS at, "
+        "completed_at IS NOT NULL FROM user_courses WHERE rowid > ? ORDER BY rowid"
+    ),
+    "progress": (
+        "SELECT id, user_id, course_id, COALESCE(completed_at, last_accessed, started_at, '') AS at, "
+        "completed_at IS NOT NULL FROM progress_records WHERE id > ? ORDER BY id"
+    ),
+    "quiz": (
+        "SELECT a.id, a.user_id, q.course_id, COALESCE(a.completed_at, a.started_at, '') AS at, a.is_passed "
+        "FROM quiz_attempts a JOIN quizzes q ON q.id = a.quiz_id WHERE a.id > ? ORDER BY a.id"
+    )
+}
+
+
+def normalize_title(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(title).lower()).strip()
+
+
+class PlatformEnrollmentSource:
+    """
+    Incremental reader of the learning platform's SQLite database, opened
+    read-only: enrollments and completions (user_courses), progress
+    records and quiz attempts. Each poll returns the rows added since the
+    previous poll, tracked by a primary key watermark per table. Updates
+    to rows already read (progress, a later completion) add no new
+    learner-course pair, which is all consumers learn from, and are not
+    read again. Interactions are returned in timestamp order.
+
+    Platform courses map to catalog resources with the same normalized
+    title (see ``map_titles``) and to ``platform_course_<id>`` otherwise.
+    Learners keep their platform user id.
+    """
+
+    def __init__(self, path: str = DEFAULT_PLATFORM_DB):
+        self.path = path
+        self._watermarks: Dict[str, int] = {}
+        self._course_items: Dict[int, str] = {}
+        self._title_items: Dict[str, str] = {}
+        self._warned = False
+        # Polls run on the behaviour sync thread, title mappings change with the catalog
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.path) and os.path.exists(self.path)
+
+    def map_titles(self, item_ids_by_title: Dict[str, str]):
+        """Catalog resource ids by normalized title, for matching platform courses"""
+        with self._lock:
+            self._title_items = dict(item_ids_by_title)
+            self._course_items.clear()
+
+    def reset(self):
+        """Read the whole history again on the next poll"""
+        with self._lock:
+            self._watermarks.clear()
+
+    def poll(self) -> List[ItemInteraction]:
+        """Interactions recorded since the last poll, oldest first"""
+        if not self.available():
+            return []
+        with self._lock:
+            return self._poll()
+
+    def _poll(self) -> List[ItemInteraction]:
+        try:
+            connection = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, timeout=5.0)
+        except sqlite3.Error as e:
+            self._warn(e)
+            return []
+
+        rows = []
+        watermarks = dict(self._watermarks)
+        try:
+            for kind, query in INTERACTION_QUERIES.items():
+                for position, user_id, course_id, at, finished in connection.execute(
+                    query, (watermarks.get(kind, 0),)
+                ):
+                    rows.append((str(at), kind, user_id, course_id, bool(finished)))
+                    watermarks[kind] = position
+            self._load_courses(connection, {course_id for _, _, _, course_id, _ in rows})
+        except sqlite3.Error as e:
+            self._warn(e)
+            return []
+        finally:
+            connection.close()
+        # Advance only after every table was read, so a failed poll is retried in full
+        self._watermarks = watermarks
+
+        rows.sort(key=lambda row: row[0])
+        return [
+            ItemInteraction(str(user_id), self._course_items[course_id],
+                            "completion" if finished and kind == "enrollment" else kind)
+            for _, kind, user_id, course_id, finished in rows
+        ]
+
+    def _load_courses(self, connection: sqlite3.Connection, course_ids):
+        missing = [course_id for course_id in course_ids if course_id not in self._course_items]
+        if not missing:
+            return
+        titles = {}
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            titles.update(connection.execute(
+                f"SELECT id, title FROM courses WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        for course_id in missing:
+            self._course_items[course_id] = self._title_items.get(
+                normalize_title(titles.get(course_id, "")), f"platform_course_{course_id}"
+            )
+
+    def _warn(self, error: Exception):
+        # A platform database without these tables is logged once, not on every poll
+        if not self._warned:
+            logger.warning(f"⚠️ Could not read learning platform interactions from {self.path}: {error}")
+            self._warned = True
@@ -0,0 +1,150 @@
+"""
+Flat Forest
+Regression forests exported to contiguous node arrays with a vectorized batch evaluator
+"""
+
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FlatForest:
+    """
+    A fitted regression forest (e.g. scikit-learn's RandomForestRegressor)
+    flattened into one set of node arrays shared by all trees.
+
+    Node i of the forest splits on ``feature[i]`` at ``threshold[i]`` and
+    continues to ``left[i]`` or ``right[i]``; leaves point back to
+    themselves with an infinite threshold, so every sample can take the
+    same fixed number of steps (the deepest tree's depth) without
+    branching. A batch is evaluated for all trees at once as a
+    samples x trees array of node positions, with one gather per level,
+    instead of one Python-level predict call per tree.
+
+    Features are compared as float32, like scikit-learn's trees, so
+    predictions match the forest's own.
+    """
+
+    def __init__(self, trees: List[Any]):
+        if not trees:
+            raise ValueError("Cannot flatten a forest without fitted trees")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        depth = 0
+        offset = 0
+        for tree in trees:
+            if tree.value.shape[1] != 1:
+                raise ValueError("Only single-output regression trees can be flattened")
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.value = np.concatenate(values).astype(np.float64)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.is_leaf = self.left == np.arange(len(self.left))
+        # left and right child of node i at 2i and 2i + 1, so a step is a single gather
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        self.max_depth = int(depth)
+        self.n_features = int(trees[0].n_features)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        """Flatten a fitted scikit-learn forest regressor"""
+        return cls([estimator.tree_ for estimator in forest.estimators_])
+
+    def __len__(self) -> int:
+        return len(self.roots)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Mean prediction of all trees for each row of the feature matrix"""
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(f"Expected a 2-D feature matrix with {self.n_features} columns")
+
+        # One entry per (sample, tree) pair, sample-major; pairs that reach a
+        # leaf are written out and dropped, so later levels touch fewer pairs
+        n_trees = len(self.roots)
+        values = features.ravel()
+        leaves = np.empty(len(features) * n_trees, dtype=np.intp)
+        pending = np.arange(len(leaves))
+        nodes = np.tile(self.roots, len(features))
+        offsets = np.repeat(np.arange(len(features)) * self.n_features, n_trees)
+        for level in range(self.max_depth):
+            go_right = ~(values[offsets + self.feature[nodes]] <= self.threshold[nodes])
+            nodes = self.children[2 * nodes + go_right]
+            if level % 4 == 3:
+                done = self.is_leaf[nodes]
+                leaves[pending[done]] = nodes[done]
+                keep = ~done
+                pending, nodes, offsets = pending[keep], nodes[keep], offsets[keep]
+                if not len(pending):
+                    break
+        leaves[pending] = nodes
+        return self.value[leaves].reshape(len(features), n_trees).mean(axis=1)
+
+
+def flatten_forest(forest) -> Optional[FlatForest]:
+    """Flat copy of a fitted forest, or None if it has not been fitted"""
+    if not getattr(forest, "estimators_", None):
+        return None
+    return FlatForest.from_sklearn(forest)
+
+
+def benchmark(batch_sizes: List[int] = (1, 10, 100, 1000),
+              n_estimators: int = 100,
+              n_train: int = 2000,
+              repeats: int = 20) -> List[Dict[str, float]]:
+    """
+    Per-call latency of scikit-learn's predict and the flat evaluator on a
+    forest fitted to random data shaped like the catalog model features
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(42)
+    train = rng.random((n_train, 8))
+    forest = RandomForestRegressor(n_estimators=n_estimators, random_state=42)
+    forest.fit(train, train @ rng.random(8) + rng.normal(0, 0.1, n_train))
+    flat = FlatForest.from_sklearn(forest)
+
+    results = []
+    for batch_size in batch_sizes:
+        batch = rng.random((batch_size, 8))
+        max_error = float(np.abs(flat.predict(batch) - forest.predict(batch)).max())
+        timings = {}
+        for name, predict in (("sklearn", forest.predict), ("flat", flat.predict)):
+            predict(batch)
+            started = time.perf_counter()
+            for _ in range(repeats):
+                predict(batch)
+            timings[name] = (time.perf_counter() - started) * 1000 / repeats
+        results.append({
+            "batch_size": batch_size,
+            "sklearn_ms": round(timings["sklearn"], 3),
+            "flat_ms": round(timings["flat"], 3),
+            "speedup": round(timings["sklearn"] / timings["flat"], 1),
+            "max_abs_error": max_error
+        })
+    return results
+
+
+if __name__ == "__main__":
+    # Per-call latency for the batch sizes seen on the request path
+    print(f"{'batch':>6} {'sklearn ms':>11} {'flat ms':>9} {'speedup':>8} {'max error':>10}")
+    for row in benchmark():
+        print(f"{row['batch_size']:>6} {row['sklearn_ms']:>11.3f} {row['flat_ms']:>9.3f} "
+              f"{row['speedup']:>7.1f}x {row['max_abs_error']:>10.1e}")
@@ -0,0 +1,188 @@
+"""
+Item-Item Co-occurrence Model
+Incrementally maintained resource similarity with precomputed top-k neighbour lists
+"""
+
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ItemInteraction:
+    """One learner touching one resource: an enrollment, completion, quiz attempt or feedback"""
+    user_id: str
+    item_id: str
+    kind: str = "feedback"
+
+
+class ItemCooccurrenceModel:
+    """
+    Item-item collaborative filtering over learner interactions.
+
+    The model keeps a sparse symmetric co-occurrence matrix (how many
+    learners touched both items, as a dict of dicts) and each item's
+    learner count. Similarity is cosine over learner sets:
+    c_ij / sqrt(n_i * n_j). An interaction only touches the rows of the
+    new item and of the learner's last ``window`` items, so updates never
+    recompute the matrix.
+
+    Every item also has a precomputed list of its ``top_k`` most similar
+    items. The new item's list is rebuilt from its row, and each partner
+    gets the new item merged into its list. Scores in untouched lists drift
+    slightly as item counts grow, until the next interaction that touches
+    them. A recommendation merges the lists of the learner's recent items,
+    so its cost depends on top_k and the history length, not on the number
+    of learners.
+
+    Writers serialize on a lock. Readers take no lock: neighbour lists
+    and recent-item histories are immutable tuples, replaced whole.
+    """
+
+    def __init__(self, top_k: int = 20, window: int = 50, recent: int = 10, recency_decay: float = 0.85):
+        self.top_k = top_k
+        self.window = window
+        self.recent = recent
+        self.recency_decay = recency_decay
+
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._item_users: Dict[str, int] = {}
+        self._user_items: Dict[str, Dict[str, None]] = {}  # insertion ordered, most recent last
+        self._recent: Dict[str, Tuple[str, ...]] = {}
+        self.neighbours: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        self.interactions = 0
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, item_id: str) -> bool:
+        """Record an interaction; returns whether it was the learner's first with the item"""
+        if not user_id or not item_id:
+            return False
+        with self._lock:
+            self.interactions += 1
+            items = self._user_items.setdefault(user_id, {})
+            if item_id in items:
+                # A repeat only refreshes recency
+                del items[item_id]
+                items[item_id] = None
+                self._recent[user_id] = tuple(list(items)[-self.recent:])
+                return False
+
+            partners = list(items)[-self.window:]
+            items[item_id] = None
+            self._recent[user_id] = tuple(list(items)[-self.recent:])
+            self._item_users[item_id] = self._item_users.get(item_id, 0) + 1
+
+            row = self._counts.setdefault(item_id, {})
+            for partner in partners:
+                row[partner] = row.get(partner, 0) + 1
+                partner_row = self._counts.setdefault(partner, {})
+                partner_row[item_id] = partner_row.get(item_id, 0) + 1
+
+            self._refresh(item_id)
+            for partner in partners:
+                self._merge(partner, item_id)
+            return True
+
+    def add_all(self, interactions: Iterable[ItemInteraction]) -> int:
+        """Record interactions in order; returns how many were new learner-item pairs"""
+        return sum(self.add(interaction.user_id, interaction.item_id) for interaction in interactions)
+
+    def _similarity(self, item_id: str, other_id: str) -> float:
+        return self._counts[item_id].get(other_id, 0) / math.sqrt(
+            self._item_users[item_id] * self._item_users[other_id]
+        )
+
+    def _refresh(self, item_id: str):
+        """Rebuild an item's neighbour list from its co-occurrence row"""
+        row = self._counts[item_id]
+        scale = 1 / math.sqrt(self._item_users[item_id])
+        best = heapq.nsmallest(
+            self.top_k, row.items(),
+            key=lambda entry: (-entry[1] / math.sqrt(self._item_users[entry[0]]), entry[0])
+        )
+        self.neighbours[item_id] = tuple(
+            (other, count * scale / math.sqrt(self._item_users[other])) for other, count in best
+        )
+
+    def _merge(self, item_id: str, other_id: str):
+        """Rescore an item's current neighbours together with other_id and keep the best"""
+        members = {other for other, _ in self.neighbours.get(item_id, ())}
+        members.add(other_id)
+        scored = sorted(((-self._similarity(item_id, other), other) for other in members))[:self.top_k]
+        self.neighbours[item_id] = tuple((other, -score) for score, other in scored)
+
+    def similar_items(self, item_id: str) -> Tuple[Tuple[str, float], ...]:
+        """Precomputed most similar items with their similarity, best first"""
+        return self.neighbours.get(item_id, ())
+
+    def recent_items(self, user_id: str) -> Tuple[str, ...]:
+        """A learner's most recently touched items, most recent last"""
+        return self._recent.get(user_id, ())
+
+    def recommend(self,
+                  recent_items: Iterable[str],
+                  n: int = 10,
+                  exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Items most similar to the recent items (most recent last), scored by
+        summing their neighbour lists with older items weighted down
+        """
+        recent_items = list(recent_items)[-self.recent:]
+        excluded = set(exclude) | set(recent_items)
+        scores: Dict[str, float] = {}
+        weight = 1.0
+        for item_id in reversed(recent_items):
+            for other, similarity in self.neighbours.get(item_id, ()):
+                if other not in excluded:
+                    scores[other] = scores.get(other, 0.0) + weight * similarity
+            weight *= self.recency_decay
+        return heapq.nsmallest(n, scores.items(), key=lambda entry: (-entry[1], entry[0]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "items": len(self._item_users),
+                "learners": len(self._user_items),
+                "interactions": self.interactions,
+                "cooccurring_pairs": sum(len(row) for row in self._counts.values()) // 2,
+                "top_k": self.top_k
+            }
+
+
+def benchmark(n_items: int = 5000, n_users: List[int] = (1000, 10000, 50000),
+              items_per_user: int = 8, seed: int = 42) -> List[Dict[str, float]]:
+    """Update and recommendation latency as the learner population grows"""
+    import random
+    import time
+
+    rng = random.Random(seed)
+    results = []
+    for users in n_users:
+        model = ItemCooccurrenceModel()
+        interactions = [
+            ItemInteraction(f"user_{user}", f"item_{int(rng.paretovariate(1.2)) % n_items}")
+            for user in range(users) for _ in range(items_per_user)
+        ]
+        started = time.perf_counter()
+        model.add_all(interactions)
+        update_us = (time.perf_counter() - started) * 1e6 / len(interactions)
+
+        queries = [model.recent_items(f"user_{rng.randrange(users)}") for _ in range(1000)]
+        started = time.perf_counter()
+        for recent in queries:
+            model.recommend(recent, 10)
+        recommend_us = (time.perf_counter() - started) * 1e6 / len(queries)
+        results.append({"learners": users, "update_us": round(update_us, 1), "recommend_us": round(recommend_us, 1)})
+    return results
+
+
+if __name__ == "__main__":
+    # Per-interaction update and per-request recommendation cost by population size
+    print(f"{'learners':>9} {'update us':>10} {'recommend us':>13}")
+    for row in benchmark():
+        print(f"{row['learners']:>9} {row['update_us']:>10.1f} {row['recommend_us']:>13.1f}")
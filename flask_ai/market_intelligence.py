@@ -14,6 +14,8 @@ from dataclasses import dataclass
 import json
 from enum import Enum
 
+from skill_taxonomy import SkillTaxonomy, load_skill_taxonomy
+
 logger = logging.getLogger(__name__)
 
 class DataSource(Enum):
@@ -72,30 +74,9 @@ class RealTimeMarketIntelligence:
         self.skill_taxonomy = self._load_skill_taxonomy()
         self.regional_data = self._load_regional_baseline()
         
-    def _load_skill_taxonomy(self) -> Dict[str, Any]:
-        """Load standardized skill taxonomy"""
-        return {
-            "technical_skills": {
-                "programming": ["python", "java", "javascript", "c++", "go", "rust"],
-                "data_science": ["machine_learning", "deep_learning", "statistics", "data_visualization"],
-                "cloud_computing": ["aws", "azure", "gcp", "docker", "kubernetes"],
-                "cybersecurity": ["ethical_hacking", "network_security", "cryptography", "compliance"],
-                "mobile_development": ["android", "ios", "react_native", "flutter"],
-                "web_development": ["html", "css", "react", "angular", "vue", "node_js"]
-            },
-            "soft_skills": {
-                "communication": ["verbal", "written", "presentation", "negotiation"],
-                "leadership": ["team_management", "project_management", "strategic_thinking"],
-                "problem_solving": ["analytical_thinking", "creativity", "decision_making"],
-                "collaboration": ["teamwork", "cross_functional", "remote_work"]
-            },
-            "industry_specific": {
-                "finance": ["financial_modeling", "risk_management", "compliance", "fintech"],
-                "healthcare": ["medical_knowledge", "patient_care", "health_informatics"],
-                "manufacturing": ["lean_manufacturing", "quality_control", "automation"],
-                "education": ["curriculum_design", "educational_technology", "assessment"]
-            }
-        }
+    def _load_skill_taxonomy(self) -> SkillTaxonomy:
+        """Load standardized skill taxonomy index, shared with the recommendation engine"""
+        return load_skill_taxonomy()
     
     def _load_regional_baseline(self) -> Dict[str, RegionalMarketData]:
         """Load baseline regional market data"""
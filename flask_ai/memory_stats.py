@@ -0,0 +1,84 @@
+"""
+Process Memory Statistics
+Shared versus private resident memory of the current worker, from /proc
+"""
+
+import os
+import resource
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# smaps fields reported, in kB as the kernel gives them
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Anonymous", "Swap")
+
+
+def _parse_smaps_fields(lines, totals: Dict[str, int]):
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in totals:
+            totals[name] += int(rest.split()[0])
+
+
+def process_memory(mapped_dir: Optional[str] = None, pid: str = "self") -> Dict[str, Any]:
+    """
+    Resident memory of a process split into shared and private pages, in MB.
+
+    Shared pages are mapped by more than one process (typically the state
+    files every worker maps read-only); private pages belong to this
+    process alone. PSS charges each shared page to its processes
+    proportionally, so summing PSS over workers gives their true total.
+    With mapped_dir, also reports the resident memory of files mapped from
+    that directory.
+    """
+    totals = {field: 0 for field in SMAPS_FIELDS}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            _parse_smaps_fields(f, totals)
+    except OSError:
+        # No /proc (not Linux): only the peak resident size is available
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"pid": os.getpid(), "available": False, "peak_rss_mb": round(peak_kb / 1024, 1)}
+
+    stats = {
+        "pid": os.getpid(),
+        "available": True,
+        "rss_mb": totals["Rss"] / 1024,
+        "pss_mb": totals["Pss"] / 1024,
+        "shared_mb": (totals["Shared_Clean"] + totals["Shared_Dirty"]) / 1024,
+        "private_mb": (totals["Private_Clean"] + totals["Private_Dirty"]) / 1024,
+        "anonymous_mb": totals["Anonymous"] / 1024,
+        "swap_mb": totals["Swap"] / 1024
+    }
+    if mapped_dir:
+        stats["mapped_state"] = _mapped_files(os.path.realpath(mapped_dir), pid)
+    return {key: round(value, 2) if isinstance(value, float) else value for key, value in stats.items()}
+
+
+def _mapped_files(directory: str, pid: str) -> Dict[str, Any]:
+    """Resident, shared and private memory of mappings of files under a directory"""
+    totals = {field: 0 for field in SMAPS_FIELDS}
+    files = set()
+    try:
+        with open(f"/proc/{pid}/smaps", "r") as f:
+            inside = False
+            for line in f:
+                fields = line.split()
+                # Mapping header lines start with an address range such as "7f12a000-7f12b000"
+                if len(fields) >= 5 and "-" in fields[0] and ":" not in fields[0]:
+                    path = fields[5] if len(fields) > 5 else ""
+                    inside = path.startswith(directory + os.sep)
+                    if inside:
+                        files.add(path)
+                elif inside:
+                    _parse_smaps_fields([line], totals)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not read memory mappings: {e}")
+
+    return {
+        "files": len(files),
+        "rss_mb": round(totals["Rss"] / 1024, 2),
+        "shared_mb": round((totals["Shared_Clean"] + totals["Shared_Dirty"]) / 1024, 2),
+        "private_mb": round((totals["Private_Clean"] + totals["Private_Dirty"]) / 1024, 2)
+    }
@@ -0,0 +1,234 @@
+"""
+Background Model Trainer
+Queues recommendation feedback and refreshes the ML predictors off the request path
+"""
+
+import copy
+import queue
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Tuple
+import logging
+
+from flat_forest import FlatForest, flatten_forest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    Immutable set of trained predictors, swapped in as a single reference.
+    The forests are also exported to flat node arrays on construction, so
+    request-time predictions avoid scikit-learn's per-call overhead.
+    """
+    satisfaction_predictor: Any
+    employment_predictor: Any
+    version: int
+    trained_at: datetime
+    training_events: int
+    satisfaction_flat: Optional[FlatForest] = field(default=None, compare=False, repr=False)
+    employment_flat: Optional[FlatForest] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.satisfaction_flat is None:
+            object.__setattr__(self, "satisfaction_flat", flatten_forest(self.satisfaction_predictor))
+        if self.employment_flat is None:
+            object.__setattr__(self, "employment_flat", flatten_forest(self.employment_predictor))
+
+    def without_forests(self) -> "ModelSnapshot":
+        """Copy holding only the flat forests, for saving apart from the scikit-learn ones"""
+        return replace(self, satisfaction_predictor=None, employment_predictor=None)
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicted satisfaction and employment impact for each feature row"""
+        satisfaction = self.satisfaction_flat if self.satisfaction_flat is not None else self.satisfaction_predictor
+        employment = self.employment_flat if self.employment_flat is not None else self.employment_predictor
+        return satisfaction.predict(features), employment.predict(features)
+
+
+class BackgroundModelTrainer:
+    """
+    Consumes feedback events from a queue on a daemon thread and
+    periodically refreshes the predictors.
+
+    A refresh warm-starts copies of the current forests with a few new
+    trees fitted on the latest data, retires the oldest trees so the forest
+    size stays bounded, and publishes the result through ``publish``.
+    Requests only ever pay for a queue put. ``full_models`` returns the
+    current snapshot with its scikit-learn forests attached, when those are
+    kept apart from the snapshot requests use.
+    """
+
+    def __init__(self,
+                 catalog,
+                 current_models: Callable[[], ModelSnapshot],
+                 publish: Callable[[ModelSnapshot], None],
+                 retrain_every_events: int = 50,
+                 retrain_interval_seconds: float = 300.0,
+                 trees_per_update: int = 10,
+                 max_trees: int = 100,
+                 full_models: Optional[Callable[[], ModelSnapshot]] = None):
+        self.catalog = catalog
+        self.current_models = current_models
+        self.full_models = full_models or current_models
+        self.publish = publish
+        self.retrain_every_events = retrain_every_events
+        self.retrain_interval_seconds = retrain_interval_seconds
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+
+        # Feedback ratings aggregated per catalog row
+        self.rating_sum = np.zeros(len(catalog))
+        self.rating_count = np.zeros(len(catalog), dtype=np.int64)
+
+        self._state_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.events_received = 0
+        self.events_since_retrain = 0
+        self.retrain_count = 0
+        self.last_retrain_duration_ms = 0.0
+        self._last_retrain = time.monotonic()
+
+    def submit(self, resource_id: str, feedback: Dict[str, Any]):
+        """Queue a feedback event for the next model refresh"""
+        self._ensure_started()
+        self._queue.put((resource_id, feedback))
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="model-trainer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the trainer thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._consume(self._queue.get(timeout=1.0))
+                # Drain whatever else arrived so a burst becomes one refresh
+                while True:
+                    self._consume(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if self._retrain_due():
+                try:
+                    self.retrain()
+                except Exception as e:
+                    logger.error(f"❌ Background model refresh failed: {e}")
+
+    def _consume(self, event):
+        resource_id, feedback = event
+        self.events_received += 1
+        self.events_since_retrain += 1
+
+        if "rating" not in feedback:
+            return
+        with self._state_lock:
+            row = self.catalog.row_index.get(resource_id)
+            if row is not None:
+                try:
+                    self.rating_sum[row] += float(feedback["rating"])
+                    self.rating_count[row] += 1
+                except (TypeError, ValueError):
+                    pass
+
+    def reset_catalog(self, catalog):
+        """Switch to a new catalog, carrying aggregated feedback over by resource id"""
+        with self._state_lock:
+            rating_sum = np.zeros(len(catalog))
+            rating_count = np.zeros(len(catalog), dtype=np.int64)
+            for resource_id, row in catalog.row_index.items():
+                old_row = self.catalog.row_index.get(resource_id)
+                if old_row is not None:
+                    rating_sum[row] = self.rating_sum[old_row]
+                    rating_count[row] = self.rating_count[old_row]
+            self.catalog, self.rating_sum, self.rating_count = catalog, rating_sum, rating_count
+
+    def _retrain_due(self) -> bool:
+        if self.events_since_retrain == 0:
+            return False
+        if self.events_since_retrain >= self.retrain_every_events:
+            return True
+        return time.monotonic() - self._last_retrain >= self.retrain_interval_seconds
+
+    def training_data(self):
+        """Feature matrix and targets, with feedback folded into the catalog ratings"""
+        with self._state_lock:
+            catalog = self.catalog
+            total_count = catalog.rating_count + self.rating_count
+            total_sum = catalog.rating_sum + self.rating_sum
+        satisfaction = np.where(total_count > 0, total_sum / np.maximum(total_count, 1), 4.0)
+
+        features = catalog.model_features(satisfaction)
+        return features, satisfaction, catalog.employment_impact
+
+    def retrain(self):
+        """Refresh the predictors and publish a new snapshot"""
+        started = time.perf_counter()
+        features, satisfaction, employment = self.training_data()
+        current = self.full_models()
+
+        snapshot = ModelSnapshot(
+            satisfaction_predictor=self._refresh_forest(current.satisfaction_predictor, features, satisfaction),
+            employment_predictor=self._refresh_forest(current.employment_predictor, features, employment),
+            version=current.version + 1,
+            trained_at=datetime.now(),
+            training_events=current.training_events + self.events_since_retrain
+        )
+        self.publish(snapshot)
+
+        self.events_since_retrain = 0
+        self.retrain_count += 1
+        self._last_retrain = time.monotonic()
+        self.last_retrain_duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"✅ Published model version {snapshot.version} in {self.last_retrain_duration_ms:.1f}ms")
+
+    def _refresh_forest(self, forest, features: np.ndarray, targets: np.ndarray):
+        """Warm-start a copy of the forest with new trees, retiring the oldest ones"""
+        if len(features) < 2:
+            return forest
+
+        updated = copy.deepcopy(forest)
+        if not hasattr(updated, "estimators_"):
+            updated.fit(features, targets)
+            return updated
+
+        updated.set_params(warm_start=True, n_estimators=len(updated.estimators_) + self.trees_per_update)
+        updated.fit(features, targets)
+        if len(updated.estimators_) > self.max_trees:
+            updated.estimators_ = updated.estimators_[-self.max_trees:]
+            updated.set_params(n_estimators=len(updated.estimators_))
+        return updated
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Model freshness and queue metrics"""
+        models = self.current_models()
+        return {
+            "model_version": models.version,
+            "model_trained_at": models.trained_at.isoformat(),
+            "model_age_seconds": round((datetime.now() - models.trained_at).total_seconds(), 3),
+            "training_events": models.training_events,
+            "events_received": self.events_received,
+            "events_since_retrain": self.events_since_retrain,
+            "queue_depth": self._queue.qsize(),
+            "retrain_count": self.retrain_count,
+            "last_retrain_duration_ms": round(self.last_retrain_duration_ms, 3),
+            "retrain_every_events": self.retrain_every_events,
+            "retrain_interval_seconds": self.retrain_interval_seconds
+        }
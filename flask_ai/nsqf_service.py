@@ -24,8 +24,9 @@ class NSQFService:
             vectorizer_path = os.path.join(os.path.dirname(__file__), 'nsqf_vectorizer.joblib')
             
             if os.path.exists(model_path) and os.path.exists(vectorizer_path):
-                self.model = joblib.load(model_path)
-                self.vectorizer = joblib.load(vectorizer_path)
+                # Memory-mapped, so worker processes share the model arrays
+                self.model = joblib.load(model_path, mmap_mode="r")
+                self.vectorizer = joblib.load(vectorizer_path, mmap_mode="r")
                 self.model_loaded = True
                 logger.info("✅ NSQF models loaded successfully")
             else:
@@ -0,0 +1,316 @@
+"""
+Multi-Objective Pathway Optimizer
+Pareto-front search over resource combinations (time, cost, employment, salary)
+and diversified re-ranking of alternative pathways
+"""
+
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Objective columns: total_hours, total_cost, employment_impact, salary_impact
+MAXIMISED = np.array([False, False, True, True])
+
+
+@dataclass
+class ParetoPathway:
+    """One non-dominated pathway on the Pareto front"""
+    rows: np.ndarray
+    total_hours: float
+    total_cost: float
+    employment_impact: float
+    salary_impact: float
+
+    def objectives(self) -> np.ndarray:
+        return np.array([self.total_hours, self.total_cost, self.employment_impact, self.salary_impact])
+
+
+def pareto_mask(objectives: np.ndarray) -> np.ndarray:
+    """Boolean mask of the non-dominated rows (all columns minimised)"""
+    n = objectives.shape[0]
+    efficient = np.ones(n, dtype=bool)
+    for i in range(n):
+        if not efficient[i]:
+            continue
+        # Keep points that beat i somewhere or tie it everywhere
+        others = objectives[efficient]
+        efficient[efficient] = np.any(others < objectives[i], axis=1) | np.all(others == objectives[i], axis=1)
+        efficient[i] = True
+    return efficient
+
+
+def non_dominated_ranks(objectives: np.ndarray) -> np.ndarray:
+    """NSGA-II front index per row (0 is the Pareto front)"""
+    less_equal = np.all(objectives[:, None, :] <= objectives[None, :, :], axis=2)
+    strictly_less = np.any(objectives[:, None, :] < objectives[None, :, :], axis=2)
+    dominates = less_equal & strictly_less
+    dominated_by = dominates.sum(axis=0)
+
+    ranks = np.full(objectives.shape[0], -1)
+    rank = 0
+    current = np.flatnonzero(dominated_by == 0)
+    while current.size:
+        ranks[current] = rank
+        dominated_by = dominated_by - dominates[current].sum(axis=0)
+        dominated_by[ranks >= 0] = -1
+        current = np.flatnonzero(dominated_by == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance within one front"""
+    n, m = objectives.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        distance[:] = np.inf
+        return distance
+
+    for j in range(m):
+        order = np.argsort(objectives[:, j])
+        span = objectives[order[-1], j] - objectives[order[0], j]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (objectives[order[2:], j] - objectives[order[:-2], j]) / span
+    return distance
+
+
+def popcount(bitsets: np.ndarray) -> np.ndarray:
+    """Number of set bits in each packed bitset (last axis holds the uint8 words)"""
+    return np.bitwise_count(bitsets).sum(axis=-1, dtype=np.int64)
+
+
+def mmr_pathways(relevance: np.ndarray,
+                 bitsets: np.ndarray,
+                 num_pathways: int,
+                 pathway_length: int,
+                 diversity: float = 0.5,
+                 selected_coverage: Optional[List[np.ndarray]] = None) -> List[np.ndarray]:
+    """
+    Mutually diverse pathways by maximal marginal relevance.
+
+    Pathways are built one at a time from the candidates maximising
+    (1 - diversity) * relevance - diversity * similarity, where relevance
+    is min-max normalised and similarity is a candidate's highest Jaccard
+    overlap with the skill coverage of any pathway already selected (seeded
+    with selected_coverage). Each candidate is used at most once. Returns
+    candidate index arrays, most relevant first within each pathway.
+    """
+    seeds = np.array(selected_coverage or [], dtype=bitsets.dtype).reshape(1, -1, bitsets.shape[-1])
+    chosen = mmr_pathways_batch(relevance[None, :], bitsets[None, :, :], np.ones((1, len(relevance)), dtype=bool),
+                                num_pathways, np.array([pathway_length]), np.array([diversity]), seeds)[0]
+    return [pathway[pathway >= 0] for pathway in chosen if (pathway >= 0).any()]
+
+
+def mmr_pathways_batch(relevance: np.ndarray,
+                       bitsets: np.ndarray,
+                       available: np.ndarray,
+                       num_pathways: int,
+                       pathway_lengths: np.ndarray,
+                       diversity: np.ndarray,
+                       selected_coverage: np.ndarray) -> np.ndarray:
+    """
+    mmr_pathways over a block of candidate pools at once: relevance and
+    available are profiles x pool, bitsets profiles x pool x words,
+    selected_coverage profiles x pathways x words, and pathway_lengths and
+    diversity hold one entry per profile. Every MMR round is one set of
+    operations over the whole block. Returns profiles x num_pathways x
+    max(pathway_lengths) pool positions, padded with -1.
+    """
+    n_profiles, n = relevance.shape
+    length = int(pathway_lengths.max(initial=0))
+    if n == 0 or length == 0:
+        return np.full((n_profiles, num_pathways, length), -1, dtype=np.intp)
+
+    # Min-max normalised over each profile's available candidates
+    low = np.where(available, relevance, np.inf).min(axis=1, keepdims=True)
+    span = np.where(available, relevance, -np.inf).max(axis=1, keepdims=True) - low
+    normalised = np.where(span > 0, (relevance - low) / np.where(span > 0, span, 1), 1.0)
+
+    # Position n is a padding candidate with no skills that can never score,
+    # picked in place of anything beyond a profile's pathway length or its
+    # available candidates. Picked candidates drop out of relevance_term.
+    padding = np.full((n_profiles, 1), -np.inf)
+    relevance_term = np.concatenate([np.where(available, (1 - diversity[:, None]) * normalised, -np.inf), padding],
+                                    axis=1)
+    normalised = np.concatenate([normalised, padding], axis=1)
+    diversity = diversity[:, None]
+    bitsets = np.concatenate([bitsets, np.zeros((n_profiles, 1, bitsets.shape[2]), dtype=bitsets.dtype)], axis=1)
+    counts = popcount(bitsets)
+    beyond_length = np.arange(length)[None, :] >= pathway_lengths[:, None]
+    profiles = np.arange(n_profiles)[:, None]
+
+    def overlap(coverage: np.ndarray) -> np.ndarray:
+        # |A | B| = |A| + |B| - |A & B|, so only the intersections need counting
+        shared = popcount(bitsets & coverage[:, None, :])
+        return shared / np.maximum(counts + popcount(coverage)[:, None] - shared, 1)
+
+    similarity = np.zeros((n_profiles, n + 1))
+    for seed in range(selected_coverage.shape[1]):
+        similarity = np.maximum(similarity, overlap(selected_coverage[:, seed]))
+
+    chosen = np.empty((n_profiles, num_pathways, length), dtype=np.intp)
+    for pathway in range(num_pathways):
+        scores = relevance_term - diversity * similarity
+        picks = np.argsort(-scores, axis=1, kind="stable")[:, :length]
+        picks[beyond_length | (scores[profiles, picks] == -np.inf)] = n
+        chosen[:, pathway] = picks
+        relevance_term[profiles, picks] = -np.inf
+        if pathway + 1 < num_pathways:
+            similarity = np.maximum(similarity, overlap(np.bitwise_or.reduce(bitsets[profiles, picks], axis=1)))
+
+    # Most relevant first within each pathway, padding last
+    chosen = np.take_along_axis(chosen, np.argsort(-normalised[profiles[:, :, None], chosen], axis=2, kind="stable"), 2)
+    chosen[chosen == n] = -1
+    return chosen
+
+
+class ParetoPathwayOptimizer:
+    """
+    Computes the Pareto front of resource combinations under budget,
+    time and size caps.
+
+    Small candidate pools are enumerated exhaustively with vectorized
+    subset masks; larger pools use an NSGA-II style evolutionary search
+    bounded by a wall-clock budget.
+    """
+
+    def __init__(self,
+                 time_budget_ms: float = 50.0,
+                 population_size: int = 64,
+                 exhaustive_limit: int = 12,
+                 seed: Optional[int] = None):
+        self.time_budget_ms = time_budget_ms
+        self.population_size = population_size
+        self.exhaustive_limit = exhaustive_limit
+        self.rng = np.random.default_rng(seed)
+
+    def solve(self,
+              duration_hours: np.ndarray,
+              cost: np.ndarray,
+              employment_impact: np.ndarray,
+              salary_impact: np.ndarray,
+              max_items: int,
+              max_cost: float = np.inf,
+              max_hours: float = np.inf) -> List[ParetoPathway]:
+        """Pareto front of feasible pathways, sorted by total hours"""
+        attributes = np.column_stack([duration_hours, cost, employment_impact, salary_impact]).astype(np.float64)
+        n = attributes.shape[0]
+        max_items = min(max_items, n)
+        if n == 0 or max_items <= 0:
+            return []
+
+        if n <= self.exhaustive_limit:
+            masks = self._enumerate(n, max_items)
+        else:
+            masks = self._evolve(attributes, max_items, max_cost, max_hours)
+
+        totals = masks @ attributes
+        feasible = (masks.sum(axis=1) > 0) & (totals[:, 0] <= max_hours) & (totals[:, 1] <= max_cost)
+        masks, totals = masks[feasible], totals[feasible]
+        if not len(masks):
+            return []
+
+        front = pareto_mask(np.where(MAXIMISED, -totals, totals))
+
+        pathways, seen = [], set()
+        for mask, total in zip(masks[front], totals[front]):
+            rows = np.flatnonzero(mask)
+            if rows.tobytes() not in seen:
+                seen.add(rows.tobytes())
+                pathways.append(ParetoPathway(rows, *map(float, total)))
+        pathways.sort(key=lambda pathway: (pathway.total_hours, pathway.total_cost))
+        return pathways
+
+    @staticmethod
+    def _enumerate(n: int, max_items: int) -> np.ndarray:
+        """Every subset of up to max_items candidates, as 0/1 rows"""
+        subsets = np.arange(1, 2 ** n)
+        masks = ((subsets[:, None] >> np.arange(n)) & 1).astype(np.float64)
+        return masks[masks.sum(axis=1) <= max_items]
+
+    def _evolve(self, attributes: np.ndarray, max_items: int,
+                max_cost: float, max_hours: float) -> np.ndarray:
+        """NSGA-II search, returning the final population"""
+        n = attributes.shape[0]
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        value = (attributes[:, 2] + attributes[:, 3]) / (
+            1 + attributes[:, 0] / max(attributes[:, 0].max(), 1) + attributes[:, 1] / max(attributes[:, 1].max(), 1)
+        )
+
+        population = np.zeros((self.population_size, n), dtype=bool)
+        for p in range(self.population_size):
+            size = self.rng.integers(1, max_items + 1)
+            population[p, self.rng.choice(n, size=size, replace=False)] = True
+        population = self._repair(population, attributes, value, max_items, max_cost, max_hours)
+
+        # Stop when another generation would overrun the wall-clock budget
+        generations, generation_time = 0, 0.0
+        while generations == 0 or time.perf_counter() + generation_time < deadline:
+            started = time.perf_counter()
+            offspring = self._vary(population, n)
+            offspring = self._repair(offspring, attributes, value, max_items, max_cost, max_hours)
+            population = self._select(np.vstack([population, offspring]), attributes)
+            generation_time = time.perf_counter() - started
+            generations += 1
+
+        logger.debug(f"Pareto search ran {generations} generations over {n} candidates")
+        return population.astype(np.float64)
+
+    def _vary(self, population: np.ndarray, n: int) -> np.ndarray:
+        """Uniform crossover between random parents plus add/drop mutation"""
+        size = population.shape[0]
+        parents_a = population[self.rng.integers(0, size, size)]
+        parents_b = population[self.rng.integers(0, size, size)]
+        offspring = np.where(self.rng.random(parents_a.shape) < 0.5, parents_a, parents_b)
+
+        rows = np.arange(size)
+        offspring[rows, self.rng.integers(0, n, size)] ^= True
+        flip_again = self.rng.random(size) < 0.5
+        offspring[rows[flip_again], self.rng.integers(0, n, flip_again.sum())] ^= True
+        return offspring
+
+    @staticmethod
+    def _repair(population: np.ndarray, attributes: np.ndarray, value: np.ndarray,
+                max_items: int, max_cost: float, max_hours: float) -> np.ndarray:
+        """
+        Refill every pathway over a cap greedily by value: an item that does
+        not fit the remaining time or budget is skipped, and lower-value
+        items after it are still taken if they fit.
+        """
+        totals = population @ attributes
+        counts = population.sum(axis=1)
+        infeasible = np.flatnonzero((counts > max_items) | (totals[:, 0] > max_hours) | (totals[:, 1] > max_cost))
+        for p in infeasible:
+            chosen = np.flatnonzero(population[p])
+            chosen = chosen[np.argsort(-value[chosen], kind="stable")]
+            population[p] = False
+            hours, cost, kept = 0.0, 0.0, 0
+            for row, item_hours, item_cost in zip(chosen.tolist(), attributes[chosen, 0].tolist(),
+                                                  attributes[chosen, 1].tolist()):
+                if hours + item_hours <= max_hours and cost + item_cost <= max_cost:
+                    population[p, row] = True
+                    hours, cost, kept = hours + item_hours, cost + item_cost, kept + 1
+                    if kept == max_items:
+                        break
+        return population
+
+    def _select(self, combined: np.ndarray, attributes: np.ndarray) -> np.ndarray:
+        """Environmental selection by front rank, then crowding distance"""
+        totals = combined @ attributes
+        objectives = np.where(MAXIMISED, -totals, totals)
+        # Empty pathways are never useful; push them to the last front
+        objectives[combined.sum(axis=1) == 0] = np.inf
+
+        ranks = non_dominated_ranks(objectives)
+        distance = np.zeros(len(combined))
+        for rank in np.unique(ranks):
+            members = np.flatnonzero(ranks == rank)
+            distance[members] = crowding_distance(objectives[members])
+
+        order = np.lexsort((-distance, ranks))
+        return combined[order[:self.population_size]]
@@ -0,0 +1,149 @@
+"""
+Pathway Store
+Bounded store of recommendation results by pathway id, with optional on-disk spill
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable
+import logging
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredPathway:
+    """A recommendation result with the profile it was built for and its memoized explanation"""
+    result: Any
+    user_profile: Dict[str, Any]
+    explanation: Optional[Dict[str, Any]] = None
+
+
+class PathwayStore:
+    """
+    Thread-safe LRU of recommendation results keyed by pathway id, so
+    clients can re-fetch or explain a pathway by id alone.
+
+    With a spill directory, entries evicted from memory are written there
+    (one joblib file per pathway, at most max_spill_entries files) and
+    promoted back to memory when requested again.
+    """
+
+    def __init__(self,
+                 max_entries: int = 4096,
+                 spill_dir: Optional[str] = None,
+                 max_spill_entries: int = 100000):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.max_spill_entries = max_spill_entries
+        self._entries: "OrderedDict[str, StoredPathway]" = OrderedDict()
+        self._spilled: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.explanations_computed = 0
+
+    def put(self, result: Any, user_profile: Dict[str, Any]):
+        """Store a result under its pathway id"""
+        with self._lock:
+            entry = self._entries.get(result.pathway_id)
+            if entry is not None and entry.result is result:
+                self._entries.move_to_end(result.pathway_id)
+                return
+            self._entries[result.pathway_id] = StoredPathway(result, dict(user_profile))
+            self._entries.move_to_end(result.pathway_id)
+            self._evict()
+
+    def get(self, pathway_id: str) -> Optional[StoredPathway]:
+        """Stored pathway by id, or None if unknown or dropped"""
+        with self._lock:
+            entry = self._entries.get(pathway_id)
+            if entry is not None:
+                self._entries.move_to_end(pathway_id)
+                self.hits += 1
+                return entry
+
+            entry = self._load_spilled(pathway_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.spill_hits += 1
+            self._entries[pathway_id] = entry
+            self._evict()
+            return entry
+
+    def explanation(self,
+                    pathway_id: str,
+                    explain: Callable[[Any, Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Explanation of a stored pathway, computed on first request and memoized"""
+        entry = self.get(pathway_id)
+        if entry is None:
+            return None
+        if entry.explanation is None:
+            # Explanations are deterministic, so a concurrent duplicate computation is harmless
+            entry.explanation = explain(entry.result, entry.user_profile)
+            with self._lock:
+                self.explanations_computed += 1
+        return entry.explanation
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            pathway_id, entry = self._entries.popitem(last=False)
+            if self.spill_dir:
+                self._spill(pathway_id, entry)
+
+    def _spill_path(self, pathway_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{pathway_id}.joblib")
+
+    def _spill(self, pathway_id: str, entry: StoredPathway):
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            joblib.dump(entry, self._spill_path(pathway_id))
+            self._spilled[pathway_id] = None
+            self.spills += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Could not spill pathway {pathway_id}: {e}")
+            return
+
+        while len(self._spilled) > self.max_spill_entries:
+            oldest, _ = self._spilled.popitem(last=False)
+            self._remove_spilled(oldest)
+
+    def _load_spilled(self, pathway_id: str) -> Optional[StoredPathway]:
+        if not self.spill_dir or pathway_id not in self._spilled:
+            return None
+        del self._spilled[pathway_id]
+        try:
+            entry = joblib.load(self._spill_path(pathway_id))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read spilled pathway {pathway_id}: {e}")
+            entry = None
+        self._remove_spilled(pathway_id)
+        return entry
+
+    def _remove_spilled(self, pathway_id: str):
+        try:
+            os.remove(self._spill_path(pathway_id))
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "spilled_entries": len(self._spilled),
+                "spill_dir": self.spill_dir,
+                "hits": self.hits,
+                "spill_hits": self.spill_hits,
+                "misses": self.misses,
+                "spills": self.spills,
+                "explanations_computed": self.explanations_computed
+            }
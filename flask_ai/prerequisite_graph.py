@@ -0,0 +1,167 @@
+"""
+Prerequisite Graph
+Skill prerequisite DAG with a precomputed transitive closure stored as bitsets
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import Dict, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+
+def _bitsets(owners: np.ndarray, codes: np.ndarray, n_rows: int, words: int) -> np.ndarray:
+    """Bitset per row with the given (row, skill code) bits set"""
+    bits = np.zeros((n_rows, words), dtype=np.uint64)
+    np.bitwise_or.at(bits, (owners, codes // WORD_BITS),
+                     np.left_shift(np.uint64(1), (codes % WORD_BITS).astype(np.uint64)))
+    return bits
+
+
+def _reduce_rows(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """OR together the bitsets of each CSR row group; empty groups give zero"""
+    out = np.zeros((len(indptr) - 1, values.shape[1]), dtype=np.uint64)
+    nonempty = np.flatnonzero(np.diff(indptr))
+    if nonempty.size:
+        out[nonempty] = np.bitwise_or.reduceat(values, indptr[nonempty], axis=0)
+    return out
+
+
+class PrerequisiteGraph:
+    """
+    Skill dependency graph built once from a resource catalog.
+
+    A resource covering skill s with prerequisite p contributes the edge
+    s -> p. The transitive closure of every skill's prerequisites is
+    precomputed as a packed uint64 bitset, and so is the full requirement
+    set of every resource (its prerequisites plus everything they need).
+    Requirements are deduplicated, as most resources share them.
+
+    Knowing a skill implies knowing its prerequisites, so a learner's
+    known set is the closure of their skills, and checking that a resource's
+    transitive prerequisites are met is one AND and compare per resource.
+    """
+
+    def __init__(self, catalog):
+        n = len(catalog)
+        self.skill_index: Dict[str, int] = dict(catalog.skill_index)
+        prerequisite_codes = np.array(
+            [self.skill_index.setdefault(term, len(self.skill_index)) for term in catalog.prerequisites.terms],
+            dtype=np.int64
+        )
+        n_skills = len(self.skill_index)
+        self.words = max(1, -(-n_skills // WORD_BITS))
+
+        # Resource x skill incidence for prerequisites and covered skills
+        owners = np.repeat(np.arange(n), np.diff(catalog.prerequisites.offsets))
+        prerequisites = prerequisite_codes[catalog.prerequisites.codes]
+        requires = sparse.csr_matrix(
+            (np.ones(len(owners), dtype=np.float32), (owners, prerequisites)), shape=(n, n_skills)
+        )
+        covers = catalog.skill_matrix.copy()
+        covers.resize((n, n_skills))
+
+        # Skill -> direct prerequisite skills
+        dependencies = (covers.T @ requires).tocsr()
+        dependencies.setdiag(0)
+        dependencies.eliminate_zeros()
+        dependencies.sort_indices()
+        self.dependencies = dependencies
+
+        self.closure = self._transitive_closure(dependencies, n_skills)
+        codes = np.arange(n_skills)
+        self_bits = self.closure[codes, codes // WORD_BITS] >> (codes % WORD_BITS).astype(np.uint64)
+        self.cyclic_skills = int((self_bits & np.uint64(1)).sum())
+        if self.cyclic_skills:
+            logger.warning(f"⚠️ Prerequisite graph has {self.cyclic_skills} skills on dependency cycles")
+
+        # Requirement bitset per resource: direct prerequisites and their closure
+        direct = _bitsets(np.arange(len(prerequisites)), prerequisites, len(prerequisites), self.words)
+        required = _reduce_rows(direct | self.closure[prerequisites],
+                                np.asarray(catalog.prerequisites.offsets, dtype=np.int64))
+        self.requirements, inverse = np.unique(required, axis=0, return_inverse=True)
+        self.requirement_index = inverse.reshape(-1).astype(np.int32)
+        logger.info(f"✅ Prerequisite graph built: {n_skills} skills, {dependencies.nnz} dependencies, "
+                    f"{len(self.requirements)} distinct requirement sets")
+
+    @staticmethod
+    def _transitive_closure(dependencies: sparse.csr_matrix, n_skills: int) -> np.ndarray:
+        """
+        Closure bitsets by fixed-point iteration: each pass ORs in the
+        closures of a skill's direct prerequisites. Converges in as many
+        passes as the longest dependency chain and terminates on cycles.
+        """
+        words = max(1, -(-n_skills // WORD_BITS))
+        owners = np.repeat(np.arange(n_skills), np.diff(dependencies.indptr))
+        closure = _bitsets(owners, dependencies.indices.astype(np.int64), n_skills, words)
+        if dependencies.nnz == 0:
+            return closure
+
+        for _ in range(n_skills):
+            expanded = closure | _reduce_rows(closure[dependencies.indices], dependencies.indptr)
+            if np.array_equal(expanded, closure):
+                break
+            closure = expanded
+        return closure
+
+    def known_bits(self, skills: Iterable[str]) -> np.ndarray:
+        """Bitset of the given skills and everything they imply"""
+        codes = np.array([self.skill_index[skill] for skill in set(skills) if skill in self.skill_index],
+                         dtype=np.int64)
+        known = np.zeros(self.words, dtype=np.uint64)
+        if codes.size:
+            known |= _bitsets(np.zeros(len(codes), dtype=np.intp), codes, 1, self.words)[0]
+            known |= np.bitwise_or.reduce(self.closure[codes], axis=0)
+        return known
+
+    def ready_mask(self, rows: np.ndarray, known: np.ndarray) -> np.ndarray:
+        """Whether every transitive prerequisite of each row's resource is known"""
+        missing = self.requirements[self.requirement_index[rows]] & ~known
+        return ~missing.any(axis=1)
+
+    def topological_order(self, rows: np.ndarray, cover_bits: np.ndarray, priority: np.ndarray) -> np.ndarray:
+        """
+        Positions of rows ordered so a resource comes after any resource
+        covering one of its transitive prerequisites. Ties are broken by
+        ascending priority. When only dependency cycles remain, the next
+        resource is taken from a cycle that no other remaining resource
+        has to precede, again by priority.
+        """
+        k = len(rows)
+        required = self.requirements[self.requirement_index[rows]]
+        # before[a, b]: resource a teaches something resource b requires
+        before = (cover_bits[:, None, :] & required[None, :, :]).any(axis=2)
+        np.fill_diagonal(before, False)
+        pending = before.sum(axis=0)
+        remaining = np.ones(k, dtype=bool)
+        rank = np.argsort(np.argsort(priority, kind="stable"), kind="stable")
+
+        order = []
+        for _ in range(k):
+            candidates = remaining & (pending == 0)
+            if not candidates.any():
+                candidates = remaining & self._cycle_sources(before, remaining)
+            chosen = int(np.flatnonzero(candidates)[np.argmin(rank[candidates])])
+            order.append(chosen)
+            remaining[chosen] = False
+            pending -= before[chosen]
+        return np.array(order, dtype=np.intp)
+
+    @staticmethod
+    def _cycle_sources(before: np.ndarray, remaining: np.ndarray) -> np.ndarray:
+        """Remaining resources that every remaining resource ordered before them is also ordered after"""
+        edges = before & remaining[:, None] & remaining[None, :]
+        reach = edges
+        while True:
+            extended = reach | ((reach.astype(np.int32) @ edges.astype(np.int32)) > 0)
+            if np.array_equal(extended, reach):
+                break
+            reach = extended
+        return ~(reach & ~reach.T).any(axis=0)
+
+    def cover_bits(self, owners: np.ndarray, codes: np.ndarray, n_rows: int) -> np.ndarray:
+        """Coverage bitsets from flattened (position, catalog skill column) pairs"""
+        return _bitsets(owners, codes.astype(np.int64), n_rows, self.words)
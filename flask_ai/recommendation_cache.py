@@ -0,0 +1,142 @@
+"""
+Recommendation Cache
+Bounded LRU/TTL cache of recommendation results keyed by normalized profile
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_profile_key(user_profile: Dict[str, Any],
+                          objectives: List[Any],
+                          algorithm: Any,
+                          max_resources: int,
+                          diversity: float = 0.5) -> str:
+    """
+    Stable hash of a recommendation request.
+    Only normalizations the engine is insensitive to are applied: skill
+    order and duplicates, aspiration case, and the default learning pace.
+    """
+    profile = dict(user_profile)
+    profile["prior_skills"] = sorted(set(profile.get("prior_skills", [])))
+    profile["career_aspirations"] = str(profile.get("career_aspirations", "")).lower()
+    profile.setdefault("learning_pace", "medium")
+
+    request = {
+        "profile": profile,
+        "objectives": sorted(getattr(objective, "value", objective) for objective in objectives),
+        "algorithm": getattr(algorithm, "value", algorithm),
+        "max_resources": max_resources,
+        "diversity": diversity
+    }
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Thread-safe LRU cache with per-entry TTL.
+
+    Entries that depend on learner behaviour (collaborative and hybrid
+    results) are indexed by the profile's prior skills, so feedback only
+    invalidates entries whose neighbourhood the feedback could change.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._skill_index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, behavior_skills: Optional[Iterable[str]] = None):
+        """
+        Store a result. behavior_skills marks the entry as depending on
+        learner behaviour and lists the skills its neighbourhood is built from.
+        """
+        skills = frozenset(behavior_skills) if behavior_skills is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, skills)
+            for skill in skills or ():
+                self._skill_index.setdefault(skill, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_skills(self, skills: Iterable[str]) -> int:
+        """Drop behaviour-dependent entries whose profile shares any of the skills"""
+        with self._lock:
+            keys = set()
+            for skill in skills:
+                keys |= self._skill_index.get(skill, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        """Drop every entry, e.g. after a catalog or market weight change"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._skill_index.clear()
+            self.invalidations += count
+            return count
+
+    def _remove(self, key: str):
+        _, _, skills = self._entries.pop(key)
+        for skill in skills or ():
+            keys = self._skill_index.get(skill)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._skill_index[skill]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
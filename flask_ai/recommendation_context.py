@@ -0,0 +1,201 @@
+"""
+Recommendation Context
+Profile-derived features and stage timings for one recommendation request
+"""
+
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Iterator, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+WEEKLY_HOURS_BY_PACE = {"slow": 5, "medium": 10, "fast": 20}
+
+
+class RecommendationContext:
+    """
+    Everything one request derives from the learner profile, computed on
+    first use and memoized, and passed to every stage instead of the raw
+    profile. The derivations themselves stay on the engine (``engine``),
+    which also uses them outside requests; the context only guarantees
+    each runs at most once per request.
+
+    Stages record their wall time in ``stage_ms``. Stages of a batch that
+    run once for a whole block record their time shared out over the
+    block's contexts (see ``record_shared``). Stages that missed their
+    deadline or failed, and so contributed a fallback, are listed in
+    ``degraded_stages``; such a result is served but never cached.
+    """
+
+    def __init__(self,
+                 engine,
+                 user_profile: Dict[str, Any],
+                 objectives: Optional[List[Any]] = None,
+                 algorithm: Optional[Any] = None,
+                 max_resources: int = 10,
+                 diversity: float = 0.5):
+        self.engine = engine
+        self.user_profile = user_profile
+        self.objectives = objectives or []
+        self.algorithm = algorithm
+        self.max_resources = max_resources
+        self.diversity = diversity
+        self.stage_ms: Dict[str, float] = {}
+        self.degraded_stages: List[str] = []
+        self._started = time.perf_counter()
+        self._timing_lock = threading.Lock()
+
+    # Profile-derived features
+
+    @cached_property
+    def prior_skills(self) -> List[str]:
+        return list(self.user_profile.get("prior_skills", []))
+
+    @cached_property
+    def prior_skill_set(self) -> Set[str]:
+        return set(self.prior_skills)
+
+    @cached_property
+    def prior_skill_bits(self) -> np.ndarray:
+        """Packed bitset of the prior skills over the catalog skill vocabulary"""
+        return self.engine.resource_catalog.skill_set_bitsets([self.prior_skills])[0]
+
+    @cached_property
+    def known_skill_bits(self) -> np.ndarray:
+        """Prerequisite-graph bitset of the prior skills and every skill they imply"""
+        return self.engine.resource_catalog.prerequisite_graph.known_bits(self.prior_skills)
+
+    @cached_property
+    def user_id(self) -> str:
+        return str(self.user_profile.get("user_id") or "")
+
+    @cached_property
+    def recent_items(self) -> List[str]:
+        """Resources the learner touched most recently (most recent last): from the profile, else their history"""
+        recent = self.user_profile.get("recent_resources")
+        if recent:
+            return [str(resource_id) for resource_id in recent]
+        return list(self.engine.item_model.recent_items(self.user_id)) if self.user_id else []
+
+    @cached_property
+    def aspiration(self) -> str:
+        """Career aspirations, lower-cased"""
+        return str(self.user_profile.get("career_aspirations") or "").lower()
+
+    @cached_property
+    def target_skills(self) -> List[str]:
+        return self.engine._get_target_skills(self.aspiration)
+
+    @cached_property
+    def missing_skills(self) -> Set[str]:
+        """Target skills the learner does not list yet"""
+        return set(self.target_skills) - self.prior_skill_set
+
+    @cached_property
+    def skill_gap(self) -> Dict[str, float]:
+        """Missing skills expanded over the taxonomy, weighted by depth"""
+        return self.engine.skill_taxonomy.expand(self.missing_skills)
+
+    @cached_property
+    def target_nsqf_level(self) -> int:
+        return self.engine._estimate_target_nsqf_level(self.user_profile)
+
+    @cached_property
+    def learning_pace(self) -> str:
+        return self.user_profile.get("learning_pace", "medium")
+
+    @cached_property
+    def weekly_hours(self) -> int:
+        return WEEKLY_HOURS_BY_PACE.get(self.learning_pace, 10)
+
+    @cached_property
+    def budget(self) -> float:
+        return self.engine._profile_cap(self.user_profile, "budget")
+
+    @cached_property
+    def max_hours(self) -> float:
+        return self.engine._profile_cap(self.user_profile, "max_hours")
+
+    @cached_property
+    def bandit_context(self) -> np.ndarray:
+        """Context feature vector of the contextual bandit"""
+        return self.engine._bandit_context(self)
+
+    # Stage timings
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Add the wall time of the enclosed block to the stage's total"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000)
+
+    def record(self, stage: str, ms: float):
+        # Hybrid stages run on pool threads and record concurrently
+        with self._timing_lock:
+            self.stage_ms[stage] = self.stage_ms.get(stage, 0.0) + ms
+
+    @staticmethod
+    @contextmanager
+    def record_shared(contexts: List["RecommendationContext"], stage: str) -> Iterator[None]:
+        """Time a stage run once for several requests, charging each an equal share"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            share = (time.perf_counter() - started) * 1000 / max(len(contexts), 1)
+            for context in contexts:
+                context.record(stage, share)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+
+class StageTimings:
+    """Running per-stage latency totals over finished single-learner requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.total_ms = 0.0
+        self._stages: Dict[str, List[float]] = {}  # stage -> [calls, total ms, max ms]
+
+    def add(self, context: RecommendationContext):
+        elapsed = context.elapsed_ms
+        with self._lock:
+            self.requests += 1
+            self.total_ms += elapsed
+            for stage, ms in context.stage_ms.items():
+                totals = self._stages.setdefault(stage, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += ms
+                totals[2] = max(totals[2], ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "mean_request_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+                "stages": {
+                    stage: {
+                        "calls": calls,
+                        "mean_ms": round(total / calls, 3),
+                        "max_ms": round(longest, 3),
+                        "share_of_request_time": round(total / self.total_ms, 3) if self.total_ms else 0.0
+                    }
+                    for stage, (calls, total, longest) in sorted(self._stages.items(), key=lambda item: -item[1][1])
+                }
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.total_ms = 0.0
+            self._stages.clear()
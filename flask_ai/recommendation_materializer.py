@@ -0,0 +1,254 @@
+"""
+Recommendation Materializer
+Precomputed per-learner recommendation results, refreshed when their inputs change
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MaterializedRequest:
+    """The request parameters a learner's stored result answers"""
+    objectives: Tuple[Any, ...]
+    algorithm: Any
+    max_resources: int
+    diversity: float
+
+
+@dataclass(frozen=True)
+class InputVersion:
+    """
+    Versions of everything a stored result was built from: the request and
+    profile (as their canonical key), the learner's own feedback and
+    platform interactions, the catalog, the market weights, and the
+    published predictor and implicit-factor models.
+    """
+    profile_key: str
+    feedback_version: int
+    catalog_version: int
+    market_weights_version: int
+    models_version: int
+    factors_version: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    user_profile: Dict[str, Any]
+    request: MaterializedRequest
+    inputs: InputVersion
+    result: Any
+    built_at: float
+
+
+class RecommendationMaterializer:
+    """
+    Each active learner's latest recommendation result, keyed by user id.
+
+    A learner becomes active when a request for them is answered and
+    stored (``store``); the least recently seen learners are dropped past
+    ``max_learners``. A stored result is fresh while the input version it
+    was built from equals the current one and it is younger than
+    ``max_age_seconds``; the age bound covers inputs that are not
+    versioned per learner, such as other learners' feedback. Reading a
+    fresh result is a dictionary lookup.
+
+    A daemon thread, started on first store, rechecks every active learner
+    each ``refresh_interval_seconds`` and recomputes only those whose
+    input versions changed, through the engine's batched scoring, so that
+    most dashboard loads find a fresh result. Results past their age are
+    not refreshed in the background: that would recompute every active
+    learner once per ``max_age_seconds``. They are recomputed by the next
+    request for the learner instead.
+    """
+
+    def __init__(self,
+                 engine,
+                 max_learners: int = 10000,
+                 max_age_seconds: float = 900.0,
+                 refresh_interval_seconds: float = 10.0,
+                 batch_size: int = 256):
+        self.engine = engine
+        self.max_learners = max_learners
+        self.max_age_seconds = max_age_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.batch_size = batch_size
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.refresh_count = 0
+        self.last_refresh_ms = 0.0
+
+    def get(self, user_id: str, inputs: InputVersion) -> Optional[Any]:
+        """The learner's stored result if it was built from these inputs and is not too old"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            if entry is None or entry.inputs != inputs or self._expired(entry):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.result
+
+    def store(self,
+              user_id: str,
+              user_profile: Dict[str, Any],
+              request: MaterializedRequest,
+              inputs: InputVersion,
+              result: Any):
+        """Keep a learner's result (built from inputs) and mark the learner active"""
+        if result.pathway_id.startswith("fallback"):
+            return
+        self._ensure_started()
+        with self._lock:
+            self._entries[user_id] = _Entry(dict(user_profile), request, inputs, result, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_learners:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> int:
+        """Drop every stored result, e.g. after learner behaviour was reloaded"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.built_at >= self.max_age_seconds
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recommendation-materializer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the refresh thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Materialized recommendation refresh failed: {e}")
+
+    def stale_learners(self) -> List[Tuple[str, _Entry]]:
+        """Active learners whose stored result no longer matches its input versions"""
+        with self._lock:
+            entries = list(self._entries.items())
+        versions = self.engine._learner_versions
+        state = self.engine.serving
+        return [
+            (user_id, entry) for user_id, entry in entries
+            if entry.inputs.feedback_version != versions.get(user_id, 0)
+            or entry.inputs.catalog_version != state.catalog_version
+            or entry.inputs.market_weights_version != state.market_weights_version
+            or entry.inputs.models_version != self.engine._models_version
+            or entry.inputs.factors_version != self.engine._factors_version
+        ]
+
+    def refresh(self) -> int:
+        """Recompute the stale results, batched per request shape; returns how many were stored"""
+        started = time.perf_counter()
+        self.engine._sync_behavior()
+        groups: Dict[MaterializedRequest, List[Tuple[str, _Entry]]] = {}
+        for user_id, entry in self.stale_learners():
+            groups.setdefault(entry.request, []).append((user_id, entry))
+
+        refreshed = 0
+        for request, members in groups.items():
+            for start in range(0, len(members), self.batch_size):
+                block = members[start:start + self.batch_size]
+                # Versions are read before computing, so a change during the batch makes the result stale, never wrong
+                inputs = [self.engine._materialization_inputs(entry.user_profile, request) for _, entry in block]
+                # Not recorded as served pathways: a stored result is recorded when it is served
+                results = self.engine.generate_batch_recommendations(
+                    [entry.user_profile for _, entry in block], list(request.objectives), request.algorithm,
+                    request.max_resources, diversity=request.diversity, record_pathways=False
+                )
+                now = time.monotonic()
+                with self._lock:
+                    for (user_id, entry), version, result in zip(block, inputs, results):
+                        # A learner whose request changed meanwhile keeps the newer entry
+                        if self._entries.get(user_id) is entry and not result.pathway_id.startswith("fallback"):
+                            self._entries[user_id] = _Entry(entry.user_profile, request, version, result, now)
+                            refreshed += 1
+
+        self.refreshed += refreshed
+        self.refresh_count += 1
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        if refreshed:
+            logger.info(f"✅ Refreshed {refreshed} materialized recommendations in {self.last_refresh_ms:.1f}ms")
+        return refreshed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "learners": len(self._entries),
+                "max_learners": self.max_learners,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "refreshed": self.refreshed,
+                "refresh_count": self.refresh_count,
+                "last_refresh_ms": round(self.last_refresh_ms, 3),
+                "max_age_seconds": self.max_age_seconds,
+                "refresh_interval_seconds": self.refresh_interval_seconds
+            }
+
+
+if __name__ == "__main__":
+    # Dashboard loads for returning learners: computed live versus read from the materialized store
+    import os
+    import random
+    import tempfile
+
+    from advanced_recommendation_engine import AdvancedRecommendationEngine
+    from behavior_store import BehaviorStore
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = AdvancedRecommendationEngine(
+            behavior_store=BehaviorStore(os.path.join(directory, "behavior.sqlite3"))
+        )
+        profiles = [
+            {"user_id": f"learner_{i}", "career_aspirations": rng.choice(["data scientist", "web developer"]),
+             "prior_skills": rng.sample(["python", "sql", "html", "aws"], 2), "max_hours": rng.randint(50, 500)}
+            for i in range(200)
+        ]
+        timings = {}
+        for label in ("first visit", "return visit"):
+            started = time.perf_counter()
+            served = sum(engine.get_learner_recommendations(profile)[1] for profile in profiles)
+            timings[label] = ((time.perf_counter() - started) * 1000 / len(profiles), served)
+        engine.update_user_feedback("learner_0", engine.resource_catalog.ids()[0], {"rating": 5, "completed": True})
+        engine.wait_for_behavior(engine.behavior_store.last_seq())
+        stale = len(engine.materializer.stale_learners())
+        refreshed = engine.materializer.refresh()
+        engine.materializer.stop()
+        engine.model_trainer.stop()
+
+    for label, (ms, served) in timings.items():
+        print(f"{label:>13}: {ms:.3f}ms per learner, {served}/{len(profiles)} served from the store")
+    print(f"after one learner's feedback: {stale} stale, {refreshed} recomputed")
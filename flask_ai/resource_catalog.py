@@ -0,0 +1,617 @@
+"""
+Resource Catalog
+Indexed, columnar storage of learning resources for fast lookup and vectorized scoring
+"""
+
+import hashlib
+import itertools
+import numpy as np
+from scipy import sparse
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Mapping, Tuple
+import logging
+
+from prerequisite_graph import PrerequisiteGraph
+from semantic_index import SemanticIndex
+
+logger = logging.getLogger(__name__)
+
+# Duration buckets used by the learning pace compatibility term
+DURATION_SHORT, DURATION_MEDIUM, DURATION_LONG = 0, 1, 2
+
+# Pace score per duration bucket (short, medium, long)
+PACE_SCORE_TABLE = {
+    "slow": np.array([6.0, 8.0, 10.0]),
+    "medium": np.array([8.0, 10.0, 8.0]),
+    "fast": np.array([10.0, 6.0, 6.0])
+}
+DEFAULT_PACE_SCORE = 8.0
+DEFAULT_MARKET_WEIGHT = 0.5
+
+
+@dataclass
+class LearningResource:
+    """Learning resource data structure"""
+    __slots__ = (
+        "id", "title", "type", "provider", "nsqf_level", "difficulty", "duration_hours", "cost",
+        "skills_covered", "prerequisites", "success_rate", "rating_count", "rating_sum",
+        "employment_impact", "salary_impact", "tags"
+    )
+    id: str
+    title: str
+    type: str  # course, certification, book, project, mentorship
+    provider: str
+    nsqf_level: int
+    difficulty: str
+    duration_hours: int
+    cost: float
+    skills_covered: List[str]
+    prerequisites: List[str]
+    success_rate: float
+    rating_count: int
+    rating_sum: float
+    employment_impact: float
+    salary_impact: float
+    tags: List[str]
+
+
+def _offset_dtype(size: int):
+    return np.int32 if size < np.iinfo(np.int32).max else np.int64
+
+
+def _offsets(lengths: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets.astype(_offset_dtype(int(offsets[-1])))
+
+
+class StringColumn:
+    """Strings packed into one UTF-8 buffer addressed by row offsets"""
+
+    def __init__(self, values: Iterable[str]):
+        encoded = [value.encode("utf-8") for value in values]
+        self.offsets = _offsets(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+        self.buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+
+    def take(self, rows: np.ndarray) -> List[str]:
+        buffer = self.buffer
+        return [buffer[start:end].tobytes().decode("utf-8")
+                for start, end in zip(self.offsets[rows].tolist(), self.offsets[rows + 1].tolist())]
+
+    def __iter__(self) -> Iterator[str]:
+        data, offsets = self.buffer.tobytes(), self.offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield data[start:end].decode("utf-8")
+
+
+class CategoryColumn:
+    """Interned low-cardinality strings: a small integer code per row plus the category list"""
+
+    def __init__(self, values: Iterable[str]):
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        self.categories: List[str] = list(index)
+        self.codes = np.array(codes, dtype=np.int16 if len(index) < 2 ** 15 else np.int32)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self.categories[self.codes[row]]
+
+    def take(self, rows: np.ndarray) -> List[str]:
+        categories = self.categories
+        return [categories[code] for code in self.codes[rows].tolist()]
+
+    def code(self, value: str) -> Optional[int]:
+        try:
+            return self.categories.index(value)
+        except ValueError:
+            return None
+
+
+class ListColumn:
+    """Variable-length lists of interned terms: int32 term codes addressed by row offsets"""
+
+    def __init__(self, rows: Iterable[List[str]], vocabulary: Optional[Dict[str, int]] = None):
+        self.vocabulary = vocabulary if vocabulary is not None else {}
+        codes, lengths = [], []
+        for terms in rows:
+            lengths.append(len(terms))
+            codes.extend(self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms)
+        self.offsets = _offsets(np.array(lengths, dtype=np.int64))
+        self.codes = np.array(codes, dtype=np.int32)
+        self.terms: List[str] = list(self.vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> List[str]:
+        return [self.terms[code] for code in self.codes[self.offsets[row]:self.offsets[row + 1]].tolist()]
+
+    def take(self, rows: np.ndarray) -> List[List[str]]:
+        codes, terms = self.codes, self.terms
+        return [[terms[code] for code in codes[start:end].tolist()]
+                for start, end in zip(self.offsets[rows].tolist(), self.offsets[rows + 1].tolist())]
+
+
+def records_digest(resources: Iterable[LearningResource]) -> str:
+    """Hash of resource records, to check a saved catalog against its source without building it"""
+    digest = hashlib.sha256()
+    for resource in resources:
+        digest.update(repr(tuple(getattr(resource, field) for field in LearningResource.__slots__)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _id_hash(resource_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(resource_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class IdIndex:
+    """
+    Compact id -> row mapping with a dict-like interface.
+    Stores sorted 64-bit id hashes and the matching rows (12 bytes per id)
+    instead of a dict of string keys; lookups are a binary search plus an
+    id comparison to rule out hash collisions.
+    """
+
+    def __init__(self, ids: StringColumn):
+        hashes = np.fromiter((_id_hash(resource_id) for resource_id in ids), dtype=np.uint64, count=len(ids))
+        order = np.argsort(hashes, kind="stable")
+        self.ids = ids
+        self.hashes = hashes[order]
+        self.rows = order.astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, resource_id: str, default: Optional[int] = None) -> Optional[int]:
+        key = _id_hash(resource_id)
+        position = int(self.hashes.searchsorted(np.uint64(key)))
+        while position < len(self.hashes) and int(self.hashes[position]) == key:
+            row = int(self.rows[position])
+            if self.ids[row] == resource_id:
+                return row
+            position += 1
+        return default
+
+    def rows_of(self, resource_ids: List[str]) -> np.ndarray:
+        """Rows of several ids with one binary search; raises KeyError for an unknown id"""
+        keys = np.fromiter(map(_id_hash, resource_ids), dtype=np.uint64, count=len(resource_ids))
+        if not len(keys) or not len(self.hashes):
+            return np.array([self[resource_id] for resource_id in resource_ids], dtype=np.intp)
+        positions = np.minimum(self.hashes.searchsorted(keys), len(self.hashes) - 1)
+        rows = self.rows[positions].astype(np.intp)
+        found = self.hashes[positions] == keys
+        found[found] = [stored == resource_id for stored, resource_id in
+                        zip(self.ids.take(rows[found]), itertools.compress(resource_ids, found.tolist()))]
+        # Unknown ids and hash collisions take the one-by-one lookup
+        for i in np.flatnonzero(~found).tolist():
+            rows[i] = self[resource_ids[i]]
+        return rows
+
+    def __getitem__(self, resource_id: str) -> int:
+        row = self.get(resource_id)
+        if row is None:
+            raise KeyError(resource_id)
+        return row
+
+    def __contains__(self, resource_id: str) -> bool:
+        return self.get(resource_id) is not None
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return ((resource_id, row) for row, resource_id in enumerate(self.ids))
+
+
+def _group_rows(codes: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows sorted by group code plus per-group offsets, a CSR-style inverted index"""
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    return order, _offsets(np.bincount(codes, minlength=n_groups))
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+    Ties are broken by catalog position so results are deterministic.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+class ColumnarCatalog:
+    """
+    Columnar catalog of learning resources.
+
+    Every resource attribute lives in an aligned column (row i describes
+    the i-th resource): NumPy arrays for numeric fields, interned codes for
+    categorical fields, packed buffers for strings and term lists. Skill
+    coverage is also kept as a sparse resource x skill incidence matrix, so
+    scoring terms are computed for the whole catalog in a single vectorized
+    pass. LearningResource records are only materialized on request.
+
+    ``digest`` hashes the packed columns once, when the catalog is built,
+    so state derived from the catalog can be versioned without touching
+    its records.
+    """
+
+    def __init__(self, resources: Iterable[LearningResource], market_weights: Dict[str, float]):
+        resources = list(resources)
+        n = len(resources)
+        self.skill_index: Dict[str, int] = {}
+
+        self.resource_ids = StringColumn(resource.id for resource in resources)
+        self.titles = StringColumn(resource.title for resource in resources)
+        self.row_index = IdIndex(self.resource_ids)
+        self.types = CategoryColumn(resource.type for resource in resources)
+        self.providers = CategoryColumn(resource.provider for resource in resources)
+        self.difficulties = CategoryColumn(resource.difficulty for resource in resources)
+        self.skills = ListColumn((resource.skills_covered for resource in resources), self.skill_index)
+        self.prerequisites = ListColumn(resource.prerequisites for resource in resources)
+        self.tags = ListColumn(resource.tags for resource in resources)
+
+        def column(field: str, dtype) -> np.ndarray:
+            return np.fromiter((getattr(resource, field) for resource in resources), dtype=dtype, count=n)
+
+        self.nsqf_level = column("nsqf_level", np.int16)
+        self.duration_hours = column("duration_hours", np.float64)
+        self.cost = column("cost", np.float64)
+        self.success_rate = column("success_rate", np.float32)
+        self.rating_count = column("rating_count", np.int32)
+        self.rating_sum = column("rating_sum", np.float64)
+        self.employment_impact = column("employment_impact", np.float32)
+        self.salary_impact = column("salary_impact", np.float32)
+
+        # Incidence matrix over distinct skills per resource
+        owners = np.repeat(np.arange(n), np.diff(self.skills.offsets))
+        self.skill_matrix = sparse.csr_matrix(
+            (np.ones(len(owners), dtype=np.float32), (owners, self.skills.codes)),
+            shape=(n, len(self.skill_index))
+        )
+        self.skill_matrix.sum_duplicates()
+        self.skill_matrix.data[:] = 1.0
+        self.skill_counts = np.diff(self.skill_matrix.indptr).astype(np.int32)
+        # Packed skill coverage per resource, in np.packbits bit order
+        self.skill_bits = np.zeros((n, -(-len(self.skill_index) // 8)), dtype=np.uint8)
+        columns = self.skill_matrix.indices
+        np.bitwise_or.at(self.skill_bits, (np.repeat(np.arange(n), self.skill_counts), columns // 8),
+                         (128 >> (columns % 8)).astype(np.uint8))
+
+        self.duration_bucket = np.full(n, DURATION_MEDIUM, dtype=np.int8)
+        self.duration_bucket[self.duration_hours <= 50] = DURATION_SHORT
+        self.duration_bucket[self.duration_hours >= 150] = DURATION_LONG
+
+        self.update_market_weights(market_weights)
+        self.digest = self._column_digest()
+        logger.info(f"✅ Columnar catalog built: {n} resources, {len(self.skill_index)} skills")
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+    def _column_digest(self) -> str:
+        """Hash of every packed column except the market weights, which are versioned separately"""
+        digest = hashlib.sha256()
+
+        def update(data):
+            data = np.ascontiguousarray(data) if isinstance(data, np.ndarray) else data
+            digest.update(len(memoryview(data).cast("B")).to_bytes(8, "little"))
+            digest.update(data)
+
+        for column in (self.resource_ids, self.titles):
+            update(column.offsets)
+            update(column.buffer)
+        for column in (self.types, self.providers, self.difficulties):
+            update("\0".join(column.categories).encode("utf-8"))
+            update(column.codes)
+        for column in (self.skills, self.prerequisites, self.tags):
+            update("\0".join(column.terms).encode("utf-8"))
+            update(column.offsets)
+            update(column.codes)
+        for column in (self.nsqf_level, self.duration_hours, self.cost, self.success_rate, self.rating_count,
+                       self.rating_sum, self.employment_impact, self.salary_impact):
+            update(column)
+        return digest.hexdigest()
+
+    @property
+    def rating_mean(self) -> np.ndarray:
+        return np.where(self.rating_count > 0, self.rating_sum / np.maximum(self.rating_count, 1), 0.0)
+
+    def record(self, row: int) -> LearningResource:
+        """Materialize the LearningResource at a catalog row"""
+        return self.records([row])[0]
+
+    def records(self, rows) -> List[LearningResource]:
+        """Materialize the LearningResources at the given catalog rows, gathering each column once"""
+        rows = np.asarray(rows, dtype=np.intp).reshape(-1)
+
+        def rounded(column: np.ndarray) -> List[float]:
+            # float32 columns are rounded back to the precision they were given in
+            return [round(value, 6) for value in column[rows].tolist()]
+
+        return [
+            LearningResource(*fields) for fields in zip(
+                self.resource_ids.take(rows), self.titles.take(rows), self.types.take(rows),
+                self.providers.take(rows), self.nsqf_level[rows].tolist(), self.difficulties.take(rows),
+                self.duration_hours[rows].astype(np.int64).tolist(), self.cost[rows].tolist(),
+                self.skills.take(rows), self.prerequisites.take(rows), rounded(self.success_rate),
+                self.rating_count[rows].tolist(), self.rating_sum[rows].tolist(), rounded(self.employment_impact),
+                rounded(self.salary_impact), self.tags.take(rows)
+            )
+        ]
+
+    def update_market_weights(self, market_weights: Dict[str, float]):
+        """Recompute the per-resource maximum market weight over covered skills"""
+        skill_weights = np.full(len(self.skill_index), DEFAULT_MARKET_WEIGHT)
+        for skill, col in self.skill_index.items():
+            skill_weights[col] = market_weights.get(skill, DEFAULT_MARKET_WEIGHT)
+
+        # Row-wise max over the non-zero entries of the incidence matrix
+        max_weight = np.full(len(self), DEFAULT_MARKET_WEIGHT)
+        indptr, indices = self.skill_matrix.indptr, self.skill_matrix.indices
+        non_empty = np.diff(indptr) > 0
+        if indices.size:
+            max_weight[non_empty] = np.maximum.reduceat(skill_weights[indices], indptr[:-1][non_empty])
+        self.max_market_weight = max_weight
+
+    def model_features(self, ratings: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feature matrix for the satisfaction and employment predictors, for
+        every resource or only the given rows (ratings aligned with them)
+        """
+        take = (lambda column: column) if rows is None else (lambda column: column[rows])
+        return np.column_stack([
+            take(self.nsqf_level),
+            take(self.duration_hours),
+            np.log(take(self.cost) + 1),
+            take(self.skill_counts),
+            take(self.success_rate),
+            ratings,
+            take(self.employment_impact),
+            take(self.salary_impact)
+        ]).astype(np.float64)
+
+    def ratings_or(self, default: float, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mean user rating per resource (or per given row), with a default for unrated resources"""
+        counts = self.rating_count if rows is None else self.rating_count[rows]
+        sums = self.rating_sum if rows is None else self.rating_sum[rows]
+        return np.where(counts > 0, sums / np.maximum(counts, 1), default)
+
+    def skill_vector(self, skills) -> np.ndarray:
+        """Dense indicator vector over the catalog skill vocabulary"""
+        vector = np.zeros(len(self.skill_index))
+        for skill in skills:
+            col = self.skill_index.get(skill)
+            if col is not None:
+                vector[col] = 1.0
+        return vector
+
+    def skill_sets_matrix(self, skill_sets: List[Any]) -> sparse.csr_matrix:
+        """
+        Sparse matrix (one row per skill set) over the skill vocabulary.
+        A set is an indicator; a mapping of skill to weight gives weighted entries.
+        """
+        rows, cols, weights = [], [], []
+        for i, skills in enumerate(skill_sets):
+            for skill in set(skills):
+                col = self.skill_index.get(skill)
+                if col is not None:
+                    rows.append(i)
+                    cols.append(col)
+                    weights.append(skills[skill] if isinstance(skills, Mapping) else 1.0)
+        return sparse.csr_matrix(
+            (np.array(weights, dtype=np.float64), (rows, cols)), shape=(len(skill_sets), len(self.skill_index))
+        )
+
+    def row_skills(self, rows: np.ndarray):
+        """
+        Skill columns of the given rows, flattened, with the position in
+        ``rows`` each entry belongs to. Avoids sparse fancy-indexing overhead.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = self.skill_matrix.indptr[rows]
+        lengths = self.skill_matrix.indptr[rows + 1] - starts
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return owners, self.skill_matrix.indices[np.repeat(starts, lengths) + offsets]
+
+    def skill_bitsets(self, rows: np.ndarray) -> np.ndarray:
+        """Packed skill-coverage bitsets, one row of uint8 words per given row (rows may be 2-D)"""
+        return self.skill_bits[rows]
+
+    def skill_set_bitsets(self, skill_sets: List[Any]) -> np.ndarray:
+        """Packed bitsets of skill sets, in the layout of skill_bitsets"""
+        return np.packbits(np.array([self.skill_vector(skills) for skills in skill_sets], dtype=bool)
+                           .reshape(len(skill_sets), len(self.skill_index)), axis=1)
+
+    def rows_skill_overlap(self, rows: np.ndarray, skills) -> np.ndarray:
+        """Number of the given skills covered by each of the given rows"""
+        owners, columns = self.row_skills(rows)
+        return np.bincount(owners, weights=self.skill_vector(skills)[columns], minlength=len(rows))
+
+    def skill_overlap(self, skills) -> np.ndarray:
+        """Number of the given skills covered by each resource"""
+        return self.skill_matrix @ self.skill_vector(skills)
+
+    def pace_scores(self, learning_pace: str) -> np.ndarray:
+        """Learning pace compatibility score per resource"""
+        table = PACE_SCORE_TABLE.get(learning_pace)
+        if table is None:
+            return np.full(len(self), DEFAULT_PACE_SCORE)
+        return table[self.duration_bucket]
+
+    def pace_score_matrix(self, learning_paces: List[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Learning pace compatibility scores, one row per pace, over every
+        resource or the given rows. 2-D rows hold one row of rows per pace.
+        """
+        default = np.full(3, DEFAULT_PACE_SCORE)
+        tables = np.stack([PACE_SCORE_TABLE.get(pace, default) for pace in learning_paces])
+        if rows is not None and np.ndim(rows) == 2:
+            return np.take_along_axis(tables, self.duration_bucket[rows].astype(np.intp), axis=1)
+        return tables[:, self.duration_bucket if rows is None else self.duration_bucket[rows]]
+
+    def static_content_scores(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Profile-independent content score terms: success rate, ratings and market demand"""
+        if rows is None:
+            return self.success_rate * 5 + self.ratings_or(2) + self.max_market_weight * 10
+        return self.success_rate[rows] * 5 + self.ratings_or(2, rows) + self.max_market_weight[rows] * 10
+
+
+class ResourceCatalog(ColumnarCatalog):
+    """
+    Indexed resource catalog.
+
+    Adds inverted indexes on top of the columnar arrays so lookups by id,
+    skill, NSQF level, type or provider touch only matching rows, and
+    cost/duration ranges are answered by binary search over sort orders.
+    Each index is a row permutation plus group offsets (4 bytes per
+    resource) rather than a dict of per-key arrays. Prerequisites are
+    indexed as a skill dependency graph with a precomputed closure, and
+    resource text (title, tags, skills) as a TF-IDF semantic index.
+    """
+
+    def __init__(self, resources: Iterable[LearningResource], market_weights: Dict[str, float]):
+        super().__init__(resources, market_weights)
+
+        skill_columns = self.skill_matrix.tocsc()
+        self._skill_rows = skill_columns.indices.astype(np.int32)
+        self._skill_offsets = skill_columns.indptr.astype(_offset_dtype(len(self._skill_rows)))
+        self._level_rows, self._level_offsets = _group_rows(self.nsqf_level, int(self.nsqf_level.max(initial=0)) + 1)
+        self._type_rows, self._type_offsets = _group_rows(self.types.codes, len(self.types.categories))
+        self._provider_rows, self._provider_offsets = _group_rows(self.providers.codes, len(self.providers.categories))
+
+        self._cost_order = np.argsort(self.cost, kind="stable").astype(np.int32)
+        self._duration_order = np.argsort(self.duration_hours, kind="stable").astype(np.int32)
+
+        self.prerequisite_graph = PrerequisiteGraph(self)
+        self.semantic_index = SemanticIndex([
+            " ".join([title, *self.tags[row], *self.skills[row]]) for row, title in enumerate(self.titles)
+        ])
+
+    def __iter__(self) -> Iterator[LearningResource]:
+        for start in range(0, len(self), 4096):
+            yield from self.records(np.arange(start, min(start + 4096, len(self))))
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self.row_index
+
+    def get(self, resource_id: str) -> Optional[LearningResource]:
+        """Resource by id, or None"""
+        row = self.row_index.get(resource_id)
+        return self.record(row) if row is not None else None
+
+    def ids(self) -> List[str]:
+        return list(self.resource_ids)
+
+    def rows_for(self, resources: List[LearningResource]) -> np.ndarray:
+        """Catalog rows of the given resources"""
+        return self.row_index.rows_of([resource.id for resource in resources])
+
+    def take(self, rows) -> List[LearningResource]:
+        """Resources at the given catalog rows"""
+        return self.records(rows)
+
+    def take_many(self, row_groups: List[np.ndarray]) -> List[List[LearningResource]]:
+        """Resources at each group of catalog rows, materialized in one pass"""
+        resources = self.records(np.concatenate(row_groups)) if row_groups else []
+        ends = np.cumsum([len(rows) for rows in row_groups]).tolist()
+        return [resources[end - len(rows):end] for rows, end in zip(row_groups, ends)]
+
+    def prerequisites_met(self, rows: np.ndarray, skills) -> np.ndarray:
+        """Whether the given skills cover every transitive prerequisite of each row"""
+        graph = self.prerequisite_graph
+        return graph.ready_mask(rows, graph.known_bits(skills))
+
+    def prerequisite_order(self, rows: np.ndarray) -> np.ndarray:
+        """Positions of rows with prerequisites first, then by NSQF level, then as given"""
+        rows = np.asarray(rows, dtype=np.intp)
+        return self.prerequisite_orders(rows[None, :], np.ones((1, len(rows)), dtype=bool))[0]
+
+    def prerequisite_orders(self, rows: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        prerequisite_order of every row of a profiles x k matrix of rows,
+        padded at the end of each row where valid is False; padding
+        positions come last. Pathways
+        where nothing one resource requires is taught by the pathway are
+        ordered by level in one sort over the block; only the others run
+        the topological sort.
+        """
+        graph = self.prerequisite_graph
+        n_profiles, k = rows.shape
+        owners, columns = self.row_skills(rows[valid])
+        cover = np.zeros((n_profiles, k, graph.words), dtype=np.uint64)
+        cover[valid] = graph.cover_bits(owners, columns, int(valid.sum()))
+        required = np.where(valid[:, :, None], graph.requirements[graph.requirement_index[rows]], 0)
+        dependent = (required & np.bitwise_or.reduce(cover, axis=1)[:, None, :]).any(axis=(1, 2))
+
+        levels = np.where(valid, self.nsqf_level[rows], np.iinfo(np.int16).max)
+        orders = np.argsort(levels, axis=1, kind="stable")
+        for i in np.flatnonzero(dependent).tolist():
+            size = int(valid[i].sum())
+            priority = levels[i, :size].astype(np.int64) * size + np.arange(size)
+            orders[i, :size] = graph.topological_order(rows[i, :size], cover[i, :size], priority)
+        return orders
+
+    @staticmethod
+    def _group(rows: np.ndarray, offsets: np.ndarray, code: Optional[int]) -> np.ndarray:
+        if code is None or not 0 <= code < len(offsets) - 1:
+            return np.empty(0, dtype=np.intp)
+        return rows[offsets[code]:offsets[code + 1]].astype(np.intp)
+
+    def rows_for_skill(self, skill: str) -> np.ndarray:
+        return self._group(self._skill_rows, self._skill_offsets, self.skill_index.get(skill))
+
+    def rows_for_skills(self, skills) -> np.ndarray:
+        """Rows of resources covering any of the given skills"""
+        hits = [self.rows_for_skill(skill) for skill in skills if skill in self.skill_index]
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(hits))
+
+    def rows_for_levels(self, min_level: int, max_level: int) -> np.ndarray:
+        """Rows of resources with min_level <= nsqf_level <= max_level"""
+        low = int(np.clip(min_level, 0, len(self._level_offsets) - 1))
+        high = int(np.clip(max_level + 1, 0, len(self._level_offsets) - 1))
+        if low >= high:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(self._level_rows[self._level_offsets[low]:self._level_offsets[high]]).astype(np.intp)
+
+    def by_skill(self, skill: str) -> List[LearningResource]:
+        return self.take(self.rows_for_skill(skill))
+
+    def by_nsqf_level(self, level: int) -> List[LearningResource]:
+        return self.take(self.rows_for_levels(level, level))
+
+    def by_type(self, resource_type: str) -> List[LearningResource]:
+        return self.take(self._group(self._type_rows, self._type_offsets, self.types.code(resource_type)))
+
+    def by_provider(self, provider: str) -> List[LearningResource]:
+        return self.take(self._group(self._provider_rows, self._provider_offsets, self.providers.code(provider)))
+
+    def rows_in_cost_range(self, min_cost: float = 0.0, max_cost: float = np.inf) -> np.ndarray:
+        """Rows with min_cost <= cost <= max_cost, cheapest first"""
+        return self._range(self.cost, self._cost_order, min_cost, max_cost)
+
+    def rows_in_duration_range(self, min_hours: float = 0.0, max_hours: float = np.inf) -> np.ndarray:
+        """Rows with min_hours <= duration_hours <= max_hours, shortest first"""
+        return self._range(self.duration_hours, self._duration_order, min_hours, max_hours)
+
+    @staticmethod
+    def _range(values: np.ndarray, order: np.ndarray, low: float, high: float) -> np.ndarray:
+        start = np.searchsorted(values, low, side="left", sorter=order)
+        end = np.searchsorted(values, high, side="right", sorter=order)
+        return order[start:end].astype(np.intp)
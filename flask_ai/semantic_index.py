@@ -0,0 +1,134 @@
+"""
+Semantic Index
+TF-IDF matching of free-text queries against resource text with memoized query transforms
+"""
+
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text with underscores split, so "machine_learning" matches "machine learning" """
+    return str(text).lower().replace("_", " ")
+
+
+class SemanticIndex:
+    """
+    TF-IDF index over resource documents.
+
+    The vectorizer is fitted once at build time and only its vocabulary
+    and idf weights are kept, so loading the index and transforming
+    queries need no scikit-learn import. Documents are stored as an
+    L2-normalized term x resource CSR matrix: scoring a query reads only
+    the postings of its terms. Query transforms are memoized in an LRU
+    (not persisted).
+    """
+
+    def __init__(self, documents: List[str], max_features: int = 50000, cache_size: int = 4096):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.n_documents = len(documents)
+        self.cache_size = cache_size
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.token_pattern = r"(?u)\b\w\w+\b"
+        self.term_matrix = sparse.csr_matrix((0, self.n_documents), dtype=np.float32)
+
+        vectorizer = TfidfVectorizer(max_features=max_features, stop_words="english",
+                                     token_pattern=self.token_pattern, preprocessor=normalize_text,
+                                     dtype=np.float32)
+        try:
+            matrix = vectorizer.fit_transform(documents)
+        except ValueError:
+            # No document has any indexable term
+            logger.warning("⚠️ Semantic index is empty: no resource text to index")
+        else:
+            self.vocabulary = {term: int(code) for term, code in vectorizer.vocabulary_.items()}
+            self.idf = vectorizer.idf_.astype(np.float32)
+            self.term_matrix = matrix.T.tocsr()
+            self.term_matrix.sort_indices()
+
+        self._init_cache()
+        logger.info(f"✅ Semantic index built: {self.n_documents} documents, {len(self.vocabulary)} terms")
+
+    def _init_cache(self):
+        self._pattern = re.compile(self.token_pattern)
+        self._transforms: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("_pattern", "_transforms", "_lock"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
+
+    def transform(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """L2-normalized TF-IDF terms of a query as (term codes, weights), memoized"""
+        key = normalize_text(text)
+        with self._lock:
+            cached = self._transforms.get(key)
+            if cached is not None:
+                self._transforms.move_to_end(key)
+                return cached
+
+        counts: Dict[int, int] = {}
+        for token in self._pattern.findall(key):
+            code = self.vocabulary.get(token)
+            if code is not None:
+                counts[code] = counts.get(code, 0) + 1
+        codes = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+        weights = np.array([counts[code] for code in codes.tolist()], dtype=np.float32) * self.idf[codes]
+        norm = np.linalg.norm(weights)
+        transformed = (codes, weights / norm if norm > 0 else weights)
+
+        with self._lock:
+            self._transforms[key] = transformed
+            while len(self._transforms) > self.cache_size:
+                self._transforms.popitem(last=False)
+        return transformed
+
+    def scores(self, texts: List[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of each text to every document (texts x documents),
+        or only to the documents at the given rows
+        """
+        transformed = [self.transform(text) for text in texts]
+        lengths = np.fromiter((len(codes) for codes, _ in transformed), dtype=np.int64, count=len(texts))
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        if not indptr[-1]:
+            return np.zeros((len(texts), self.n_documents if rows is None else len(rows)))
+        queries = sparse.csr_matrix(
+            (np.concatenate([weights for _, weights in transformed]),
+             np.concatenate([codes for codes, _ in transformed]), indptr),
+            shape=(len(texts), len(self.vocabulary))
+        )
+        if rows is None:
+            return (queries @ self.term_matrix).toarray()
+
+        # Look the rows up in each query term's sorted postings, so the cost
+        # follows the number of rows rather than the length of the postings
+        rows = np.asarray(rows)
+        scores = np.zeros((len(texts), len(rows)))
+        for i, (codes, weights) in enumerate(transformed):
+            for code, weight in zip(codes.tolist(), weights.tolist()):
+                start, end = self.term_matrix.indptr[code], self.term_matrix.indptr[code + 1]
+                postings = self.term_matrix.indices[start:end]
+                positions = np.minimum(np.searchsorted(postings, rows), max(end - start - 1, 0))
+                found = postings[positions] == rows if end > start else np.zeros(len(rows), dtype=bool)
+                scores[i, found] += weight * self.term_matrix.data[start:end][positions[found]]
+        return scores
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._transforms), "max_entries": self.cache_size}
@@ -0,0 +1,222 @@
+"""
+Skill Taxonomy Index
+Hierarchical skill taxonomy with precomputed ancestor/descendant sets and similarities
+"""
+
+import os
+import re
+import json
+import threading
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Any, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.environ.get(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(__file__), "skill_taxonomy.json")
+)
+
+# Skill names that are ordinary words in prose ("I want to go into..."); free text names them by alias only
+AMBIGUOUS_SKILL_WORDS = frozenset({"go", "written", "verbal", "presentation", "assessment", "education"})
+
+# Unambiguous free-text names of taxonomy skills
+TEXT_ALIASES = {
+    "golang": "go",
+    "ml": "machine_learning",
+    "js": "javascript",
+    "nodejs": "node_js",
+    "k8s": "kubernetes",
+    "amazon_web_services": "aws",
+    "written_communication": "written",
+    "verbal_communication": "verbal",
+    "public_speaking": "presentation"
+}
+
+
+class SkillTaxonomy:
+    """
+    Skill hierarchy indexed at load time.
+
+    The data file is a nested JSON object: each key is a skill, its value
+    either an object of child skills or a list of leaf skills. A skill may
+    appear under several parents. Top-level keys have depth 1.
+
+    Every (skill, ancestor) pair is precomputed into sparse matrices, so
+    the ancestors or descendants of a skill are a single row slice. Related
+    skills are weighted by depth (Wu-Palmer): a skill and its ancestor at
+    depths d and a score 2a / (d + a), so a specific parent is closer than
+    a broad root.
+    """
+
+    def __init__(self, tree: Dict[str, Any]):
+        self.index: Dict[str, int] = {}
+        parents: List[set] = []
+
+        def node(name: str) -> int:
+            if name not in self.index:
+                self.index[name] = len(self.index)
+                parents.append(set())
+            return self.index[name]
+
+        def walk(subtree: Any, parent: int):
+            children = subtree.items() if isinstance(subtree, dict) else ((name, None) for name in subtree)
+            for name, grandchildren in children:
+                child = node(name)
+                if parent >= 0:
+                    parents[child].add(parent)
+                if grandchildren:
+                    walk(grandchildren, child)
+
+        walk(tree, -1)
+        self.names: List[str] = list(self.index)
+        n = len(self.names)
+
+        # Ancestors and depth per node, memoized depth-first; back edges of cycles are ignored
+        ancestors: List[Dict[int, int]] = [None] * n
+        depth = np.zeros(n, dtype=np.int32)
+        visiting = set()
+
+        def resolve(code: int):
+            stack = [(code, iter(sorted(parents[code])))]
+            visiting.add(code)
+            while stack:
+                current, pending = stack[-1]
+                for parent in pending:
+                    if ancestors[parent] is None and parent not in visiting:
+                        visiting.add(parent)
+                        stack.append((parent, iter(sorted(parents[parent]))))
+                        break
+                else:
+                    stack.pop()
+                    visiting.discard(current)
+                    reached: Dict[int, int] = {}
+                    for parent in parents[current]:
+                        if ancestors[parent] is None:
+                            continue
+                        reached[parent] = 1
+                        for ancestor, distance in ancestors[parent].items():
+                            if distance + 1 < reached.get(ancestor, n + 1):
+                                reached[ancestor] = distance + 1
+                    ancestors[current] = reached
+                    depth[current] = 1 + max((depth[parent] for parent in parents[current]
+                                              if ancestors[parent] is not None), default=0)
+
+        for code in range(n):
+            if ancestors[code] is None:
+                resolve(code)
+        self.depth = depth
+
+        rows = np.fromiter((code for code in range(n) for _ in ancestors[code]), dtype=np.int32)
+        cols = np.fromiter((ancestor for code in range(n) for ancestor in ancestors[code]), dtype=np.int32)
+        distances = np.fromiter((distance for code in range(n) for distance in ancestors[code].values()),
+                                dtype=np.float32)
+
+        # ancestors[i, j] = edge distance from skill i up to its ancestor j; descendants is the transpose
+        self.ancestors = sparse.csr_matrix((distances, (rows, cols)), shape=(n, n))
+        self.ancestors.sort_indices()
+        self.descendants = self.ancestors.T.tocsr()
+        self.descendants.sort_indices()
+
+        weights = (2.0 * depth[cols] / (depth[rows] + depth[cols])).astype(np.float32)
+        related = sparse.csr_matrix((weights, (rows, cols)), shape=(n, n))
+        self.similarity = (related + related.T + sparse.identity(n, dtype=np.float32, format="csr")).tocsr()
+        self.similarity.sort_indices()
+
+        # Names free text may match: never the top-level categories, nor ambiguous or one-letter words
+        self.text_names = {
+            name for name in self.names
+            if depth[self.index[name]] > 1 and len(name) > 1 and name not in AMBIGUOUS_SKILL_WORDS
+        }
+        self.text_names.update(alias for alias, skill in TEXT_ALIASES.items() if skill in self.index)
+        logger.info(f"✅ Skill taxonomy indexed: {n} skills, {len(rows)} ancestor links")
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_TAXONOMY_PATH) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, skill: str) -> bool:
+        return skill in self.index
+
+    def _row(self, matrix: sparse.csr_matrix, skill: str) -> Tuple[np.ndarray, np.ndarray]:
+        code = self.index.get(skill)
+        if code is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        start, end = matrix.indptr[code], matrix.indptr[code + 1]
+        return matrix.indices[start:end], matrix.data[start:end]
+
+    def ancestors_of(self, skill: str) -> List[str]:
+        """Broader skills containing the skill, nearest first"""
+        codes, distances = self._row(self.ancestors, skill)
+        return [self.names[code] for code in codes[np.argsort(distances, kind="stable")]]
+
+    def descendants_of(self, skill: str) -> List[str]:
+        """Narrower skills under the skill, nearest first"""
+        codes, distances = self._row(self.descendants, skill)
+        return [self.names[code] for code in codes[np.argsort(distances, kind="stable")]]
+
+    def children_of(self, skill: str) -> List[str]:
+        codes, distances = self._row(self.descendants, skill)
+        return [self.names[code] for code in codes[distances == 1]]
+
+    def similarity_of(self, skill: str, other: str) -> float:
+        """Depth-weighted similarity of two skills; 0 unless one contains the other"""
+        if skill == other:
+            return 1.0
+        codes, weights = self._row(self.similarity, skill)
+        code = self.index.get(other)
+        position = np.searchsorted(codes, code) if code is not None else len(codes)
+        return float(weights[position]) if position < len(codes) and codes[position] == code else 0.0
+
+    def expand(self, skills: Iterable[str]) -> Dict[str, float]:
+        """
+        The skills plus every skill above or below them in the hierarchy,
+        each weighted by its best similarity to one of the given skills.
+        Skills not in the taxonomy are kept with weight 1.
+        """
+        expanded: Dict[str, float] = {}
+        for skill in skills:
+            expanded[skill] = 1.0
+            codes, weights = self._row(self.similarity, skill)
+            for code, weight in zip(codes.tolist(), weights.tolist()):
+                name = self.names[code]
+                if weight > expanded.get(name, 0.0):
+                    expanded[name] = weight
+        return expanded
+
+    def match_text(self, text: str, max_words: int = 3) -> List[str]:
+        """
+        Taxonomy skills named in free text, matching word n-grams by exact
+        lookup against ``text_names``: skill names below the top-level
+        categories, except words that are ambiguous in prose (such as "go"),
+        plus the ``TEXT_ALIASES`` that name skills unambiguously.
+        """
+        words = re.findall(r"[a-z0-9+#]+", text.lower())
+        matches = []
+        for size in range(max_words, 0, -1):
+            for start in range(len(words) - size + 1):
+                name = "_".join(words[start:start + size])
+                if name in self.text_names:
+                    skill = TEXT_ALIASES.get(name, name)
+                    if skill not in matches:
+                        matches.append(skill)
+        return matches
+
+
+_taxonomies: Dict[str, SkillTaxonomy] = {}
+_taxonomies_lock = threading.Lock()
+
+
+def load_skill_taxonomy(path: str = DEFAULT_TAXONOMY_PATH) -> SkillTaxonomy:
+    """Taxonomy index for a data file, built once per process and shared"""
+    with _taxonomies_lock:
+        taxonomy = _taxonomies.get(path)
+        if taxonomy is None:
+            taxonomy = _taxonomies[path] = SkillTaxonomy.from_file(path)
+        return taxonomy
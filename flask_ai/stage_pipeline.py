@@ -0,0 +1,184 @@
+"""
+Stage Pipeline
+Runs a small DAG of recommendation stages concurrently with per-stage deadlines
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline stage. fn receives the outputs of its dependencies as
+    keyword arguments. If the stage raises or misses its deadline
+    (timeout_seconds after it was started), its output is fallback.
+
+    Inline stages run on the calling thread once their dependencies have
+    settled, for cheap stages where a thread handoff would cost more than
+    the work. They cannot be abandoned, so they have no deadline.
+    """
+    name: str
+    fn: Callable[..., Any]
+    depends_on: Tuple[str, ...] = ()
+    timeout_seconds: float = 1.0
+    fallback: Any = None
+    inline: bool = False
+
+
+@dataclass
+class PipelineRun:
+    """Outputs of one pipeline run, with the stages that fell back and per-stage timings"""
+    outputs: Dict[str, Any]
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    stage_ms: Dict[str, float] = field(default_factory=dict)
+
+
+class StagePipeline:
+    """
+    Executes stages on a shared thread pool as soon as their dependencies
+    have produced output, so independent stages overlap and the total
+    latency approaches the longest dependency chain rather than the sum.
+    NumPy and scipy release the GIL in their kernels, so the overlap is
+    real for the numeric stages.
+
+    A stage that misses its deadline is abandoned (its thread finishes in
+    the background and its result is discarded) and its dependents run on
+    its fallback output. The deadline counts from when the stage's
+    function starts on a worker, never from queueing: a stage is only
+    handed to the pool when a worker is free (abandoned stages keep
+    theirs until they finish), and otherwise runs inline on the calling
+    thread, so concurrent runs degrade to sequential ones instead of
+    timing out in the queue.
+    """
+
+    def __init__(self, max_workers: int = 4, thread_name_prefix: str = "pipeline-stage"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._free_workers = threading.BoundedSemaphore(max_workers)
+
+        self._stats_lock = threading.Lock()
+        self.runs = 0
+        self.timeouts: Dict[str, int] = {}
+        self.inline_runs: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created on first use so a forked worker never inherits a pool without threads
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=self.thread_name_prefix)
+        return self._executor
+
+    def run(self, stages: List[Stage]) -> PipelineRun:
+        """Run the stages and return every stage's output (or fallback)"""
+        by_name = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [name for name in stage.depends_on if name not in by_name]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+
+        result = PipelineRun(outputs={})
+        pending = list(stages)
+        running: Dict[Future, Tuple[Stage, List[Optional[float]]]] = {}
+        inlined: List[str] = []
+
+        while pending or running:
+            # Start every stage whose dependencies have settled, pooled stages first
+            ready = [stage for stage in pending if all(name in result.outputs for name in stage.depends_on)]
+            for stage in sorted(ready, key=lambda stage: stage.inline):
+                pending.remove(stage)
+                inputs = {name: result.outputs[name] for name in stage.depends_on}
+                if stage.inline:
+                    self._run_inline(stage, inputs, result)
+                elif self._free_workers.acquire(blocking=False):
+                    started: List[Optional[float]] = [None]
+                    running[self.executor.submit(self._run_pooled, stage, inputs, started)] = (stage, started)
+                else:
+                    inlined.append(stage.name)
+                    self._run_inline(stage, inputs, result)
+
+            if not running:
+                if pending and not ready:
+                    raise ValueError(f"Stages {[stage.name for stage in pending]} have a dependency cycle")
+                continue
+
+            # A stage that has not started yet has no deadline; recheck once it has
+            now = time.perf_counter()
+            next_deadline = min((started[0] or now) + stage.timeout_seconds for stage, started in running.values())
+            done, _ = wait(list(running), timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+            now = time.perf_counter()
+            for future, (stage, started) in list(running.items()):
+                if future in done:
+                    del running[future]
+                    result.stage_ms[stage.name] = (now - (started[0] or now)) * 1000
+                    try:
+                        result.outputs[stage.name] = future.result()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Stage {stage.name} failed, using fallback: {e}")
+                        result.failed.append(stage.name)
+                        result.outputs[stage.name] = stage.fallback
+                elif started[0] is not None and now >= started[0] + stage.timeout_seconds:
+                    del running[future]
+                    logger.warning(f"⚠️ Stage {stage.name} missed its {stage.timeout_seconds * 1000:.0f}ms deadline, "
+                                   f"using fallback")
+                    result.timed_out.append(stage.name)
+                    result.stage_ms[stage.name] = (now - started[0]) * 1000
+                    result.outputs[stage.name] = stage.fallback
+
+        with self._stats_lock:
+            self.runs += 1
+            for name in inlined:
+                self.inline_runs[name] = self.inline_runs.get(name, 0) + 1
+            for name in result.timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+            for name in result.failed:
+                self.failures[name] = self.failures.get(name, 0) + 1
+        return result
+
+    def _run_pooled(self, stage: Stage, inputs: Dict[str, Any], started: List[Optional[float]]) -> Any:
+        """Run a stage on a worker reserved for it, recording when it started"""
+        started[0] = time.perf_counter()
+        try:
+            return stage.fn(**inputs)
+        finally:
+            self._free_workers.release()
+
+    @staticmethod
+    def _run_inline(stage: Stage, inputs: Dict[str, Any], result: PipelineRun):
+        started = time.perf_counter()
+        try:
+            output = stage.fn(**inputs)
+        except Exception as e:
+            logger.warning(f"⚠️ Stage {stage.name} failed, using fallback: {e}")
+            result.failed.append(stage.name)
+            output = stage.fallback
+        result.stage_ms[stage.name] = (time.perf_counter() - started) * 1000
+        result.outputs[stage.name] = output
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "runs": self.runs,
+                "max_workers": self.max_workers,
+                "timeouts": dict(self.timeouts),
+                "inline_runs": dict(self.inline_runs),
+                "failures": dict(self.failures)
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,42 @@
+"""
+Shared test fixtures
+An engine over throwaway state and behaviour stores, with no platform database
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_recommendation_engine import AdvancedRecommendationEngine
+from behavior_store import BehaviorStore
+from engine_state import EngineStateStore
+from enrollment_source import PlatformEnrollmentSource
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = AdvancedRecommendationEngine(
+        state_store=EngineStateStore(str(tmp_path / "state")),
+        behavior_store=BehaviorStore(str(tmp_path / "behavior.sqlite3")),
+        enrollment_source=PlatformEnrollmentSource(""),
+        behavior_sync_interval_seconds=0.05
+    )
+    engine.preload_state()
+    yield engine
+    engine.stop_behavior_sync()
+    engine.materializer.stop()
+    engine.model_trainer.stop()
+    engine.factor_trainer.stop()
+
+
+@pytest.fixture
+def learner_profile():
+    return {
+        "user_id": "test_learner",
+        "career_aspirations": "data scientist",
+        "prior_skills": ["python", "sql"],
+        "max_hours": 300
+    }
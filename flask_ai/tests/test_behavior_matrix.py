@@ -0,0 +1,72 @@
+"""Overlaid behaviour matrices and chunked histories against full rebuilds"""
+
+import random
+
+import numpy as np
+
+from advanced_recommendation_engine import UserBehavior
+from behavior_history import BehaviorHistory
+from behavior_matrix import UserItemMatrix
+
+
+def _behavior(rng: random.Random, user_id: str, resource_ids):
+    completed = rng.sample(resource_ids, rng.randint(0, min(6, len(resource_ids))))
+    return UserBehavior(
+        user_id=user_id,
+        completed_resources=completed,
+        resource_ratings={resource_id: float(rng.randint(1, 5)) for resource_id in completed},
+        time_spent={resource_id: rng.randint(10, 300) for resource_id in completed},
+        skill_assessments={},
+        career_progress=[],
+        learning_patterns={},
+        preferences={}
+    )
+
+
+def test_overlay_updates_match_a_rebuild(engine):
+    catalog = engine.resource_catalog
+    resource_ids = catalog.ids()
+    rng = random.Random(7)
+    behaviors = {f"learner_{i}": _behavior(rng, f"learner_{i}", resource_ids) for i in range(60)}
+    matrix = UserItemMatrix(catalog, behaviors.values(), max_overlay_rows=16)
+    first = matrix
+
+    for step in range(40):
+        changed = [_behavior(rng, rng.choice(list(behaviors)) if rng.random() < 0.7 else f"new_{step}_{i}",
+                             resource_ids) for i in range(rng.randint(1, 5))]
+        for behavior in changed:
+            behaviors[behavior.user_id] = behavior
+        matrix = matrix.updated(changed)
+        rebuilt = UserItemMatrix(catalog, behaviors.values())
+
+        assert matrix.user_ids[:len(matrix)] == rebuilt.user_ids
+        for ours, theirs in zip(matrix.user_matrices() + matrix.implicit_signals(),
+                                rebuilt.user_matrices() + rebuilt.implicit_signals()):
+            assert (ours != theirs).nnz == 0
+        skill_sets = [rng.sample(sorted(catalog.skill_index), min(3, len(catalog.skill_index))) for _ in range(4)]
+        neighbours = matrix.similar_users_batch(skill_sets, top_k=5, threshold=0.0)
+        expected = rebuilt.similar_users_batch(skill_sets, top_k=5, threshold=0.0)
+        for ours, theirs in zip(neighbours, expected):
+            np.testing.assert_array_equal(ours, theirs)
+        np.testing.assert_allclose(matrix.aggregate_ratings_batch(neighbours).toarray(),
+                                   rebuilt.aggregate_ratings_batch(neighbours).toarray())
+
+    # The first version still reads as it was published
+    assert len(first) == 60
+
+
+def test_history_versions_share_unchanged_chunks():
+    history = BehaviorHistory({f"learner_{i}": i for i in range(10)}, chunk_size=4)
+    updated = history.updated({"learner_1": "changed", "learner_10": "new"})
+
+    assert dict(history) == {f"learner_{i}": i for i in range(10)}
+    assert "learner_10" not in history and len(history) == 10
+    assert updated["learner_1"] == "changed" and updated["learner_10"] == "new"
+    assert list(updated) == [f"learner_{i}" for i in range(11)]
+    assert updated._chunks[1] is history._chunks[1]
+    assert updated._chunks[0] is not history._chunks[0]
+
+    # Updating a version that is no longer the latest copies instead of sharing
+    branch = history.updated({"learner_0": "branch"})
+    assert "learner_10" not in branch and branch["learner_0"] == "branch"
+    assert updated["learner_0"] == 0
@@ -0,0 +1,50 @@
+"""Behaviour store compaction, and engines catching up with another worker's compaction"""
+
+from advanced_recommendation_engine import UserBehavior
+from behavior_store import BehaviorStore, FeedbackEvent
+
+
+def _record(user_id: str) -> UserBehavior:
+    return UserBehavior(user_id=user_id, completed_resources=[], resource_ratings={}, time_spent={},
+                        skill_assessments={}, career_progress=[], learning_patterns={}, preferences={})
+
+
+def test_compaction_keeps_loaded_behaviour_and_reports_the_gap(tmp_path):
+    store = BehaviorStore(str(tmp_path / "behavior.sqlite3"))
+    store.append([
+        FeedbackEvent("learner", "first", rating=4.0, completed=True, time_spent=30),
+        FeedbackEvent("learner", "second", completed=True, learning_patterns={"pace": "fast"}),
+        FeedbackEvent("learner", "first", rating=5.0)
+    ])
+    before, seq = store.load(_record)
+
+    assert store.compact() == 3
+    assert store.events_since(0) is None
+    assert store.events_since(seq) == []
+
+    after, compacted_seq = store.load(_record)
+    assert compacted_seq == seq == store.last_seq()
+    for field in ("completed_resources", "resource_ratings", "time_spent", "learning_patterns"):
+        assert getattr(after["learner"], field) == getattr(before["learner"], field)
+    assert after["learner"].resource_ratings == {"first": 5.0}
+    assert after["learner"].completed_resources == ["first", "second"]
+
+
+def test_compaction_by_another_worker_reloads_behaviour(engine):
+    resource_id = engine.resource_catalog.ids()[0]
+    state = engine.serving
+    engine.recommendation_cache.put("cached_before_reload", object())
+
+    other_worker = BehaviorStore(engine.behavior_store.path)
+    seq = other_worker.append([FeedbackEvent("other_worker_learner", resource_id, rating=5.0, completed=True)])
+    other_worker.compact()
+    assert engine.behavior_store.events_since(state.behavior_seq) is None
+
+    engine._sync_behavior(force=True)
+
+    reloaded = engine.serving
+    assert reloaded.version > state.version
+    assert reloaded.behavior_seq >= seq
+    assert resource_id in reloaded.user_behavior_history["other_worker_learner"].completed_resources
+    assert "other_worker_learner" in reloaded.behavior_matrix.user_index
+    assert engine.recommendation_cache.get("cached_before_reload") is None
@@ -0,0 +1,103 @@
+"""Two-stage retrieval recall against exact ranking on a structured catalog"""
+
+import numpy as np
+
+from behavior_store import FeedbackEvent
+from recommendation_context import RecommendationContext
+from resource_catalog import LearningResource, top_k_indices
+
+# Mean recall@10 of the two-stage top 10 against the exact top 10 under the
+# same ranking, over every query, and the worst single query
+MIN_MEAN_RECALL = 0.95
+MIN_QUERY_RECALL = 0.7
+
+DOMAINS = {
+    "data": ["python", "pandas", "numpy", "data_analysis", "statistics", "data_visualization", "sql"],
+    "ml": ["machine_learning", "basic_ml", "deep_learning", "python", "statistics"],
+    "cloud": ["aws", "azure", "gcp", "docker", "kubernetes", "linux_basics", "basic_networking"],
+    "web": ["html", "css", "javascript", "react", "node_js", "database", "ui_ux"],
+    "security": ["ethical_hacking", "network_security", "cryptography", "compliance"],
+    "marketing": ["seo", "social_media", "content_marketing", "ppc"],
+    "mobile": ["android", "ios", "flutter", "react_native"],
+    "management": ["agile", "scrum", "risk_management", "stakeholder_management", "communication"]
+}
+ASPIRATIONS = ["data scientist", "machine learning engineer", "cloud engineer", "web developer",
+               "software developer", "digital marketing specialist", "python developer",
+               "kubernetes and docker devops", "react frontend", "cybersecurity analyst"]
+
+
+def _catalog(n: int, rng) -> list:
+    # Domains follow a Zipf popularity; each resource teaches 1-3 skills of its domain
+    domains = list(DOMAINS)
+    popularity = 1 / np.arange(1, len(domains) + 1)
+    popularity /= popularity.sum()
+    resources = []
+    for i in range(n):
+        domain = domains[rng.choice(len(domains), p=popularity)]
+        skills = [str(skill) for skill in rng.choice(DOMAINS[domain], size=rng.integers(1, 4), replace=False)]
+        if rng.random() < 0.2:
+            skills.append(str(rng.choice(["communication", "problem_solving", "teamwork"])))
+        rating_count = int(rng.integers(0, 200))
+        resources.append(LearningResource(
+            id=f"{domain}_{i}", title=f"{domain} course on {' '.join(skills)}", type="course", provider="test",
+            nsqf_level=int(rng.integers(2, 9)), difficulty=str(rng.choice(["beginner", "intermediate", "advanced"])),
+            duration_hours=int(rng.integers(5, 120)), cost=float(rng.integers(0, 5000)), skills_covered=skills,
+            prerequisites=[], success_rate=float(rng.beta(5, 2)), rating_count=rating_count,
+            rating_sum=rating_count * float(rng.uniform(2.5, 5.0)), employment_impact=float(rng.beta(2, 3)),
+            salary_impact=float(rng.beta(2, 3)), tags=[domain]
+        ))
+    return resources
+
+
+def _learner_feedback(resources: list, n_learners: int, rng) -> list:
+    # Learners complete resources of one domain, so their skill profiles cluster by domain
+    by_domain = {}
+    for resource in resources:
+        by_domain.setdefault(resource.tags[0], []).append(resource.id)
+    domains = list(DOMAINS)
+    return [
+        FeedbackEvent(f"learner_{i}", str(resource_id), rating=float(rng.integers(3, 6)), completed=True)
+        for i in range(n_learners)
+        for resource_id in rng.choice(by_domain[domains[i % len(domains)]], size=6, replace=False)
+    ]
+
+
+def _profiles(n: int, rng) -> list:
+    domains = list(DOMAINS)
+    profiles = []
+    for i in range(n):
+        skills = DOMAINS[domains[rng.integers(len(domains))]]
+        profiles.append({
+            "user_id": f"query_{i}",
+            "career_aspirations": ASPIRATIONS[rng.integers(len(ASPIRATIONS))],
+            "prior_skills": [str(skill) for skill in rng.choice(skills, size=rng.integers(0, 3), replace=False)],
+            "target_nsqf_level": int(rng.integers(3, 8)),
+            "learning_pace": str(rng.choice(["slow", "medium", "fast"]))
+        })
+    return profiles
+
+
+def test_two_stage_recall_at_the_default_threshold(engine):
+    # Background retrains would swap the models the predictions are memoized on mid-test
+    engine.model_trainer.stop()
+    engine.factor_trainer.stop()
+    rng = np.random.default_rng(17)
+    resources = _catalog(engine.two_stage_min_catalog, rng)
+    assert engine.wait_for_behavior(engine.update_user_feedback_batch(_learner_feedback(resources, 400, rng)),
+                                    timeout=60)
+    engine.update_resource_catalog(resources)
+    assert len(engine.candidate_retriever.centroids) > 1
+
+    with engine._pinned_state():
+        contexts = [RecommendationContext(engine, profile) for profile in _profiles(100, rng)]
+        two_stage = engine._relevance(contexts)
+        catalog = engine.resource_catalog
+        exact = engine._content_scores(contexts) + engine._predicted_quality(np.arange(len(catalog)))[None, :]
+
+    recalls = []
+    for candidates, scores in zip(two_stage, exact):
+        assert len(candidates) < len(catalog)
+        expected = set(top_k_indices(scores, 10).tolist())
+        recalls.append(len(set(candidates.top(10).tolist()) & expected) / 10)
+    assert np.mean(recalls) >= MIN_MEAN_RECALL
+    assert min(recalls) >= MIN_QUERY_RECALL
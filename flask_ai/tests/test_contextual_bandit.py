@@ -0,0 +1,38 @@
+"""LinUCB incremental updates against the closed-form ridge solution"""
+
+import numpy as np
+
+from behavior_store import FeedbackEvent
+from contextual_bandit import LinUCBBandit, feedback_reward
+
+
+def test_sherman_morrison_updates_match_direct_solve():
+    rng = np.random.default_rng(0)
+    ridge, dimension = 2.0, 6
+    bandit = LinUCBBandit(["updated", "untouched"], dimension=dimension, ridge=ridge)
+    contexts, rewards = rng.random((50, dimension)), rng.random(50)
+    for x, reward in zip(contexts, rewards):
+        assert bandit.update("updated", x, reward)
+
+    design = ridge * np.eye(dimension) + contexts.T @ contexts
+    arm = bandit.arms.index["updated"]
+    np.testing.assert_allclose(bandit.arms.a_inv[arm], np.linalg.inv(design), rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(bandit.arms.theta[arm], np.linalg.solve(design, contexts.T @ rewards),
+                               rtol=1e-8, atol=1e-12)
+
+    untouched = bandit.arms.index["untouched"]
+    np.testing.assert_allclose(bandit.arms.a_inv[untouched], np.eye(dimension) / ridge)
+    assert not bandit.arms.theta[untouched].any()
+    assert not bandit.update("unknown", contexts[0], 1.0)
+
+
+def test_events_are_folded_in_once_by_sequence_number():
+    bandit = LinUCBBandit(["resource"], ridge=1.0)
+    events = [FeedbackEvent("learner", "resource", rating=5.0, completed=True, seq=seq) for seq in (1, 2)]
+    assert bandit.update_events(events) == 2
+    assert bandit.update_events(events) == 0
+
+    x = bandit.default_context
+    reward = feedback_reward(5.0, True)
+    design = np.eye(len(x)) + 2 * np.outer(x, x)
+    np.testing.assert_allclose(bandit.arms.theta[0], np.linalg.solve(design, 2 * reward * x))
@@ -0,0 +1,43 @@
+"""Flattened forests against scikit-learn's own predictions"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from flat_forest import FlatForest, flatten_forest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    features = rng.random((500, 8))
+    # Integer-valued columns, like NSQF levels and skill counts, put samples exactly on split thresholds
+    features[:, 0] = rng.integers(1, 9, 500)
+    features[:, 3] = rng.integers(0, 6, 500)
+    target = features @ rng.random(8) + rng.normal(0, 0.1, 500)
+    return RandomForestRegressor(n_estimators=25, max_depth=12, random_state=0).fit(features, target)
+
+
+@pytest.mark.parametrize("batch_size", [1, 10, 100, 1000])
+def test_flat_predictions_match_sklearn(forest, batch_size):
+    rng = np.random.default_rng(batch_size)
+    batch = rng.random((batch_size, 8))
+    batch[:, 0] = rng.integers(1, 9, batch_size)
+    batch[:, 3] = rng.integers(0, 6, batch_size)
+
+    flat = FlatForest.from_sklearn(forest)
+    assert np.max(np.abs(flat.predict(batch) - forest.predict(batch))) <= 1e-9
+
+
+def test_samples_on_split_thresholds_take_the_same_branch(forest):
+    flat = FlatForest.from_sklearn(forest)
+    splits = forest.estimators_[0].tree_.threshold[forest.estimators_[0].tree_.children_left != -1]
+    batch = np.tile(np.random.default_rng(1).random(8), (len(splits), 1))
+    batch[:, 1] = splits
+    assert np.max(np.abs(flat.predict(batch) - forest.predict(batch))) <= 1e-9
+
+
+def test_unfitted_and_multi_output_forests_are_not_flattened():
+    assert flatten_forest(RandomForestRegressor()) is None
+    with pytest.raises(ValueError):
+        FlatForest.from_sklearn(RandomForestRegressor(n_estimators=2).fit(np.eye(3), np.eye(3)))
@@ -0,0 +1,109 @@
+"""Pareto pathway search: feasibility, non-domination and cap repair; MMR alternative pathways"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from pathway_optimizer import MAXIMISED, ParetoPathwayOptimizer, mmr_pathways_batch, pareto_mask
+
+
+def _candidates(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(5, 200, n).astype(float), rng.integers(0, 5000, n).astype(float),
+            rng.random(n), rng.random(n))
+
+
+def _objectives(pathways) -> np.ndarray:
+    totals = np.array([pathway.objectives() for pathway in pathways])
+    return np.where(MAXIMISED, -totals, totals)
+
+
+@pytest.mark.parametrize("n", [10, 300], ids=["exhaustive", "evolutionary"])
+def test_front_is_feasible_and_non_dominated(n):
+    hours, cost, employment, salary = _candidates(n, seed=n)
+    max_items, max_cost, max_hours = 4, 6000.0, 300.0
+    front = ParetoPathwayOptimizer(time_budget_ms=50.0, seed=0).solve(
+        hours, cost, employment, salary, max_items, max_cost=max_cost, max_hours=max_hours
+    )
+
+    assert front
+    for pathway in front:
+        assert 1 <= len(pathway.rows) <= max_items
+        assert pathway.total_hours == pytest.approx(hours[pathway.rows].sum())
+        assert pathway.total_cost == pytest.approx(cost[pathway.rows].sum())
+        assert pathway.total_hours <= max_hours and pathway.total_cost <= max_cost
+
+    objectives = _objectives(front)
+    for i, j in itertools.permutations(range(len(front)), 2):
+        assert not (np.all(objectives[i] <= objectives[j]) and np.any(objectives[i] < objectives[j]))
+
+
+def test_exhaustive_front_matches_brute_force():
+    hours, cost, employment, salary = _candidates(9, seed=3)
+    max_items, max_cost, max_hours = 3, 5000.0, 250.0
+    front = ParetoPathwayOptimizer().solve(hours, cost, employment, salary, max_items,
+                                           max_cost=max_cost, max_hours=max_hours)
+
+    attributes = np.column_stack([hours, cost, employment, salary])
+    subsets = [rows for size in range(1, max_items + 1) for rows in itertools.combinations(range(9), size)
+               if hours[list(rows)].sum() <= max_hours and cost[list(rows)].sum() <= max_cost]
+    totals = np.array([attributes[list(rows)].sum(axis=0) for rows in subsets])
+    expected = {rows for rows, efficient in zip(subsets, pareto_mask(np.where(MAXIMISED, -totals, totals)))
+                if efficient}
+    assert {tuple(pathway.rows.tolist()) for pathway in front} == expected
+
+
+def test_repair_skips_items_over_a_cap_and_keeps_later_ones_that_fit():
+    # hours, cost, employment, salary; values order the rows 0, 1, 2, 3
+    attributes = np.array([[10.0, 100.0, 0, 0], [100.0, 100.0, 0, 0], [5.0, 100.0, 0, 0], [5.0, 900.0, 0, 0]])
+    value = np.array([4.0, 3.0, 2.0, 1.0])
+    population = np.ones((1, 4), dtype=bool)
+
+    repaired = ParetoPathwayOptimizer._repair(population, attributes, value, max_items=3,
+                                              max_cost=1000.0, max_hours=20.0)
+    # Row 1 is over the time cap, row 3 then over the budget: rows 0 and 2 still fit
+    assert np.flatnonzero(repaired[0]).tolist() == [0, 2]
+
+    repaired = ParetoPathwayOptimizer._repair(np.ones((1, 4), dtype=bool), attributes, value, max_items=1,
+                                              max_cost=1000.0, max_hours=1000.0)
+    assert np.flatnonzero(repaired[0]).tolist() == [0]
+
+
+def _mmr_reference(relevance, bitsets, available, num_pathways, length, diversity, seeds):
+    # One profile, one candidate at a time, on Python sets
+    skills = [set(np.flatnonzero(np.unpackbits(row)).tolist()) for row in bitsets]
+    candidates = np.flatnonzero(available).tolist()
+    low, high = relevance[candidates].min(), relevance[candidates].max()
+    normalised = (relevance - low) / (high - low) if high > low else np.ones_like(relevance)
+    coverages = [set(np.flatnonzero(np.unpackbits(seed)).tolist()) for seed in seeds]
+
+    def similarity(i):
+        return max((len(skills[i] & covered) / max(len(skills[i] | covered), 1) for covered in coverages), default=0.0)
+
+    pathways = []
+    for _ in range(num_pathways):
+        scores = {i: (1 - diversity) * normalised[i] - diversity * similarity(i) for i in candidates}
+        picked = sorted(candidates, key=lambda i: -scores[i])[:length]
+        pathways.append(sorted(picked, key=lambda i: -normalised[i]))
+        candidates = [i for i in candidates if i not in picked]
+        coverages.append(set().union(*(skills[i] for i in picked)))
+    return pathways
+
+
+def test_mmr_block_matches_one_profile_at_a_time():
+    rng = np.random.default_rng(11)
+    n_profiles, pool, words = 6, 25, 3
+    relevance = rng.random((n_profiles, pool))
+    bitsets = np.packbits(rng.random((n_profiles, pool, words * 8)) < 0.2, axis=2)
+    available = rng.random((n_profiles, pool)) < 0.8
+    available[-1, 3:] = False  # fewer candidates than the pathways need
+    lengths = rng.integers(1, 5, n_profiles)
+    diversity = np.array([0.0, 0.3, 0.5, 0.7, 1.0, 0.5])
+    seeds = np.packbits(rng.random((n_profiles, 2, words * 8)) < 0.3, axis=2)
+
+    chosen = mmr_pathways_batch(relevance, bitsets, available, 3, lengths, diversity, seeds)
+    assert chosen.shape == (n_profiles, 3, lengths.max())
+    for i in range(n_profiles):
+        expected = _mmr_reference(relevance[i], bitsets[i], available[i], 3, lengths[i], diversity[i], seeds[i])
+        assert [pathway[pathway >= 0].tolist() for pathway in chosen[i]] == expected
@@ -0,0 +1,79 @@
+"""Prerequisite closure, readiness checks and prerequisite-first ordering"""
+
+import numpy as np
+
+from advanced_recommendation_engine import RecommendationAlgorithm
+from resource_catalog import LearningResource, ResourceCatalog
+
+
+def _resource(resource_id: str, covers, requires, nsqf_level: int = 5) -> LearningResource:
+    return LearningResource(
+        id=resource_id, title=resource_id, type="course", provider="test", nsqf_level=nsqf_level,
+        difficulty="intermediate", duration_hours=40, cost=1000.0, skills_covered=list(covers),
+        prerequisites=list(requires), success_rate=0.8, rating_count=0, rating_sum=0.0,
+        employment_impact=0.5, salary_impact=0.5, tags=[]
+    )
+
+
+def _chain():
+    # a -> b -> c: c needs b, which needs a. NSQF levels run the other way, so level order alone would be wrong
+    return [
+        _resource("teaches_c", ["c", "z"], ["b"], nsqf_level=4),
+        _resource("teaches_b", ["b", "y"], ["a"], nsqf_level=5),
+        _resource("teaches_a", ["a", "x"], [], nsqf_level=6)
+    ]
+
+
+def _known(graph, skills):
+    known = graph.known_bits(skills)
+    return {skill for skill, code in graph.skill_index.items() if int(known[code // 64] >> np.uint64(code % 64)) & 1}
+
+
+def test_closure_of_a_chain():
+    graph = ResourceCatalog(_chain(), {}).prerequisite_graph
+    assert graph.cyclic_skills == 0
+    assert _known(graph, ["c"]) == {"a", "b", "c"}
+    assert _known(graph, ["b"]) == {"a", "b"}
+    assert _known(graph, ["a"]) == {"a"}
+
+
+def test_ready_mask_needs_every_transitive_prerequisite():
+    catalog = ResourceCatalog(_chain(), {})
+    rows = catalog.rows_for(_chain())
+    assert catalog.prerequisites_met(rows, []).tolist() == [False, False, True]
+    assert catalog.prerequisites_met(rows, ["a"]).tolist() == [False, True, True]
+    # Knowing b implies knowing a
+    assert catalog.prerequisites_met(rows, ["b"]).tolist() == [True, True, True]
+
+
+def test_topological_order_puts_prerequisites_first():
+    catalog = ResourceCatalog(_chain(), {})
+    rows = catalog.rows_for(_chain())
+    ordered = [catalog.resource_ids[rows[i]] for i in catalog.prerequisite_order(rows)]
+    assert ordered == ["teaches_a", "teaches_b", "teaches_c"]
+
+
+def test_cycle_is_detected_and_still_ordered():
+    resources = [_resource("teaches_x", ["x"], ["y"], nsqf_level=6), _resource("teaches_y", ["y"], ["x"], nsqf_level=3),
+                 _resource("needs_x", ["w"], ["x"], nsqf_level=2)]
+    catalog = ResourceCatalog(resources, {})
+    graph = catalog.prerequisite_graph
+    assert graph.cyclic_skills == 2
+    assert _known(graph, ["x"]) == {"x", "y"}
+
+    rows = catalog.rows_for(resources)
+    assert catalog.prerequisites_met(rows, []).tolist() == [False, False, False]
+    assert catalog.prerequisites_met(rows, ["y"]).tolist() == [True, True, True]
+
+    order = catalog.prerequisite_order(rows)
+    assert sorted(order.tolist()) == [0, 1, 2]
+    # The cycle is broken by NSQF level; what needs x still comes after both cycle members
+    assert [catalog.resource_ids[rows[i]] for i in order] == ["teaches_y", "teaches_x", "needs_x"]
+
+
+def test_recommended_pathway_lists_prerequisites_first(engine):
+    engine.update_resource_catalog(_chain())
+    profile = {"user_id": "chain_learner", "prior_skills": ["a", "b"], "target_nsqf_level": 5,
+               "career_aspirations": "software developer"}
+    result = engine.generate_personalized_recommendations(profile, algorithm=RecommendationAlgorithm.CONTENT_BASED)
+    assert [resource.id for resource in result.resources] == ["teaches_a", "teaches_b", "teaches_c"]
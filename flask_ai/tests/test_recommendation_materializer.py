@@ -0,0 +1,67 @@
+"""Stored results go stale when, and only when, one of their input versions changes"""
+
+import pytest
+
+from behavior_store import FeedbackEvent
+
+
+def _change_feedback(engine, learner_profile):
+    seq = engine.update_user_feedback_batch([
+        FeedbackEvent(learner_profile["user_id"], engine.resource_catalog.ids()[0], rating=5.0, completed=True)
+    ])
+    assert engine.wait_for_behavior(seq)
+
+
+def _change_catalog(engine, learner_profile):
+    engine.update_resource_catalog(list(engine.resource_catalog))
+
+
+def _change_market_weights(engine, learner_profile):
+    engine.update_market_weights({**engine.market_weights, "python": 0.5})
+
+
+def _change_models(engine, learner_profile):
+    engine._publish_models(engine.models)
+
+
+def _change_factors(engine, learner_profile):
+    engine._on_factors_published(None)
+
+
+@pytest.mark.parametrize("change", [
+    _change_feedback, _change_catalog, _change_market_weights, _change_models, _change_factors
+], ids=["feedback", "catalog", "market_weights", "models", "factors"])
+def test_input_version_change_makes_stored_result_stale(engine, learner_profile, change):
+    # Background retrains would publish further versions; only the change under test may move one
+    engine.model_trainer.stop()
+    engine.factor_trainer.stop()
+    engine.get_learner_recommendations(learner_profile)
+    assert engine.get_learner_recommendations(learner_profile)[1]
+    assert engine.materializer.stale_learners() == []
+
+    change(engine, learner_profile)
+
+    assert [user_id for user_id, _ in engine.materializer.stale_learners()] == [learner_profile["user_id"]]
+    assert engine.materializer.refresh() == 1
+    assert engine.materializer.stale_learners() == []
+    assert engine.get_learner_recommendations(learner_profile)[1]
+
+
+def test_profile_change_misses_the_stored_result(engine, learner_profile):
+    engine.get_learner_recommendations(learner_profile)
+    assert not engine.get_learner_recommendations(dict(learner_profile, max_hours=100))[1]
+    assert engine.get_learner_recommendations(dict(learner_profile, max_hours=100))[1]
+
+
+def test_other_learners_feedback_leaves_stored_result_fresh(engine, learner_profile):
+    engine.get_learner_recommendations(learner_profile)
+    _change_feedback(engine, dict(learner_profile, user_id="another_learner"))
+    assert engine.materializer.stale_learners() == []
+    assert engine.get_learner_recommendations(learner_profile)[1]
+
+
+def test_expired_result_is_recomputed_on_request_not_in_the_background(engine, learner_profile):
+    engine.get_learner_recommendations(learner_profile)
+    engine.materializer.max_age_seconds = 0.0
+    assert engine.materializer.stale_learners() == []
+    assert not engine.get_learner_recommendations(learner_profile)[1]
@@ -0,0 +1,62 @@
+"""Serving state consistency under concurrent feedback"""
+
+import random
+import threading
+
+from behavior_store import FeedbackEvent
+
+
+def test_pinned_state_is_consistent_under_concurrent_feedback(engine):
+    resource_ids = engine.resource_catalog.ids()
+    learners = [f"concurrent_learner_{i}" for i in range(40)]
+    stop = threading.Event()
+    problems = []
+    posted = {}
+    posted_lock = threading.Lock()
+
+    def reader():
+        rng = random.Random()
+        while not stop.is_set():
+            with engine._pinned_state() as state:
+                matrix, history = state.behavior_matrix, state.user_behavior_history
+                if matrix.catalog is not state.resource_catalog:
+                    problems.append("matrix indexed by another catalog")
+                if matrix.user_ids[:len(matrix)] != list(history):
+                    problems.append(f"matrix rows {len(matrix)} do not match history {len(history)}")
+                    continue
+                user_id = rng.choice(list(history))
+                completions, _ = matrix.implicit_signals()
+                row = completions[matrix.user_index[user_id]]
+                from_matrix = {state.resource_catalog.ids()[col] for col in row.indices}
+                from_history = set(history[user_id].completed_resources) & set(state.resource_catalog.ids())
+                if from_matrix != from_history:
+                    problems.append(f"{user_id}: matrix row disagrees with history in version {state.version}")
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        last_seq = 0
+        for _ in range(30):
+            events = [FeedbackEvent(rng.choice(learners), rng.choice(resource_ids), rating=float(rng.randint(1, 5)),
+                                    completed=True) for _ in range(5)]
+            last_seq = engine.update_user_feedback_batch(events)
+            with posted_lock:
+                for event in events:
+                    posted.setdefault(event.user_id, set()).add(event.resource_id)
+        with posted_lock:
+            posted.setdefault("__last_seq__", set()).add(last_seq)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    writers = [threading.Thread(target=writer, args=(seed,)) for seed in range(3)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    assert engine.wait_for_behavior(max(posted.pop("__last_seq__")))
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert problems == []
+    history = engine.user_behavior_history
+    for user_id, resources in posted.items():
+        assert resources <= set(history[user_id].completed_resources)
@@ -0,0 +1,36 @@
+"""Skill taxonomy expansion and free-text skill matching"""
+
+import pytest
+
+from skill_taxonomy import SkillTaxonomy, load_skill_taxonomy
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    return load_skill_taxonomy()
+
+
+def test_programming_in_free_text_expands_to_python(taxonomy):
+    assert taxonomy.match_text("I want a career in programming") == ["programming"]
+    expanded = taxonomy.expand(["programming"])
+    assert expanded["python"] > 0
+    assert "python" in taxonomy.children_of("programming")
+
+
+def test_target_skills_for_programming_include_python(engine):
+    assert "python" in engine._get_target_skills("career in programming")
+
+
+def test_ambiguous_words_match_only_by_alias(taxonomy):
+    assert taxonomy.match_text("I want to go into data science") == ["data_science"]
+    assert taxonomy.match_text("backend services in golang") == ["go"]
+
+
+def test_hierarchy_is_weighted_by_depth():
+    taxonomy = SkillTaxonomy({"technical": {"programming": {"python": ["pandas"]}}})
+    assert taxonomy.ancestors_of("pandas") == ["python", "programming", "technical"]
+    assert taxonomy.descendants_of("programming") == ["python", "pandas"]
+    # Wu-Palmer: a nearer, deeper ancestor is more similar than a root
+    assert taxonomy.similarity_of("pandas", "python") > taxonomy.similarity_of("pandas", "technical")
+    assert taxonomy.similarity_of("python", "python") == 1.0
+    assert taxonomy.expand(["unknown_skill"]) == {"unknown_skill": 1.0}
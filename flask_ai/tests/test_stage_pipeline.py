@@ -0,0 +1,67 @@
+"""Stage deadlines, and results built from degraded stages never being kept"""
+
+import time
+
+from advanced_recommendation_engine import PathwayObjective, RecommendationAlgorithm
+from recommendation_cache import canonical_profile_key
+from stage_pipeline import Stage, StagePipeline
+
+
+def _sleeping(seconds: float, output):
+    def fn(**inputs):
+        time.sleep(seconds)
+        return output
+    return fn
+
+
+def test_stage_past_its_deadline_uses_fallback():
+    pipeline = StagePipeline(max_workers=2)
+    run = pipeline.run([
+        Stage("slow", _sleeping(0.5, "late"), timeout_seconds=0.05, fallback="fallback"),
+        Stage("fast", _sleeping(0.0, "fast"), timeout_seconds=0.5),
+        Stage("joined", lambda slow, fast: (slow, fast), depends_on=("slow", "fast"), inline=True)
+    ])
+    assert run.timed_out == ["slow"]
+    assert run.outputs["joined"] == ("fallback", "fast")
+    pipeline.shutdown()
+
+
+def test_stage_waiting_for_a_worker_runs_inline_instead_of_timing_out():
+    pipeline = StagePipeline(max_workers=1)
+    # Each stage fits its deadline, but the second would exceed it if its deadline counted from queueing
+    run = pipeline.run([
+        Stage("first", _sleeping(0.1, 1), timeout_seconds=0.15),
+        Stage("second", _sleeping(0.1, 2), timeout_seconds=0.15)
+    ])
+    assert run.timed_out == []
+    assert run.outputs == {"first": 1, "second": 2}
+    assert pipeline.get_stats()["inline_runs"] == {"second": 1}
+    pipeline.shutdown()
+
+
+def test_result_with_a_timed_out_stage_is_not_cached_or_stored(engine, learner_profile, monkeypatch):
+    objectives = [PathwayObjective.BALANCE_ALL]
+    algorithm = RecommendationAlgorithm.HYBRID
+
+    def cache_key(profile):
+        return canonical_profile_key(profile, objectives, algorithm, 10, 0.5)
+
+    # Control: a result from stages that all finished is kept
+    healthy = dict(learner_profile, user_id="healthy_learner")
+    engine.get_learner_recommendations(healthy)
+    assert engine.recommendation_cache.get(cache_key(healthy)) is not None
+    assert engine.materializer.get_stats()["learners"] == 1
+
+    def slow_collaborative(context, max_resources, relevance=None):
+        time.sleep(0.5)
+        return []
+
+    monkeypatch.setattr(engine, "stage_timeout_seconds", 0.05)
+    monkeypatch.setattr(engine, "_collaborative_filtering", slow_collaborative)
+    result, served = engine.get_learner_recommendations(learner_profile)
+
+    assert not served
+    assert result.resources
+    assert engine.recommendation_cache.get(cache_key(learner_profile)) is None
+    assert engine.materializer.get_stats()["learners"] == 1
+    assert engine.get_stage_timings()["hybrid_pipeline"]["timeouts"]["collaborative"] >= 1